@@ -8,6 +8,7 @@ import yaml
 from pathlib import Path
 
 from ..models import FormSubmission, get_db
+from ..services.dependencies import invalidate_dependents
 
 router = APIRouter()
 
@@ -140,6 +141,8 @@ async def save_data(source: str, data: List[Dict[str, Any]], request: Request):
     try:
         with open(data_file, 'w') as f:
             yaml.dump(data, f)
+        # Pages embedding this data source cache the rendered table
+        invalidate_dependents(data_file)
         return {"message": "Data saved successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to save data: {str(e)}")
\ No newline at end of file
@@ -7,18 +7,64 @@ import os
 from app.deps import get_templates, get_config, require_auth, get_csrf_token, verify_csrf_token
 from app.services.content_loader import ContentLoader
 from app.services.git_repo import GitRepo
+from app.services.commit_queue import CommitQueue
+from app.services.revisions import RevisionLoader
 from app.services.search import SimpleSearch
-from app.services.markdown import render_markdown
+from app.services.markdown import render_markdown_async
+from app.services.page_store import page_store
+from app.services.front_matter import front_matter_cache
+from app.services.render_cache import render_cache
+from app.services.dependencies import dependency_graph, invalidate_dependents
+from app.services.config_service import config_service
+from app.services.component_registry import component_registry
+from app.services.highlight_cache import highlight_cache
+from app.services.sanitizer import get_sanitizer
+from app.services.compression import static_variants
+from app.services.async_io import reconcile_interval, run_io
+from app.services.http_cache import file_validators
 from app.security import validate_file_path, is_safe_filename, validate_content_size
 from app.models import get_db, FormSubmission
 from sqlalchemy.orm import Session
 
 router = APIRouter(prefix="/cms", tags=["cms"])
 
+# Commits per /cms/logs page
+LOG_PAGE_SIZE = 20
+
 # Initialize services
 content_loader = ContentLoader()
-git_repo = GitRepo()
-search = SimpleSearch()
+git_config = get_config().get('git', {}) or {}
+git_repo = GitRepo(status_reconcile=git_config.get('status_reconcile_s', 60))
+commit_queue = CommitQueue(git_repo, git_config.get('commit_window_ms', 500) / 1000)
+revision_loader = RevisionLoader(git_repo, content_loader,
+                                 (get_config().get('cache', {}) or {}).get('revision_cache_size', 256))
+search = SimpleSearch(reconcile_interval=reconcile_interval())
+
+def _content_changed(path: str):
+    """Drop cached state derived from a file written or removed via the CMS"""
+    invalidate_dependents(path)
+    git_repo.mark_changed(path)
+    if path.endswith('.md'):
+        content_loader.routes.update(path)
+        if content_loader.catalog.contains(path):
+            content_loader.catalog.upsert(path)
+        search.index_page(path)
+
+def _scan_files(root_path: Path) -> list:
+    """Walk a directory and stat every file (blocking; run via run_io)"""
+    files = []
+    if root_path.exists():
+        for file_path in root_path.rglob("*"):
+            if file_path.is_file():
+                stat = file_path.stat()
+                files.append({
+                    "path": str(file_path),
+                    "name": file_path.name,
+                    "size": stat.st_size,
+                    "modified": stat.st_mtime,
+                    "type": file_path.suffix
+                })
+    return files
 
 @router.get("", response_class=HTMLResponse)
 @router.get("/", response_class=HTMLResponse)
@@ -27,19 +73,21 @@ async def cms_dashboard(request: Request, user = Depends(require_auth)):
     config = get_config()
     
     # Get recent pages
-    pages = content_loader.list_pages()[:10]
+    pages = await content_loader.list_pages_async(limit=10)
+    page_count = await run_io(content_loader.catalog.count)
     
-    # Get git status
-    git_status = git_repo.get_status()
+    # Get git status (kept in memory, only changed paths are re-checked)
+    git_status = await run_io(git_repo.get_status)
     
     # Get recent commits
-    recent_commits = git_repo.get_commit_history(limit=5)
+    recent_commits = await run_io(git_repo.get_commit_history, None, 5)
     
     tmpl = templates.get_template("cms/index.html")
     return tmpl.render(
         request=request,
         user=user,
         pages=pages,
+        page_count=page_count,
         git_status=git_status,
         recent_commits=recent_commits,
         site=config.get('site', {}),
@@ -54,21 +102,7 @@ async def list_files(request: Request, root: str = "content", user = Depends(req
         raise HTTPException(status_code=400, detail="Invalid root directory")
     
     try:
-        root_path = Path(root)
-        files = []
-        
-        if root_path.exists():
-            for file_path in root_path.rglob("*"):
-                if file_path.is_file():
-                    stat = file_path.stat()
-                    files.append({
-                        "path": str(file_path),
-                        "name": file_path.name,
-                        "size": stat.st_size,
-                        "modified": stat.st_mtime,
-                        "type": file_path.suffix
-                    })
-        
+        files = await run_io(_scan_files, Path(root))
         return {"files": files}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -91,11 +125,11 @@ async def edit_file(request: Request, path: str, content: Optional[str] = None,
     if not content and file_path.exists():
         if file_path.suffix == '.md':
             try:
-                metadata, file_content = content_loader.load_page_by_path(path)
+                metadata, file_content = await content_loader.load_page_by_path_async(path)
             except Exception as e:
-                file_content = file_path.read_text(encoding='utf-8')
+                file_content = await run_io(file_path.read_text, encoding='utf-8')
         else:
-            file_content = file_path.read_text(encoding='utf-8')
+            file_content = await run_io(file_path.read_text, encoding='utf-8')
     
     tmpl = templates.get_template("cms/editor.html")
     return tmpl.render(
@@ -132,14 +166,12 @@ async def save_file(
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
         # Save the file
-        file_path.write_text(content, encoding='utf-8')
+        await run_io(file_path.write_text, content, encoding='utf-8')
+        await run_io(_content_changed, path)
         
-        # Git operations
-        git_repo.add_file(path)
-        
-        # Format commit message
+        # Committed in the background, together with other saves in the same window
         commit_msg = f"{message} ({path}) by {user['username']}"
-        git_repo.commit(commit_msg, user.get('username'), user.get('email'))
+        commit_queue.enqueue([path], commit_msg, user.get('username'), user.get('email'))
         
         return RedirectResponse(url=f"/cms/file?path={path}", status_code=302)
     
@@ -160,7 +192,7 @@ async def preview_content(
     config = get_config()
     
     # Render markdown
-    html_content = render_markdown(content)
+    html_content = await render_markdown_async(content)
     
     # Create preview context
     preview_context = {
@@ -187,7 +219,7 @@ async def preview_content(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Preview error: {e}")
 
-@router.get("/diff")
+@router.get("/diff", response_class=HTMLResponse)
 async def view_diff(
     request: Request,
     path: str,
@@ -201,7 +233,7 @@ async def view_diff(
     if not validate_file_path(path, ["content", "templates"]):
         raise HTTPException(status_code=400, detail="Invalid file path")
     
-    diff_content = git_repo.get_file_diff(path, rev)
+    diff_content = await run_io(git_repo.get_file_diff, path, rev)
     
     tmpl = templates.get_template("cms/diff.html")
     return tmpl.render(
@@ -213,6 +245,59 @@ async def view_diff(
         site=config.get('site', {})
     )
 
+@router.get("/revision", response_class=HTMLResponse)
+async def view_revision(
+    request: Request,
+    path: str,
+    rev: str = "HEAD",
+    user = Depends(require_auth)
+):
+    """Render a page as it was at a commit, straight from git objects"""
+    templates = get_templates()
+    config = get_config()
+    
+    if not path.endswith('.md') or not validate_file_path(path, ["content"]):
+        raise HTTPException(status_code=400, detail="Invalid file path")
+    
+    revision = await run_io(revision_loader.load_page, path, rev)
+    if revision is None:
+        raise HTTPException(status_code=404, detail="Page not found at that revision")
+    
+    layout = revision.metadata.get('layout', 'docs')
+    if not layout.endswith('.html'):
+        layout = f"{layout}.html"
+    try:
+        tmpl = templates.get_template(f"layouts/{layout}")
+    except Exception:
+        tmpl = templates.get_template("layouts/docs.html")
+    
+    # Old page text, but today's data files, component templates and layouts
+    layout_files, _ = file_validators(dependency_graph.template_files(tmpl.name))
+    cache_key = (revision.commit['sha'], path, tmpl.name, revision.sources, layout_files,
+                 config_service.version)
+    page_html = revision_loader.rendered(cache_key)
+    if page_html is None:
+        content_html = await render_markdown_async(revision.body)
+        page_html = tmpl.render(
+            request=request,
+            content=content_html,
+            page=revision.metadata,
+            site=config.get('site', {}),
+            is_preview=True
+        )
+        revision_loader.store_rendered(cache_key, page_html)
+    
+    wrapper = templates.get_template("cms/revision.html")
+    return wrapper.render(
+        request=request,
+        user=user,
+        file_path=path,
+        commit=revision.commit,
+        revision_html=page_html,
+        site=config.get('site', {}),
+        csrf_token=get_csrf_token(request)
+    )
+
 @router.post("/delete")
 async def delete_file(
     request: Request,
@@ -230,32 +315,63 @@ async def delete_file(
     try:
         file_path = Path(path)
         if file_path.exists():
-            git_repo.remove_file(path)
+            # Staging the missing file in the queued commit records the removal
+            await run_io(file_path.unlink)
+            await run_io(_content_changed, path)
             commit_msg = f"{message} ({path}) by {user['username']}"
-            git_repo.commit(commit_msg, user.get('username'), user.get('email'))
+            commit_queue.enqueue([path], commit_msg, user.get('username'), user.get('email'))
         
         return RedirectResponse(url="/cms", status_code=302)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error deleting file: {e}")
 
-@router.get("/logs")
-async def view_logs(request: Request, user = Depends(require_auth)):
-    """View commit logs"""
+@router.get("/logs", response_class=HTMLResponse)
+async def view_logs(
+    request: Request,
+    path: Optional[str] = None,
+    cursor: Optional[str] = None,
+    user = Depends(require_auth)
+):
+    """View commit logs, a page at a time"""
     templates = get_templates()
     config = get_config()
     
-    commits = git_repo.get_commit_history(limit=20)
+    if path and not validate_file_path(path, ["content", "templates"]):
+        raise HTTPException(status_code=400, detail="Invalid file path")
+    
+    commits = await run_io(git_repo.get_commit_history, path, LOG_PAGE_SIZE, cursor)
+    next_cursor = commits[-1]['sha'] if len(commits) == LOG_PAGE_SIZE else None
     
-    tmpl = templates.get_template("cms/index.html")  # Reuse dashboard template
+    tmpl = templates.get_template("cms/logs.html")
     return tmpl.render(
         request=request,
         user=user,
         commits=commits,
-        site=config.get('site', {}),
-        show_logs=True
+        file_path=path,
+        cursor=cursor,
+        next_cursor=next_cursor,
+        site=config.get('site', {})
     )
 
+@router.get("/stats", response_class=JSONResponse)
+async def cache_stats(request: Request, user = Depends(require_auth)):
+    """Report cache counters for monitoring"""
+    return {
+        "page_store": page_store.stats(),
+        "front_matter": front_matter_cache.stats(),
+        "page_catalog": content_loader.catalog.stats(),
+        "render_cache": render_cache.stats(),
+        "search_index": search.index.stats(),
+        "components": component_registry.stats(),
+        "highlight": highlight_cache.stats(),
+        "sanitizer": get_sanitizer().stats(),
+        "static_variants": static_variants.stats(),
+        "git": git_repo.stats(),
+        "commit_queue": commit_queue.stats(),
+        "revisions": revision_loader.stats()
+    }
+
 @router.post("/search")
 async def cms_search(
     request: Request,
@@ -266,7 +382,7 @@ async def cms_search(
     """Search content from CMS"""
     verify_csrf_token(request, csrf_token)
     
-    results = search.search(query, limit=20)
+    results = await search.search_async(query, limit=20)
     return JSONResponse({"results": results})
 
 @router.get("/forms", response_class=HTMLResponse)
@@ -343,9 +459,10 @@ async def save_settings(
         
         with open(config_path, 'w', encoding='utf-8') as f:
             yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+        git_repo.mark_changed(str(config_path))
             
     templates = get_templates()
-    config = get_config() # Reload config
+    config = config_service.reload()
     
     tmpl = templates.get_template("cms/settings.html")
     return tmpl.render(
@@ -1,22 +1,47 @@
 from fastapi import Request, HTTPException, Depends
-from jinja2 import Environment, FileSystemLoader, select_autoescape
-import yaml
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape
 from pathlib import Path
 import os
+import threading
+
+from app.services.config_service import config_service
+
+_templates = None
+_templates_lock = threading.Lock()
 
 def get_config():
-    """Load application configuration"""
-    config_path = Path("config.yaml")
-    if config_path.exists():
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
-    return {}
+    """Get the current (read-only) application configuration snapshot"""
+    return config_service.get()
 
 def get_templates():
-    """Get Jinja2 templates environment"""
+    """Get the process-wide Jinja2 templates environment"""
+    global _templates
+    if _templates is None:
+        with _templates_lock:
+            if _templates is None:
+                _templates = create_templates()
+    return _templates
+
+def create_templates(bytecode_cache_dir: str = None):
+    """Create a Jinja2 templates environment.
+
+    Templates are recompiled only when their file changes (``auto_reload``),
+    and compiled bytecode is kept on disk so new workers start warm.
+    """
+    if bytecode_cache_dir is None:
+        cache_config = (get_config() or {}).get('cache', {}) or {}
+        bytecode_cache_dir = cache_config.get('jinja_bytecode_dir', '.cache/jinja')
+    
+    bytecode_cache = None
+    if bytecode_cache_dir:
+        Path(bytecode_cache_dir).mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(bytecode_cache_dir)
+    
     templates = Environment(
         loader=FileSystemLoader("templates"),
-        autoescape=select_autoescape(["html", "xml"])
+        autoescape=select_autoescape(["html", "xml"]),
+        auto_reload=True,
+        bytecode_cache=bytecode_cache
     )
     
     # Add custom filters
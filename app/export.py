@@ -0,0 +1,261 @@
+"""Static site export.
+
+Pre-renders every published page through the same ``render_page`` pipeline
+the server uses, plus the sitemap(s), ``robots.txt`` and ``static/``, into
+a directory any file server can serve::
+
+    python -m app.export --output dist --workers 8
+
+With ``--incremental`` only pages whose file, layout templates, data files,
+navigation or site config changed since the last export are re-rendered,
+using the dependency manifest written next to the output directory.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+from urllib.parse import urlsplit
+
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.deps import get_config
+from app.services.config_service import config_service
+from app.public import routes as public_routes
+from app.services.dependencies import dependency_graph
+from app.services.markdown import use_thread_executor
+
+_loop = None
+
+
+def _event_loop():
+    """Return this process's event loop for driving the async route handlers"""
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+
+def _export_request(path: str, base_url: str) -> Request:
+    """Build an anonymous request for a URL path on the configured site"""
+    url = urlsplit(base_url)
+    scope = {
+        'type': 'http',
+        'method': 'GET',
+        'scheme': url.scheme or 'http',
+        'server': (url.hostname or 'localhost', url.port or (443 if url.scheme == 'https' else 80)),
+        'path': path,
+        'raw_path': path.encode('utf-8'),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', (url.netloc or 'localhost').encode('utf-8'))],
+        'session': {}
+    }
+    return Request(scope)
+
+
+def _output_file(output_dir: Path, url_path: str) -> Path:
+    """Map a URL path to index.html inside a directory of the same name"""
+    relative = url_path.strip('/')
+    return output_dir / relative / 'index.html' if relative else output_dir / 'index.html'
+
+
+def published_pages(content_loader) -> List[Tuple[str, str]]:
+    """Return (URL path, file path) for every published page"""
+    pages = []
+    for page in content_loader.list_pages():
+        if page.get('draft', False):
+            continue
+        pages.append((content_loader.routes.url_for(page['file_path']), page['file_path']))
+    return sorted(pages)
+
+
+def _init_worker():
+    """Prepare an export worker: render markdown on one thread, not a nested
+    process pool per worker, and build the navigation before the first page"""
+    use_thread_executor()
+    public_routes.nav_builder.build_navigation()
+
+
+def _export_page(task: Tuple[str, str, str, str]) -> Dict[str, Any]:
+    """Render one page to disk and report its timing and dependencies"""
+    url_path, file_path, output_dir, base_url = task
+    result = {'path': url_path, 'file': file_path, 'seconds': 0.0, 'bytes': 0, 'error': '', 'dependencies': []}
+    started = time.perf_counter()
+    try:
+        response = _event_loop().run_until_complete(
+            public_routes.render_page(_export_request(url_path, base_url), url_path.strip('/'))
+        )
+        target = _output_file(Path(output_dir), url_path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(response.body)
+        result['bytes'] = len(response.body)
+        result['dependencies'] = sorted(os.path.relpath(dep) for dep in dependency_graph.dependencies(file_path))
+    except HTTPException as e:
+        result['error'] = str(e.detail)
+    except Exception as e:
+        result['error'] = str(e)
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def manifest_path(output_dir: str) -> Path:
+    """Return where the dependency manifest of an export is kept"""
+    output = Path(output_dir)
+    return output.with_name(f"{output.name}.manifest.json")
+
+
+def _file_fingerprint(path: str, cache: Dict[str, str]) -> str:
+    if path not in cache:
+        try:
+            stat = os.stat(path)
+            cache[path] = f"{stat.st_mtime_ns}:{stat.st_size}"
+        except FileNotFoundError:
+            cache[path] = ''
+    return cache[path]
+
+
+def _is_up_to_date(entry: Dict[str, Any], file_path: str, target: Path, fingerprints: Dict[str, str]) -> bool:
+    """Check whether a page's previous output is still valid"""
+    if not entry or entry.get('file') != file_path or not target.exists():
+        return False
+    return all(
+        _file_fingerprint(dep, fingerprints) == fingerprint
+        for dep, fingerprint in entry.get('dependencies', {}).items()
+    )
+
+
+async def _response_body(response) -> bytes:
+    """Return the body of a plain or streaming response"""
+    if hasattr(response, 'body_iterator'):
+        return b''.join([chunk async for chunk in response.body_iterator])
+    return response.body
+
+
+def _export_route(handler, url_path: str, target: Path, base_url: str, **params):
+    """Write the body of a route handler that takes the request (and path params) to a file"""
+    async def render():
+        response = await handler(_export_request(url_path, base_url), **params)
+        return await _response_body(response)
+    target.write_bytes(_event_loop().run_until_complete(render()))
+
+
+def export_site(output_dir: str = "dist", workers: int = None, verbose: bool = False,
+                incremental: bool = False) -> List[Dict[str, Any]]:
+    """Export the whole site, returning per-page timing results"""
+    config = get_config()
+    base_url = config.get('site', {}).get('base_url', 'http://localhost:5000')
+    static_dir = Path(config.get('content', {}).get('static_dir', 'static'))
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+
+    # Reconciles the page catalog, so workers find it current and only read it
+    public_routes.nav_builder.build_navigation()
+    config_fingerprint = config_service.fingerprint
+    nav_fingerprint = public_routes.nav_builder.fingerprint
+
+    previous = {}
+    if incremental and manifest_path(output_dir).exists():
+        previous = json.loads(manifest_path(output_dir).read_text(encoding='utf-8'))
+    previous_pages = previous.get('pages', {})
+    site_unchanged = (previous.get('config') == config_fingerprint
+                      and previous.get('navigation') == nav_fingerprint)
+
+    pages = published_pages(public_routes.content_loader)
+    fingerprints: Dict[str, str] = {}
+    manifest_pages: Dict[str, Any] = {}
+    tasks = []
+    for url_path, file_path in pages:
+        entry = previous_pages.get(url_path)
+        if site_unchanged and _is_up_to_date(entry, file_path, _output_file(output, url_path), fingerprints):
+            manifest_pages[url_path] = entry
+        else:
+            tasks.append((url_path, file_path, str(output), base_url))
+
+    # Outputs of pages that were deleted or turned into drafts
+    current = {url_path for url_path, _ in pages}
+    for url_path in previous_pages:
+        if url_path not in current:
+            _output_file(output, url_path).unlink(missing_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    # Never fork this process: its reconcile and executor threads may hold
+    # locks at fork time. A forkserver imports the app once, before any
+    # thread starts, and workers fork from it; elsewhere they are spawned.
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['app.export'])
+    else:
+        context = multiprocessing.get_context('spawn')
+
+    results = []
+    started = time.perf_counter()
+    if tasks:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init_worker) as executor:
+            for result in executor.map(_export_page, tasks, chunksize=chunksize):
+                results.append(result)
+                if verbose:
+                    error = f"  ERROR: {result['error']}" if result['error'] else ''
+                    print(f"{result['seconds'] * 1000:8.1f} ms {result['bytes']:>9} B  {result['path']}{error}")
+                if not result['error']:
+                    manifest_pages[result['path']] = {
+                        'file': result['file'],
+                        'dependencies': {
+                            dep: _file_fingerprint(dep, fingerprints) for dep in result['dependencies']
+                        }
+                    }
+
+    for number in public_routes.sitemap_builder.numbers():
+        if number == 0:
+            _export_route(public_routes.sitemap, '/sitemap.xml', output / 'sitemap.xml', base_url)
+        else:
+            name = f"sitemap-{number}.xml"
+            _export_route(public_routes.sitemap_part, f"/{name}", output / name, base_url, number=number)
+    _export_route(public_routes.robots, '/robots.txt', output / 'robots.txt', base_url)
+    if static_dir.exists():
+        shutil.copytree(static_dir, output / 'static', dirs_exist_ok=True)
+
+    manifest_path(output_dir).write_text(json.dumps({
+        'config': config_fingerprint,
+        'navigation': nav_fingerprint,
+        'pages': manifest_pages
+    }, indent=2, sort_keys=True), encoding='utf-8')
+
+    elapsed = time.perf_counter() - started
+    failed = [r for r in results if r['error']]
+    skipped = len(pages) - len(tasks)
+    print(f"Exported {len(results) - len(failed)} pages ({skipped} unchanged) to {output} "
+          f"in {elapsed:.2f}s using {workers} workers")
+    if results:
+        print("Slowest pages:")
+        for result in sorted(results, key=lambda r: r['seconds'], reverse=True)[:10]:
+            print(f"  {result['seconds'] * 1000:8.1f} ms  {result['path']}")
+    for result in failed:
+        print(f"Failed: {result['path']}: {result['error']}")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export FlashPages as a static site")
+    parser.add_argument("--output", "-o", default="dist", help="Output directory (default: dist)")
+    parser.add_argument("--workers", "-j", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Print the timing of every page")
+    parser.add_argument("--incremental", "-i", action="store_true",
+                        help="Only re-render pages whose dependencies changed since the last export")
+    args = parser.parse_args()
+
+    results = export_site(args.output, args.workers, args.verbose, args.incremental)
+    raise SystemExit(1 if any(r['error'] for r in results) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 """Database models for the CMS"""
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -36,6 +36,31 @@ class ComponentUsage(Base):
     component_data = Column(Text)  # JSON of component parameters
     created_at = Column(DateTime, default=datetime.utcnow)
 
+class PageCatalog(Base):
+    """Front-matter metadata of every page, kept in sync with the content directory"""
+    __tablename__ = 'page_catalog'
+    __table_args__ = (
+        Index('ix_page_catalog_dir_mtime', 'content_dir', 'mtime'),
+        Index('ix_page_catalog_dir_nav', 'content_dir', 'draft', 'nav_order'),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    content_dir = Column(String(500), nullable=False)
+    file_path = Column(String(500), nullable=False, unique=True)
+    slug = Column(String(500), index=True)  # front-matter slug, NULL when derived from the path
+    title = Column(String(500))
+    draft = Column(Boolean, nullable=False, default=False)
+    section = Column(String(255))
+    parent = Column(String(255))
+    nav_order = Column(Float)  # front matter allows fractional orders such as 1.5
+    description = Column(Text)
+    mtime = Column(Float, nullable=False)
+    size = Column(Integer, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    
+    def __repr__(self):
+        return f"<PageCatalog {self.file_path}>"
+
 # Database connection
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./flashpages.db')
 connect_args = {'check_same_thread': False} if DATABASE_URL.startswith('sqlite') else {}
@@ -1,20 +1,97 @@
 from fastapi import APIRouter, Request, HTTPException, Query
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from typing import Optional
 
 from app.deps import get_templates, get_config
+from app.services.config_service import config_service
 from app.services.content_loader import ContentLoader
 from app.services.nav import NavigationBuilder
 from app.services.search import SimpleSearch
-from app.services.markdown import render_markdown
+from app.services.markdown import render_markdown_async
+from app.services.render_cache import render_cache
+from app.services.dependencies import dependency_graph
+from app.services.compression import page_response
+from app.services.sitemap import SitemapBuilder, stream_document
+from app.services.async_io import reconcile_interval, run_io
+from app.services.http_cache import file_validators, make_etag, not_modified, validator_headers
 
 router = APIRouter()
 
 # Initialize services
 content_loader = ContentLoader()
 nav_builder = NavigationBuilder()
-search = SimpleSearch()
+search = SimpleSearch(reconcile_interval=reconcile_interval())
+sitemap_builder = SitemapBuilder(content_loader)
 
+@router.get("/api/search", response_class=JSONResponse)
+async def search_content(query: str = Query(..., min_length=2), limit: int = Query(10, ge=1, le=50)):
+    """Public search API endpoint"""
+    try:
+        results = await search.search_async(query, limit)
+        return {"results": results, "query": query, "total": len(results)}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Search error: {e}")
+
+@router.get("/api/suggestions", response_class=JSONResponse)
+async def search_suggestions(query: str = Query(..., min_length=1), limit: int = Query(5, ge=1, le=10)):
+    """Get search suggestions"""
+    try:
+        suggestions = await search.get_search_suggestions_async(query, limit)
+        return {"suggestions": suggestions}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Suggestions error: {e}")
+
+async def _sitemap_response(request: Request, number: int):
+    """Stream one cached sitemap document, answering revalidations with 304"""
+    if sitemap_builder.needs_refresh():
+        await run_io(sitemap_builder.refresh)
+    document = sitemap_builder.document(number)
+    if document is None:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    
+    etag = make_etag('sitemap', number, sitemap_builder.fingerprint)
+    last_modified = max(document['last_modified'], config_service.last_modified)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    
+    return StreamingResponse(stream_document(document), media_type="application/xml",
+                             headers=validator_headers(etag, last_modified))
+
+@router.get("/sitemap.xml", response_class=HTMLResponse)
+async def sitemap(request: Request):
+    """Serve the XML sitemap, or the sitemap index on sites past the per-file URL limit"""
+    return await _sitemap_response(request, 0)
+
+@router.get("/sitemap-{number:int}.xml", response_class=HTMLResponse)
+async def sitemap_part(request: Request, number: int):
+    """Serve one child sitemap listed in the sitemap index"""
+    if number < 1:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    return await _sitemap_response(request, number)
+
+@router.get("/robots.txt", response_class=HTMLResponse)
+async def robots(request: Request):
+    """Generate robots.txt"""
+    config = get_config()
+    
+    etag = make_etag('robots', config_service.fingerprint)
+    response = not_modified(request, etag, config_service.last_modified)
+    if response is not None:
+        return response
+    
+    base_url = config.get('site', {}).get('base_url', 'http://localhost:5000')
+    
+    robots_txt = [
+        "User-agent: *",
+        "Allow: /",
+        f"Sitemap: {base_url.rstrip('/')}/sitemap.xml"
+    ]
+    
+    return HTMLResponse('\n'.join(robots_txt), media_type="text/plain",
+                        headers=validator_headers(etag, config_service.last_modified))
+
+# Registered last: the catch-all path would otherwise shadow the routes above
 @router.get("/", response_class=HTMLResponse)
 @router.get("/{slug:path}", response_class=HTMLResponse)
 async def render_page(request: Request, slug: str = ""):
@@ -22,7 +99,7 @@ async def render_page(request: Request, slug: str = ""):
     config = get_config()
     
     try:
-        metadata, content = content_loader.load_page(slug)
+        metadata, content = await content_loader.load_page_async(slug)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="Page not found")
     
@@ -30,26 +107,50 @@ async def render_page(request: Request, slug: str = ""):
     if metadata.get('draft', False) and not request.url.hostname in ['localhost', '127.0.0.1']:
         raise HTTPException(status_code=404, detail="Page not found")
     
-    # Render markdown content
-    content_html = render_markdown(content)
-    
     # Get layout template
     layout = metadata.get('layout', 'docs')
     # Ensure .html extension
     if not layout.endswith('.html'):
         layout = f"{layout}.html"
     
+    # Resolve the template up front: its files are part of the page's validators
     try:
         tmpl = templates.get_template(f"layouts/{layout}")
     except:
         # Fallback to docs layout
         tmpl = templates.get_template("layouts/docs.html")
     
-    # Build navigation
-    navigation = nav_builder.build_navigation()
+    # Navigation is a shared snapshot, so fetching it up front is cheap
+    navigation = await nav_builder.build_navigation_async()
+    
+    # Anonymous visitors share cached HTML; signed-in users see session-specific chrome
+    cache_key = None
+    headers = {}
+    if not request.session.get('user'):
+        files = dependency_graph.dependencies(metadata['file_path']) | dependency_graph.template_files(tmpl.name)
+        fingerprints, files_modified = file_validators(files)
+        etag = make_etag(slug, metadata.get('content_hash'), tmpl.name, fingerprints,
+                         config_service.fingerprint, nav_builder.fingerprint)
+        last_modified = max(files_modified, config_service.last_modified, nav_builder.last_modified)
+        response = not_modified(request, etag, last_modified, vary='Accept-Encoding')
+        if response is not None:
+            return response
+        headers = validator_headers(etag, last_modified)
+        
+        # Same inputs as the ETag, so a cached body never outlives its validator
+        cache_key = (slug, metadata.get('content_hash'), layout, fingerprints,
+                     config_service.version, nav_builder.version)
+        cached_html = render_cache.get(cache_key)
+        if cached_html is not None:
+            return await page_response(request, cached_html, headers, cache_key)
+    
+    # Render markdown content
+    content_html = await render_markdown_async(content)
+    dependency_graph.record_template(metadata['file_path'], tmpl.name)
+    
     breadcrumbs = nav_builder.get_breadcrumbs(slug)
     
-    return tmpl.render(
+    html = tmpl.render(
         request=request,
         content=content_html,
         page=metadata,
@@ -57,64 +158,8 @@ async def render_page(request: Request, slug: str = ""):
         navigation=navigation,
         breadcrumbs=breadcrumbs
     )
-
-@router.get("/api/search", response_class=JSONResponse)
-async def search_content(query: str = Query(..., min_length=2), limit: int = Query(10, ge=1, le=50)):
-    """Public search API endpoint"""
-    try:
-        results = search.search(query, limit)
-        return {"results": results, "query": query, "total": len(results)}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Search error: {e}")
-
-@router.get("/api/suggestions", response_class=JSONResponse)
-async def search_suggestions(query: str = Query(..., min_length=1), limit: int = Query(5, ge=1, le=10)):
-    """Get search suggestions"""
-    try:
-        suggestions = search.get_search_suggestions(query, limit)
-        return {"suggestions": suggestions}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Suggestions error: {e}")
-
-@router.get("/sitemap.xml", response_class=HTMLResponse)
-async def sitemap():
-    """Generate XML sitemap"""
-    config = get_config()
-    base_url = config.get('site', {}).get('base_url', 'http://localhost:5000')
-    
-    pages = content_loader.list_pages()
     
-    sitemap_xml = ['<?xml version="1.0" encoding="UTF-8"?>']
-    sitemap_xml.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
-    
-    for page in pages:
-        # Skip draft pages
-        try:
-            metadata, _ = content_loader.load_page_by_path(page['file_path'])
-            if metadata.get('draft', False):
-                continue
-            
-            slug = metadata.get('slug', page.get('slug', ''))
-            if slug:
-                url = f"{base_url.rstrip('/')}{slug if slug.startswith('/') else '/' + slug}"
-                sitemap_xml.append(f'  <url><loc>{url}</loc></url>')
-        except:
-            continue
-    
-    sitemap_xml.append('</urlset>')
-    
-    return HTMLResponse('\n'.join(sitemap_xml), media_type="application/xml")
-
-@router.get("/robots.txt", response_class=HTMLResponse)
-async def robots():
-    """Generate robots.txt"""
-    config = get_config()
-    base_url = config.get('site', {}).get('base_url', 'http://localhost:5000')
-    
-    robots_txt = [
-        "User-agent: *",
-        "Allow: /",
-        f"Sitemap: {base_url.rstrip('/')}/sitemap.xml"
-    ]
+    if cache_key is not None:
+        render_cache.put(cache_key, html, metadata['file_path'])
     
-    return HTMLResponse('\n'.join(robots_txt), media_type="text/plain")
+    return await page_response(request, html, headers, cache_key)
@@ -0,0 +1,53 @@
+"""Offload blocking content I/O from the event loop"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from app.deps import get_config
+
+_executor: ThreadPoolExecutor = None
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Return the bounded thread pool used for filesystem work"""
+    global _executor
+    if _executor is None:
+        workers = int(((get_config() or {}).get('content', {}) or {}).get('io_workers', 8))
+        _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="content-io")
+    return _executor
+
+
+async def run_io(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking filesystem call in the I/O pool and await its result.
+
+    Callers batch related calls (a whole directory listing, a page read plus
+    its stat) into one function so each request pays for one hop at most.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_executor(), partial(func, *args, **kwargs))
+
+
+def reconcile_interval() -> float:
+    """Seconds between background rescans that pick up edits made outside the CMS"""
+    return float(((get_config() or {}).get('content', {}) or {}).get('reconcile_s', 30))
+
+
+def start_periodic(name: str, interval: float, func: Callable[[], Any]) -> Optional[threading.Thread]:
+    """Call ``func`` every ``interval`` seconds on a daemon thread; ``interval <= 0`` disables it"""
+    if interval <= 0:
+        return None
+
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                func()
+            except Exception as e:
+                print(f"Warning: {name} failed: {e}")
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,218 @@
+"""Commit metadata cache with cursor pagination and a per-file index"""
+import heapq
+from bisect import bisect_right
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from .git_objects import ABBREV, Commit, parse_ident, subject
+
+# Commits walked per step when a per-file view needs older history
+WALK_CHUNK = 256
+# New commits walked from HEAD before giving up and starting over
+MAX_NEW_COMMITS = 10000
+# Older commits one lookup may walk before leaving it to the git CLI
+MAX_WALK_PER_CALL = 512
+
+
+class CommitRecord(NamedTuple):
+    sha: str
+    author: str
+    email: str
+    timestamp: int
+    message: str
+    paths: Tuple[str, ...]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The shape GitRepo.get_commit_history returns"""
+        return {
+            'hash': self.sha[:ABBREV],
+            'sha': self.sha,
+            'message': self.message,
+            'author': self.author,
+            'email': self.email,
+            'date': datetime.fromtimestamp(self.timestamp)
+        }
+
+
+class CommitLog:
+    """History of HEAD in ``git log`` order, walked lazily and kept in memory.
+
+    Each commit is read once, with the paths it touched, and indexed by
+    path. Views only walk as deep as the page they show; later pages and
+    per-file lookups continue the walk where it stopped. When HEAD moves
+    (read straight from ``.git``), only the new commits are walked and put
+    in front; a rewritten history (reset, rebase) starts the cache over.
+
+    Not thread-safe: ``GitRepo`` calls it with its repository lock held.
+    """
+
+    def __init__(self, git_repo):
+        self.git_repo = git_repo
+        self.walked = 0
+        self.rebuilds = 0
+        self._reset(None)
+
+    def _reset(self, head: Optional[str]):
+        self._head = head
+        self._records: Dict[str, CommitRecord] = {}
+        # Log position as a sequence number; new commits get lower numbers
+        self._seq: Dict[str, int] = {}
+        self._log: List[str] = []
+        self._low = 0
+        self._by_path: Dict[str, List[int]] = {}
+        self._frontier: List[Tuple[int, int, Commit]] = []
+        self._queued: Set[str] = set()
+        self._counter = 0
+        if head:
+            self._push(self._frontier, head)
+
+    def _push(self, heap: list, sha: str):
+        commit = self.git_repo.read_commit(sha)
+        if commit is None:
+            return
+        self._queued.add(sha)
+        self._counter += 1
+        heapq.heappush(heap, (-parse_ident(commit.committer)[2], self._counter, commit))
+
+    def _changed(self, old_tree: Optional[str], new_tree: Optional[str], prefix: str = '') -> Set[str]:
+        """Paths of files that differ between two trees, skipping identical subtrees"""
+        if old_tree == new_tree:
+            return set()
+        old = {entry.name: entry for entry in self.git_repo.read_tree(old_tree)} if old_tree else {}
+        new = {entry.name: entry for entry in self.git_repo.read_tree(new_tree)} if new_tree else {}
+        changed = set()
+        for name in old.keys() | new.keys():
+            a, b = old.get(name), new.get(name)
+            if a == b:
+                continue
+            a_tree = a.sha if a and a.mode == '40000' else None
+            b_tree = b.sha if b and b.mode == '40000' else None
+            if a_tree or b_tree:
+                changed |= self._changed(a_tree, b_tree, f"{prefix}{name}/")
+            if (a and not a_tree) or (b and not b_tree):
+                changed.add(prefix + name)
+        return changed
+
+    def _record(self, commit: Commit) -> CommitRecord:
+        # A merge touches what differs from every parent, as `git log -- <path>` shows merges
+        changed = None
+        for parent_sha in commit.parents:
+            parent = self.git_repo.read_commit(parent_sha)
+            paths = self._changed(parent.tree if parent else None, commit.tree)
+            changed = paths if changed is None else changed & paths
+        if changed is None:
+            changed = self._changed(None, commit.tree)
+        name, email, timestamp, _ = parse_ident(commit.author)
+        return CommitRecord(commit.sha, name, email, timestamp, subject(commit.message), tuple(sorted(changed)))
+
+    def _sync(self):
+        """Bring the cache up to the current HEAD"""
+        head = self.git_repo.refs.resolve("HEAD")
+        if head == self._head:
+            return
+        if self._head is None or head is None or head in self._queued:
+            self.rebuilds += self._head is not None
+            self._reset(head)
+            return
+
+        # Walk what is new since the cached HEAD, newest first
+        heap: List[Tuple[int, int, Commit]] = []
+        self._push(heap, head)
+        new_commits: List[Commit] = []
+        reaches_old_head = False
+        while heap:
+            _, _, commit = heapq.heappop(heap)
+            new_commits.append(commit)
+            if len(new_commits) > MAX_NEW_COMMITS:
+                break
+            for parent_sha in commit.parents:
+                reaches_old_head = reaches_old_head or parent_sha == self._head
+                if parent_sha not in self._queued:
+                    self._push(heap, parent_sha)
+        if not reaches_old_head or heap:
+            # History was rewritten or moved too far: start over, lazily
+            self.rebuilds += 1
+            self._reset(head)
+            return
+
+        records = [self._record(commit) for commit in new_commits]
+        self._low -= len(records)
+        added_paths: Dict[str, List[int]] = {}
+        for offset, record in enumerate(records):
+            seq = self._low + offset
+            self._records[record.sha] = record
+            self._seq[record.sha] = seq
+            for path in record.paths:
+                added_paths.setdefault(path, []).append(seq)
+        self._log[:0] = [record.sha for record in records]
+        for path, seqs in added_paths.items():
+            self._by_path.setdefault(path, [])[:0] = seqs
+        self.walked += len(records)
+        self._head = head
+
+    def _extend(self, count: int):
+        """Walk up to ``count`` more commits into the past"""
+        while count > 0 and self._frontier:
+            _, _, commit = heapq.heappop(self._frontier)
+            record = self._record(commit)
+            seq = self._low + len(self._log)
+            self._log.append(commit.sha)
+            self._records[commit.sha] = record
+            self._seq[commit.sha] = seq
+            for path in record.paths:
+                self._by_path.setdefault(path, []).append(seq)
+            for parent_sha in commit.parents:
+                if parent_sha not in self._queued:
+                    self._push(self._frontier, parent_sha)
+            self.walked += 1
+            count -= 1
+
+    def history(self, path: Optional[str] = None, limit: int = 10,
+                cursor: Optional[str] = None) -> Optional[List[CommitRecord]]:
+        """Return up to ``limit`` commits after ``cursor`` (a full SHA from a previous page).
+
+        Returns None when answering would walk more than ``MAX_WALK_PER_CALL``
+        uncached commits (a rarely edited file in a long history); the walk
+        still advances, so repeated lookups are served from the cache.
+        """
+        self._sync()
+        after = None
+        if cursor:
+            after = self._seq.get(cursor)
+            if after is None:
+                if self._frontier:
+                    # Not walked that far yet (the page came from the CLI)
+                    return None
+                # The cursor is gone from history (or was never in it)
+                return []
+
+        if path is None:
+            start = 0 if after is None else after - self._low + 1
+            missing = start + limit - len(self._log)
+            if missing > MAX_WALK_PER_CALL:
+                return None
+            if missing > 0:
+                self._extend(missing)
+            return [self._records[sha] for sha in self._log[start:start + limit]]
+
+        budget = MAX_WALK_PER_CALL
+        while True:
+            seqs = self._by_path.get(path, [])
+            start = 0 if after is None else bisect_right(seqs, after)
+            if len(seqs) - start >= limit or not self._frontier:
+                break
+            if budget <= 0:
+                return None
+            self._extend(WALK_CHUNK)
+            budget -= WALK_CHUNK
+        return [self._records[self._log[seq - self._low]] for seq in seqs[start:start + limit]]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring"""
+        return {
+            'commits': len(self._log),
+            'paths': len(self._by_path),
+            'walked': self.walked,
+            'rebuilds': self.rebuilds,
+            'complete': not self._frontier
+        }
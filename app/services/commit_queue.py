@@ -0,0 +1,143 @@
+"""Background git commits for CMS writes, coalescing bursts of saves"""
+import atexit
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .git_repo import COMMIT_FAILED, NO_CHANGES
+
+
+class CommitIntent(NamedTuple):
+    paths: Tuple[str, ...]
+    message: str
+    author_name: Optional[str]
+    author_email: Optional[str]
+    queued_at: float
+
+
+def combined_message(intents: List[CommitIntent]) -> str:
+    """One commit message for a batch: every distinct message, plus co-author trailers"""
+    messages = list(dict.fromkeys(intent.message for intent in intents))
+    if len(messages) == 1:
+        text = messages[0]
+    else:
+        text = f"{messages[0]} (+{len(messages) - 1} more)\n\n" + '\n'.join(f"- {message}" for message in messages)
+
+    first = intents[0]
+    co_authors = dict.fromkeys(
+        (intent.author_name, intent.author_email) for intent in intents
+        if intent.author_name and intent.author_email
+        and (intent.author_name, intent.author_email) != (first.author_name, first.author_email)
+    )
+    if co_authors:
+        text += '\n\n' + '\n'.join(f"Co-authored-by: {name} <{email}>" for name, email in co_authors)
+    return text
+
+
+class CommitQueue:
+    """Commit CMS writes from a worker thread instead of inside the request.
+
+    A request writes its file and calls ``enqueue``. The worker waits
+    ``window`` seconds after the first pending intent, then stages every
+    queued path and makes one commit for the whole batch. The first
+    intent's user is the author; other users are kept as ``Co-authored-by``
+    trailers and every distinct message is listed in the body.
+    """
+
+    def __init__(self, git_repo, window: float = 0.5):
+        self.git_repo = git_repo
+        self.window = window
+        self._pending: Deque[CommitIntent] = deque()
+        self._condition = threading.Condition()
+        self._worker: Optional[threading.Thread] = None
+        self._busy = False
+        self.intents = 0
+        self.commits = 0
+        self.errors = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+        atexit.register(self.flush)
+
+    def enqueue(self, paths: Iterable[str], message: str, author_name: str = None, author_email: str = None):
+        """Queue a commit of paths written (or deleted) by a CMS request"""
+        intent = CommitIntent(tuple(paths), message, author_name, author_email, time.monotonic())
+        with self._condition:
+            self._pending.append(intent)
+            self.intents += 1
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="cms-commit-queue", daemon=True)
+                self._worker.start()
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                oldest = self._pending[0].queued_at
+            # Let a burst of saves collect into one commit
+            delay = oldest + self.window - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self._condition:
+                batch = list(self._pending)
+                self._pending.clear()
+                self._busy = True
+            try:
+                self._commit(batch)
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def _commit(self, batch: List[CommitIntent]):
+        try:
+            for path in dict.fromkeys(path for intent in batch for path in intent.paths):
+                self.git_repo.add_file(path)
+            first = batch[0]
+            result = self.git_repo.commit(combined_message(batch), first.author_name, first.author_email)
+            if result == COMMIT_FAILED:
+                self.errors += 1
+                print(f"Warning: Failed to commit queued CMS changes: {len(batch)} intents left uncommitted")
+            elif result != NO_CHANGES:
+                self.commits += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"Warning: Failed to commit queued CMS changes: {e}")
+
+        elapsed = (time.monotonic() - batch[0].queued_at) * 1000
+        self.flushes += 1
+        self.last_flush_ms = round(elapsed, 2)
+        self.max_flush_ms = max(self.max_flush_ms, self.last_flush_ms)
+        self.total_flush_ms += elapsed
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """Wait until every queued intent is committed; returns False on timeout"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._pending or self._busy:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._worker is None or not self._worker.is_alive():
+                    return not (self._pending or self._busy)
+                self._condition.wait(remaining)
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue counters for monitoring"""
+        with self._condition:
+            depth = len(self._pending)
+            oldest = self._pending[0].queued_at if self._pending else None
+        return {
+            'depth': depth,
+            'oldest_pending_ms': round((time.monotonic() - oldest) * 1000, 2) if oldest else 0.0,
+            'intents': self.intents,
+            'commits': self.commits,
+            'flushes': self.flushes,
+            'errors': self.errors,
+            'last_flush_ms': self.last_flush_ms,
+            'max_flush_ms': round(self.max_flush_ms, 2),
+            'avg_flush_ms': round(self.total_flush_ms / self.flushes, 2) if self.flushes else 0.0
+        }
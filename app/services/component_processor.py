@@ -2,15 +2,32 @@
 import re
 import json
 from typing import Dict, List, Any
-from jinja2 import Template
 import yaml
 from pathlib import Path
+from .component_registry import component_registry
+
+# Built-ins whose output depends on more than their parameters are never memoized
+UNCACHED_COMPONENTS = {'data_editor'}
 
 class ComponentProcessor:
     """Process component shorthand notation in markdown content"""
     
     def __init__(self):
         self.component_pattern = re.compile(r'\[([a-zA-Z_]+)\s*(.*?)\]', re.MULTILINE | re.DOTALL)
+        self.registry = component_registry
+        self.builtin_components = {
+            'hero': self._render_hero,
+            'card': self._render_card,
+            'cta': self._render_cta,
+            'feature': self._render_feature,
+            'testimonial': self._render_testimonial,
+            'pricing': self._render_pricing,
+            'gallery': self._render_gallery,
+            'contact': self._render_contact,
+            'newsletter': self._render_newsletter,
+            'modal': self._render_modal,
+            'data_editor': self._render_data_editor,
+        }
         
     def process_content(self, content: str) -> str:
         """Process all components in the content"""
@@ -41,31 +58,33 @@ class ComponentProcessor:
     
     def _render_component(self, component_type: str, params: Dict[str, Any]) -> str:
         """Render a component based on its type and parameters"""
+        renderer = self.builtin_components.get(component_type)
+        if renderer is None:
+            return self._render_user_component(component_type, params)
+        
+        cache_key = None
+        if component_type not in UNCACHED_COMPONENTS:
+            cache_key = (component_type, tuple(sorted(params.items())))
+            cached = self.registry.cached_output(cache_key)
+            if cached is not None:
+                return cached
+        
+        try:
+            html = renderer(params)
+        except Exception as e:
+            return f'<!-- Error rendering {component_type}: {str(e)} -->'
+        
+        if cache_key is not None:
+            self.registry.store_output(cache_key, html)
+        return html
+    
+    def _render_user_component(self, component_type: str, params: Dict[str, Any]) -> str:
+        """Render a component defined in templates/components/"""
         try:
-            if component_type == 'hero':
-                return self._render_hero(params)
-            elif component_type == 'card':
-                return self._render_card(params)
-            elif component_type == 'cta':
-                return self._render_cta(params)
-            elif component_type == 'feature':
-                return self._render_feature(params)
-            elif component_type == 'testimonial':
-                return self._render_testimonial(params)
-            elif component_type == 'pricing':
-                return self._render_pricing(params)
-            elif component_type == 'gallery':
-                return self._render_gallery(params)
-            elif component_type == 'contact':
-                return self._render_contact(params)
-            elif component_type == 'newsletter':
-                return self._render_newsletter(params)
-            elif component_type == 'modal':
-                return self._render_modal(params)
-            elif component_type == 'data_editor':
-                return self._render_data_editor(params)
-            else:
+            renderer = self.registry.user_component(component_type)
+            if renderer is None:
                 return f'<!-- Unknown component: {component_type} -->'
+            return renderer(**params)
         except Exception as e:
             return f'<!-- Error rendering {component_type}: {str(e)} -->'
     
@@ -112,12 +131,12 @@ class ComponentProcessor:
     <button class="btn btn-primary mt-2" onclick="saveData('{{ source }}')">Save</button>
 </div>
 """
-        template = Template(template_str)
+        template = self.registry.template('data_editor', template_str)
         return template.render(source=source, headers=headers, data=data)
 
     def _render_hero(self, params: Dict[str, Any]) -> str:
         """Render hero section"""
-        template = Template("""
+        template = self.registry.template('hero', """
 <div class="hero-section py-5 mb-5" style="background: linear-gradient(rgba(0,0,0,0.5), rgba(0,0,0,0.5)), url('{{ bg_image }}') center/cover;">
     <div class="container">
         <div class="row justify-content-center text-center text-white">
@@ -143,7 +162,7 @@ class ComponentProcessor:
     
     def _render_card(self, params: Dict[str, Any]) -> str:
         """Render card component"""
-        template = Template("""
+        template = self.registry.template('card', """
 <div class="col-md-{{ width or '4' }} mb-4">
     <div class="card h-100 shadow-sm">
         {% if image %}
@@ -171,7 +190,7 @@ class ComponentProcessor:
     
     def _render_cta(self, params: Dict[str, Any]) -> str:
         """Render call-to-action section"""
-        template = Template("""
+        template = self.registry.template('cta', """
 <div class="cta-section py-5 my-5 bg-{{ bg_color or 'primary' }} text-white text-center">
     <div class="container">
         <div class="row justify-content-center">
@@ -198,7 +217,7 @@ class ComponentProcessor:
     
     def _render_feature(self, params: Dict[str, Any]) -> str:
         """Render feature section"""
-        template = Template("""
+        template = self.registry.template('feature', """
 <div class="col-md-{{ width or '4' }} mb-4 text-center">
     {% if icon %}
     <div class="feature-icon mb-3">
@@ -213,7 +232,7 @@ class ComponentProcessor:
     
     def _render_testimonial(self, params: Dict[str, Any]) -> str:
         """Render testimonial component"""
-        template = Template("""
+        template = self.registry.template('testimonial', """
 <div class="col-md-{{ width or '6' }} mb-4">
     <div class="testimonial-card p-4 bg-light rounded">
         <blockquote class="blockquote">
@@ -235,7 +254,7 @@ class ComponentProcessor:
     
     def _render_pricing(self, params: Dict[str, Any]) -> str:
         """Render pricing card"""
-        template = Template("""
+        template = self.registry.template('pricing', """
 <div class="col-md-{{ width or '4' }} mb-4">
     <div class="card pricing-card h-100 text-center{% if featured %} border-primary{% endif %}">
         {% if featured %}
@@ -276,7 +295,7 @@ class ComponentProcessor:
     
     def _render_gallery(self, params: Dict[str, Any]) -> str:
         """Render image gallery"""
-        template = Template("""
+        template = self.registry.template('gallery', """
 <div class="col-md-{{ width or '3' }} mb-4">
     <div class="gallery-item">
         <img src="{{ image }}" class="img-fluid rounded shadow-sm" alt="{{ title or 'Gallery image' }}" 
@@ -291,7 +310,7 @@ class ComponentProcessor:
     
     def _render_contact(self, params: Dict[str, Any]) -> str:
         """Render contact information"""
-        template = Template("""
+        template = self.registry.template('contact', """
 <div class="col-md-{{ width or '4' }} mb-4 text-center">
     {% if icon %}
     <div class="contact-icon mb-3">
@@ -311,7 +330,7 @@ class ComponentProcessor:
     
     def _render_newsletter(self, params: Dict[str, Any]) -> str:
         """Render newsletter signup"""
-        template = Template("""
+        template = self.registry.template('newsletter', """
 <div class="newsletter-section p-4 bg-light rounded">
     <div class="row align-items-center">
         <div class="col-md-8">
@@ -335,7 +354,7 @@ class ComponentProcessor:
         modal_id = params.get('id', 'defaultModal')
         form_type = params.get('form_type', 'contact')
         
-        template = Template("""
+        template = self.registry.template('modal', """
 <div class="modal fade" id="{{ modal_id }}" tabindex="-1">
     <div class="modal-dialog">
         <div class="modal-content">
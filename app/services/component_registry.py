@@ -0,0 +1,91 @@
+"""Registry of compiled component templates"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from jinja2 import Environment, Template, TemplateNotFound
+
+OUTPUT_CACHE_SIZE = 1024
+
+
+class ComponentRegistry:
+    """Compile each component template once and reuse it.
+
+    Built-in components are compiled from their source strings on first use.
+    User-defined components are loaded from ``templates/components/<name>.html``
+    through the shared templates environment, which recompiles them when the
+    file changes. Rendered output of built-ins is memoized per
+    (type, params) since the same CTA or card is often repeated across pages.
+    """
+
+    def __init__(self, components_dir: str = "components"):
+        self.components_dir = components_dir
+        # Same defaults as jinja2.Template(): no autoescaping
+        self.environment = Environment()
+        self._compiled: Dict[str, Template] = {}
+        self._outputs: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def template(self, name: str, source: str) -> Template:
+        """Return the compiled template for a built-in component"""
+        template = self._compiled.get(name)
+        if template is None:
+            template = self.environment.from_string(source)
+            self._compiled[name] = template
+        return template
+
+    def user_component(self, name: str) -> Optional[Callable[..., str]]:
+        """Return a renderer for templates/components/<name>.html, if it exists.
+
+        A file defining a macro of the same name is called as that macro,
+        otherwise the whole template is rendered with the parameters.
+        """
+        from app.deps import get_templates
+        try:
+            template = get_templates().get_template(f"{self.components_dir}/{name}.html")
+        except TemplateNotFound:
+            return None
+
+        macro = getattr(template.module, name, None)
+        if callable(macro):
+            def render_macro(**params):
+                # Macros reject unknown keyword arguments
+                return str(macro(**{k: v for k, v in params.items() if k in macro.arguments}))
+            return render_macro
+        return template.render
+
+    def cached_output(self, key: Hashable) -> Optional[str]:
+        """Return memoized component HTML, or None"""
+        with self._lock:
+            html = self._outputs.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._outputs.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def store_output(self, key: Hashable, html: str):
+        """Memoize component HTML, evicting the least recently used entry"""
+        with self._lock:
+            self._outputs[key] = html
+            self._outputs.move_to_end(key)
+            if len(self._outputs) > OUTPUT_CACHE_SIZE:
+                self._outputs.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return registry counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'compiled': len(self._compiled),
+            'outputs': len(self._outputs),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Shared by every ComponentProcessor in the process
+component_registry = ComponentRegistry()
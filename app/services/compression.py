@@ -0,0 +1,213 @@
+"""Precompressed (gzip / brotli) response variants"""
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional
+
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.responses import FileResponse, HTMLResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from app.deps import get_config
+from app.services.async_io import run_io
+from app.services.render_cache import render_cache
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is always available
+    brotli = None
+
+# Server preference when the client accepts several encodings equally
+PREFERRED_ENCODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'application/xml',
+                      'image/svg+xml')
+
+
+def _compression_config() -> Dict[str, Any]:
+    return (get_config() or {}).get('compression', {}) or {}
+
+
+def min_size() -> int:
+    """Bodies smaller than this are not worth compressing"""
+    return int(_compression_config().get('min_size', 1024))
+
+
+def compress(body: bytes, encoding: str, dynamic: bool = False) -> bytes:
+    """Compress a body once; variants are reused.
+
+    Static assets use the highest levels. Rendered pages (``dynamic``) are
+    recompressed whenever the nav or config changes, on a request's path,
+    so they use much faster levels that cost a few percent in size.
+    """
+    config = _compression_config()
+    if encoding == 'br':
+        quality = config.get('page_brotli_quality', 5) if dynamic else config.get('brotli_quality', 11)
+        return brotli.compress(body, quality=int(quality))
+    level = config.get('page_gzip_level', 6) if dynamic else config.get('gzip_level', 9)
+    # mtime=0 keeps the output, and so its ETag, identical across runs
+    return gzip.compress(body, compresslevel=int(level), mtime=0)
+
+
+def negotiate(accept_encoding: Optional[str], available: Iterable[str] = PREFERRED_ENCODINGS) -> Optional[str]:
+    """Pick the best encoding the client accepts, or None for identity"""
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    """ETag of an encoded representation (strong ETags differ per encoding)"""
+    return f'{etag[:-1]}-{encoding}"' if etag.endswith('"') else f'{etag}-{encoding}'
+
+
+def encoded_response(body: bytes, encoding: Optional[str], media_type: str,
+                     headers: Dict[str, str], status_code: int = 200) -> Response:
+    """Build a response for one representation of a compressible resource"""
+    headers = dict(headers)
+    headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        headers['Content-Encoding'] = encoding
+        if 'ETag' in headers:
+            headers['ETag'] = variant_etag(headers['ETag'], encoding)
+    return Response(body, status_code=status_code, media_type=media_type, headers=headers)
+
+
+async def page_response(request: Request, html: str, headers: Dict[str, str],
+                        cache_key: Hashable = None) -> HTMLResponse:
+    """Serve rendered page HTML, using precompressed variants for cacheable pages.
+
+    A variant is compressed on the first request that accepts it and then
+    kept in the render cache entry, so it is dropped along with the HTML
+    when the page changes.
+    """
+    if cache_key is None:
+        return HTMLResponse(html, headers=headers)
+
+    encoding = negotiate(request.headers.get('accept-encoding'))
+    if encoding is None or len(html) < min_size():
+        return HTMLResponse(html, headers={**headers, 'Vary': 'Accept-Encoding'})
+
+    body = render_cache.variant(cache_key, encoding)
+    if body is None:
+        body = await run_io(compress, html.encode('utf-8'), encoding, True)
+        render_cache.put_variant(cache_key, encoding, body)
+    return encoded_response(body, encoding, 'text/html', headers)
+
+
+class VariantCache:
+    """Bounded LRU of compressed bodies, capped by their total size"""
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key: Hashable, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= len(previous)
+            self._entries[key] = body
+            self.current_bytes += len(body)
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Compressed static assets, keyed by path, mtime, size and encoding
+static_variants = VariantCache(int(_compression_config().get('static_max_mb', 32)) * 1024 * 1024)
+
+
+def _static_variant(path: str, stat: os.stat_result, encoding: str) -> bytes:
+    key = (path, stat.st_mtime_ns, stat.st_size, encoding)
+    body = static_variants.get(key)
+    if body is None:
+        with open(path, 'rb') as f:
+            body = compress(f.read(), encoding)
+        static_variants.put(key, body)
+    return body
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves compressible assets gzip/brotli-encoded.
+
+    Each asset is compressed once per (mtime, size) and kept in memory, so
+    an edited file is recompressed on its next request and untouched files
+    never are. Range requests and small or binary files are served as-is.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = await super().get_response(path, scope)
+        if not isinstance(response, FileResponse) or response.status_code != 200:
+            return response
+
+        media_type = response.media_type or ''
+        stat = response.stat_result
+        if not media_type.startswith(COMPRESSIBLE_TYPES) or stat is None or stat.st_size < min_size():
+            return response
+
+        request_headers = Headers(scope=scope)
+        response.headers['Vary'] = 'Accept-Encoding'
+        encoding = negotiate(request_headers.get('accept-encoding'))
+        if encoding is None or 'range' in request_headers:
+            return response
+
+        headers = {}
+        if 'etag' in response.headers:
+            headers['ETag'] = response.headers['etag']
+            etag = variant_etag(headers['ETag'], encoding)
+            if etag in request_headers.get('if-none-match', ''):
+                return NotModifiedResponse(Headers({'etag': etag, 'vary': 'Accept-Encoding'}))
+        if 'last-modified' in response.headers:
+            headers['Last-Modified'] = response.headers['last-modified']
+
+        body = await run_io(_static_variant, str(response.path), stat, encoding)
+        return encoded_response(body, encoding, media_type, headers)
@@ -0,0 +1,83 @@
+"""Cached, hot-reloadable access to config.yaml"""
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Any, Mapping
+
+import yaml
+
+from app.services.frozen import freeze
+
+
+class ConfigService:
+    """Load the site configuration once and serve an immutable snapshot.
+
+    The file is re-read only when its mtime or size changes (checked at most
+    every ``check_interval`` seconds) or when ``reload`` is called after the
+    CMS writes it. ``version`` increases on every reload that changes the
+    content, so caches can key on it; ``fingerprint`` is a hash of the file
+    for caches that outlive the process, and ``last_modified`` its mtime.
+    """
+
+    def __init__(self, config_path: str = "config.yaml", check_interval: float = 1.0):
+        self.config_path = Path(config_path)
+        self.check_interval = check_interval
+        self.version = 0
+        self.fingerprint = None
+        self.last_modified = 0.0
+        self._snapshot: Mapping[str, Any] = freeze({})
+        self._file_state = None
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Mapping[str, Any]:
+        """Return the current configuration snapshot"""
+        now = time.monotonic()
+        if self._checked is None or now - self._checked >= self.check_interval:
+            with self._lock:
+                if self._checked is None or now - self._checked >= self.check_interval:
+                    if self._stat() != self._file_state:
+                        self._load()
+                    self._checked = now
+        return self._snapshot
+
+    def reload(self) -> Mapping[str, Any]:
+        """Re-read the file immediately, e.g. after saving settings"""
+        with self._lock:
+            self._load()
+            self._checked = time.monotonic()
+        return self._snapshot
+
+    def _stat(self):
+        try:
+            stat = self.config_path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self):
+        file_state = self._stat()
+        raw = b''
+        data = {}
+        if file_state is not None:
+            raw = self.config_path.read_bytes()
+            try:
+                data = yaml.safe_load(raw) or {}
+            except yaml.YAMLError as e:
+                # Keep serving the last good snapshot
+                print(f"YAML parsing error in {self.config_path}: {e}")
+                self._file_state = file_state
+                return
+
+        fingerprint = hashlib.sha256(raw).hexdigest()
+        if fingerprint != self.fingerprint:
+            self._snapshot = freeze(data)
+            self.fingerprint = fingerprint
+            self.last_modified = file_state[0] / 1e9 if file_state else 0.0
+            self.version += 1
+        self._file_state = file_state
+
+
+# Shared by get_config() and everything that keys caches on the config version
+config_service = ConfigService()
@@ -1,47 +1,103 @@
 from pathlib import Path
 import yaml
 import os
+import hashlib
 from typing import Dict, Any, Tuple, Optional
 from datetime import datetime
 from .component_processor import ComponentProcessor
+from .page_store import page_store
+from .front_matter import front_matter_cache
+from .routing import get_route_index
+from .page_catalog import get_page_catalog
+from .dependencies import dependency_graph, find_content_sources
+from .async_io import run_io
 
 class ContentLoader:
     def __init__(self, content_dir: str = "content/pages"):
         self.content_dir = Path(content_dir)
         self.content_dir.mkdir(parents=True, exist_ok=True)
         self.component_processor = ComponentProcessor()
+        self.page_store = page_store
+        self.front_matter_cache = front_matter_cache
+        self.routes = get_route_index(self.content_dir)
+        self.catalog = get_page_catalog(self.content_dir)
+    
+    def resolve_file(self, slug: str) -> Optional[Path]:
+        """Map a URL slug to its markdown file via the routing index"""
+        return self.routes.resolve(slug)
+    
+    def default_slug(self, file_path) -> str:
+        """Slug of a page without a front-matter slug: its path below the content directory"""
+        relative = Path(os.path.relpath(file_path, self.content_dir)).with_suffix('')
+        # guides/index.md is the /guides page; the top-level index keeps its name
+        if relative.name == 'index' and relative.parent != Path('.'):
+            relative = relative.parent
+        return relative.as_posix()
     
     def load_page(self, slug: str) -> Tuple[Dict[str, Any], str]:
         """Load a page by slug, returning metadata and content"""
-        # Handle root/index page
-        if slug in ("", "/"):
-            slug = "index"
-        
-        # Convert slug to file path
-        safe_slug = slug.strip('/').replace('/', '_')
-        file_path = self.content_dir / f"{safe_slug}.md"
-        
-        if not file_path.exists():
+        file_path = self.resolve_file(slug)
+        if file_path is None:
             raise FileNotFoundError(f"Page not found: {slug}")
         
-        return self._parse_markdown_file(file_path)
+        try:
+            return self._parse_markdown_file(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Page not found: {slug}")
     
     def load_page_by_path(self, file_path: str) -> Tuple[Dict[str, Any], str]:
         """Load a page by file path"""
-        path = Path(file_path)
-        if not path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
+        return self._parse_markdown_file(Path(file_path))
+    
+    async def load_page_async(self, slug: str) -> Tuple[Dict[str, Any], str]:
+        """Load a page by slug without blocking the event loop"""
+        if self.routes.needs_refresh():
+            return await run_io(self.load_page, slug)
         
-        return self._parse_markdown_file(path)
+        file_path = self.resolve_file(slug)
+        if file_path is None:
+            raise FileNotFoundError(f"Page not found: {slug}")
+        cached = self.page_store.peek(file_path)
+        if cached is not None:
+            return cached
+        return await run_io(self.load_page, slug)
+    
+    async def load_page_by_path_async(self, file_path: str) -> Tuple[Dict[str, Any], str]:
+        """Load a page by file path without blocking the event loop"""
+        cached = self.page_store.peek(file_path)
+        if cached is not None:
+            return cached
+        return await run_io(self.load_page_by_path, file_path)
     
     def _parse_markdown_file(self, file_path: Path) -> Tuple[Dict[str, Any], str]:
-        """Parse a markdown file with YAML front-matter"""
+        """Parse a markdown file with YAML front-matter, served from the page store when unchanged"""
+        return self.page_store.get(file_path, self._read_markdown_file)
+    
+    def _read_markdown_file(self, file_path: Path, stat: os.stat_result) -> Tuple[Dict[str, Any], str]:
+        """Read and parse a markdown file from disk"""
         try:
             content = file_path.read_text(encoding='utf-8')
         except Exception as e:
             raise Exception(f"Error reading file {file_path}: {e}")
         
-        # Split front-matter and content
+        metadata, body = self.parse_text(content, file_path)
+        
+        # Add file metadata
+        metadata.update({
+            'file_path': str(file_path),
+            'modified_time': datetime.fromtimestamp(stat.st_mtime),
+            'file_size': stat.st_size,
+            'content_hash': hashlib.sha256(content.encode('utf-8')).hexdigest()
+        })
+        
+        # Process components in the body content
+        dependency_graph.record_content_sources(file_path, find_content_sources(body))
+        body = self.component_processor.process_content(body)
+        
+        return metadata, body
+    
+    def parse_text(self, content: str, source) -> Tuple[Dict[str, Any], str]:
+        """Split page text into front-matter metadata and the raw markdown body"""
         if content.startswith('---'):
             parts = content.split('---', 2)
             if len(parts) >= 3:
@@ -52,7 +108,7 @@ class ContentLoader:
                     metadata = yaml.safe_load(front_matter) or {}
                 except yaml.YAMLError as e:
                     metadata = {}
-                    print(f"YAML parsing error in {file_path}: {e}")
+                    print(f"YAML parsing error in {source}: {e}")
             else:
                 metadata = {}
                 body = content
@@ -60,17 +116,6 @@ class ContentLoader:
             metadata = {}
             body = content
         
-        # Add file metadata
-        stat = file_path.stat()
-        metadata.update({
-            'file_path': str(file_path),
-            'modified_time': datetime.fromtimestamp(stat.st_mtime),
-            'file_size': stat.st_size
-        })
-        
-        # Process components in the body content
-        body = self.component_processor.process_content(body)
-        
         return metadata, body
     
     def save_page(self, file_path: str, content: str, metadata: Dict[str, Any] = None):
@@ -82,7 +127,7 @@ class ContentLoader:
         if metadata:
             # Remove file-specific metadata before saving
             clean_metadata = {k: v for k, v in metadata.items() 
-                            if k not in ['file_path', 'modified_time', 'file_size']}
+                            if k not in ['file_path', 'modified_time', 'file_size', 'content_hash']}
             
             front_matter = yaml.dump(clean_metadata, default_flow_style=False)
             full_content = f"---\n{front_matter}---\n{content}"
@@ -90,28 +135,47 @@ class ContentLoader:
             full_content = content
         
         path.write_text(full_content, encoding='utf-8')
+        self.page_store.invalidate(path)
+        self.routes.update(path)
+        self.catalog.upsert(path)
     
-    def list_pages(self) -> list:
-        """List all pages in the content directory"""
+    def list_page_metadata(self) -> list:
+        """Return the metadata of every page in the content directory"""
         pages = []
-        for file_path in self.content_dir.glob("*.md"):
+        for file_path in self.content_dir.rglob("*.md"):
             try:
                 metadata, _ = self._parse_markdown_file(file_path)
-                slug = metadata.get('slug', file_path.stem)
-                pages.append({
-                    'file_path': str(file_path),
-                    'slug': slug,
-                    'title': metadata.get('title', file_path.stem),
-                    'modified_time': metadata.get('modified_time'),
-                    'draft': metadata.get('draft', False)
-                })
+                pages.append(metadata)
             except Exception as e:
                 print(f"Error loading {file_path}: {e}")
         
-        return sorted(pages, key=lambda x: x.get('modified_time', datetime.min), reverse=True)
+        return pages
+    
+    def list_pages(self, limit: Optional[int] = None, offset: int = 0) -> list:
+        """List pages in the content directory, newest first, from the page catalog"""
+        pages = []
+        for metadata in self.catalog.pages(limit=limit, offset=offset):
+            file_path = Path(metadata['file_path'])
+            slug = metadata.get('slug', self.default_slug(file_path))
+            pages.append({
+                'file_path': str(file_path),
+                'slug': slug,
+                'title': metadata.get('title', file_path.stem),
+                'modified_time': metadata.get('modified_time'),
+                'draft': metadata.get('draft', False)
+            })
+        
+        return pages
+    
+    async def list_pages_async(self, limit: Optional[int] = None, offset: int = 0) -> list:
+        """List pages without blocking the event loop"""
+        return await run_io(self.list_pages, limit, offset)
     
     def delete_page(self, file_path: str):
         """Delete a page file"""
         path = Path(file_path)
         if path.exists():
             path.unlink()
+        self.page_store.invalidate(path)
+        self.routes.remove(path)
+        self.catalog.remove(path)
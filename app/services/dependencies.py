@@ -0,0 +1,159 @@
+"""Dependency graph between rendered pages and the files they are built from"""
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, Set
+
+from jinja2 import meta
+
+from app.services.page_store import page_store
+from app.services.render_cache import render_cache
+
+DATA_SOURCE_PATTERN = re.compile(r'\[data_editor\b[^\]]*?\bsource=(?:"([^"]*)"|([^\s\]]+))', re.IGNORECASE)
+COMPONENT_PATTERN = re.compile(r'\[([a-zA-Z_]+)')
+
+
+def find_content_sources(body: str, data_dir: str = "content/data",
+                         components_dir: str = "templates/components") -> FrozenSet[str]:
+    """Return the files a page body's components are expanded from.
+
+    These are the data files of [data_editor source=...] components and the
+    templates of user-defined components that exist on disk.
+    """
+    sources = {
+        os.path.abspath(os.path.join(data_dir, f"{quoted or bare}.yml"))
+        for quoted, bare in DATA_SOURCE_PATTERN.findall(body)
+    }
+    for name in {name.lower() for name in COMPONENT_PATTERN.findall(body)}:
+        template = os.path.join(components_dir, f"{name}.html")
+        if os.path.exists(template):
+            sources.add(os.path.abspath(template))
+    return frozenset(sources)
+
+
+class DependencyGraph:
+    """Track what each page output depends on.
+
+    A page depends on its own file, on the layout it was rendered with plus
+    every template that layout extends, includes or imports, and on the
+    sources its components are expanded from (data files and user component
+    templates), which are baked into the parsed page body. Every page also
+    shows the navigation, which callers version separately (see
+    ``NavigationBuilder.version``).
+    """
+
+    def __init__(self, templates_dir: str = "templates"):
+        self.templates_dir = templates_dir
+        self._page_templates: Dict[str, str] = {}
+        self._page_sources: Dict[str, FrozenSet[str]] = {}
+        self._template_files: Dict[str, FrozenSet[str]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(file_path) -> str:
+        return os.path.abspath(str(file_path))
+
+    def record_content_sources(self, page_path, sources: Iterable[str]):
+        """Remember the files a page's components were expanded from"""
+        with self._lock:
+            self._page_sources[self._key(page_path)] = frozenset(sources)
+
+    def record_template(self, page_path, template_name: str):
+        """Remember the layout template a page was rendered with"""
+        with self._lock:
+            self._page_templates[self._key(page_path)] = template_name
+
+    def forget(self, page_path):
+        """Drop everything known about a removed page"""
+        key = self._key(page_path)
+        with self._lock:
+            self._page_templates.pop(key, None)
+            self._page_sources.pop(key, None)
+
+    def template_files(self, name: str) -> FrozenSet[str]:
+        """Return the files a template renders from, following extends/include/import"""
+        cached = self._template_files.get(name)
+        if cached is not None:
+            return cached
+
+        from app.deps import get_templates
+        environment = get_templates()
+        files: Set[str] = set()
+        pending = [name]
+        seen = set()
+        while pending:
+            current = pending.pop()
+            if current in seen:
+                continue
+            seen.add(current)
+            files.add(self._key(Path(self.templates_dir) / current))
+            try:
+                source, _, _ = environment.loader.get_source(environment, current)
+                referenced = meta.find_referenced_templates(environment.parse(source))
+            except Exception as e:
+                print(f"Error resolving template dependencies for {current}: {e}")
+                continue
+            # Dynamic references (None) cannot be resolved statically
+            pending.extend(ref for ref in referenced if ref)
+
+        result = frozenset(files)
+        self._template_files[name] = result
+        return result
+
+    def dependencies(self, page_path) -> FrozenSet[str]:
+        """Return every file a page output depends on, including itself"""
+        key = self._key(page_path)
+        files = {key}
+        template = self._page_templates.get(key)
+        if template:
+            files |= self.template_files(template)
+        files |= self._page_sources.get(key, frozenset())
+        return frozenset(files)
+
+    def source_dependents(self, changed_path) -> Set[str]:
+        """Return the pages whose parsed body embeds a changed file"""
+        key = self._key(changed_path)
+        with self._lock:
+            return {page for page, sources in self._page_sources.items() if key in sources}
+
+    def affected_pages(self, changed_path) -> Set[str]:
+        """Return the pages whose output depends on a changed file"""
+        key = self._key(changed_path)
+        with self._lock:
+            pages = set(self._page_templates) | set(self._page_sources)
+        affected = {page for page in pages if key in self.dependencies(page)}
+        if key.endswith('.md'):
+            affected.add(key)
+        return affected
+
+    def invalidate_templates(self):
+        """Forget resolved template closures after a template changed"""
+        self._template_files.clear()
+
+
+# Shared by the content loader, the public routes and the CMS
+dependency_graph = DependencyGraph()
+
+
+def invalidate_dependents(changed_path) -> Set[str]:
+    """Drop cached pages and renders that depend on a changed file"""
+    affected = dependency_graph.affected_pages(changed_path)
+    is_template = Path(changed_path).parts[:1] == ('templates',)
+
+    # Component-expanded bodies embed their sources, so those parsed pages go too
+    reparse = dependency_graph.source_dependents(changed_path)
+    if str(changed_path).endswith('.md'):
+        reparse.add(changed_path)
+    for page in reparse:
+        page_store.invalidate(page)
+
+    for page in affected:
+        render_cache.invalidate_path(page)
+
+    if is_template:
+        dependency_graph.invalidate_templates()
+    elif not Path(changed_path).exists():
+        dependency_graph.forget(changed_path)
+
+    return affected
@@ -0,0 +1,108 @@
+"""Front-matter-only reading of markdown pages"""
+import codecs
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+import yaml
+
+# libyaml's loader when available: listings parse front matter for every page
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+DELIMITER = '---'
+READ_CHUNK = 4096
+
+
+def read_front_matter(file_path: Path) -> Dict[str, Any]:
+    """Parse a page's YAML front matter without reading the body.
+
+    The file is read in small chunks only until the closing ``---``, using
+    the same split rule as ``ContentLoader`` so both always agree.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    text = ''
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            text += decoder.decode(chunk, final=not chunk)
+            if len(text) >= len(DELIMITER) and not text.startswith(DELIMITER):
+                return {}
+            closing = text.find(DELIMITER, len(DELIMITER))
+            if closing != -1:
+                break
+            if not chunk:
+                # No closing delimiter: the whole file is body
+                return {}
+
+    try:
+        metadata = yaml.load(text[len(DELIMITER):closing].strip(), Loader=SafeLoader) or {}
+    except yaml.YAMLError as e:
+        print(f"YAML parsing error in {file_path}: {e}")
+        return {}
+    if not isinstance(metadata, dict):
+        raise ValueError(f"Front matter of {file_path} is not a mapping")
+    return metadata
+
+
+class FrontMatterCache:
+    """Keep each page's front matter, validated against its mtime and size.
+
+    Listings (navigation, sitemap, dashboard) only need titles, slugs and
+    flags, so they read through this cache instead of the page store and
+    never load or component-process page bodies.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        # Bumped whenever a cached entry is added, replaced or dropped
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, file_path: Path) -> Dict[str, Any]:
+        """Return front matter plus file metadata, re-reading only changed files"""
+        key = os.path.abspath(str(file_path))
+        stat = file_path.stat()
+        entry = self._entries.get(key)
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            self.hits += 1
+            return dict(entry['metadata'])
+
+        metadata = read_front_matter(file_path)
+        metadata.update({
+            'file_path': str(file_path),
+            'modified_time': datetime.fromtimestamp(stat.st_mtime),
+            'file_size': stat.st_size
+        })
+        with self._lock:
+            self._entries[key] = {'metadata': metadata, 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+            self.generation += 1
+            self.misses += 1
+        return dict(metadata)
+
+    def prune(self, directory: Path, live_paths):
+        """Drop entries under a directory whose files no longer exist"""
+        prefix = os.path.join(os.path.abspath(str(directory)), '')
+        live = {os.path.abspath(str(path)) for path in live_paths}
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix) and key not in live]:
+                del self._entries[key]
+                self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'generation': self.generation
+        }
+
+
+# Shared by every ContentLoader in the process
+front_matter_cache = FrontMatterCache()
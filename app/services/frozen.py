@@ -0,0 +1,11 @@
+"""Read-only views of nested configuration and metadata structures"""
+from types import MappingProxyType
+
+
+def freeze(value):
+    """Recursively convert dicts and lists into read-only equivalents"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
@@ -0,0 +1,209 @@
+"""Reading and writing the git index (``.git/index``) in-process"""
+import hashlib
+import os
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+ENTRY_HEADER = struct.Struct('>10I20sH')
+EXTENDED_FLAG = 0x4000
+STAGE_MASK = 0x3000
+NAME_MASK = 0x0FFF
+INTENT_TO_ADD = 0x2000
+SKIP_WORKTREE = 0x4000
+
+
+class UnsupportedIndex(Exception):
+    """The index uses a feature this module does not handle; use the git CLI instead"""
+
+
+class IndexEntry(NamedTuple):
+    ctime_s: int
+    ctime_ns: int
+    mtime_s: int
+    mtime_ns: int
+    dev: int
+    ino: int
+    mode: int
+    uid: int
+    gid: int
+    size: int
+    sha: bytes
+    flags: int
+    extended_flags: int
+    path: bytes
+
+
+def entry_for(path: bytes, sha: str, stat: os.stat_result, mode: int) -> IndexEntry:
+    """Build an index entry from a file's stat data, as ``git add`` records it"""
+    mask = 0xFFFFFFFF
+    return IndexEntry(
+        int(stat.st_ctime) & mask, stat.st_ctime_ns % 1000000000,
+        int(stat.st_mtime) & mask, stat.st_mtime_ns % 1000000000,
+        stat.st_dev & mask, stat.st_ino & mask, mode,
+        stat.st_uid & mask, stat.st_gid & mask, stat.st_size & mask,
+        bytes.fromhex(sha), min(len(path), NAME_MASK), 0, path
+    )
+
+
+class GitIndex:
+    """The stage-0 entries of a version 2 or 3 index.
+
+    Optional extensions (cached trees, untracked cache, ...) are dropped on
+    write, which git accepts and rebuilds on demand. Indexes git itself
+    could not safely round-trip here (version 4, split or sparse indexes,
+    unresolved merge conflicts) raise ``UnsupportedIndex``.
+    """
+
+    def __init__(self, git_dir: Path):
+        self.git_dir = Path(git_dir)
+        self.path = self.git_dir / 'index'
+        self.version = 2
+        self.entries: Dict[bytes, IndexEntry] = {}
+        self._stamp = None
+        # Descriptor of the held index.lock while inside ``locked()``
+        self._lock_fd: Optional[int] = None
+
+    @contextmanager
+    def locked(self):
+        """Hold git's index.lock while the index is loaded, changed and written back.
+
+        Loading only after the lock is taken means two writers cannot both
+        start from the same old index and have the second drop the first
+        one's change.
+        """
+        lock_path = self.path.with_name('index.lock')
+        try:
+            fd = os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            raise UnsupportedIndex("index.lock exists; another git process is running")
+        self._lock_fd = fd
+        try:
+            self.load()
+            yield self
+        finally:
+            if self._lock_fd is not None:
+                # Not written back: release the lock and leave the index as it was
+                os.close(self._lock_fd)
+                self._lock_fd = None
+                os.unlink(lock_path)
+
+    def load(self):
+        """(Re)read the index file if it changed since the last load"""
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            self.version, self.entries, self._stamp = 2, {}, None
+            return
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if stamp == self._stamp:
+            return
+
+        data = self.path.read_bytes()
+        if data[:4] != b'DIRC' or hashlib.sha1(data[:-20]).digest() != data[-20:]:
+            raise UnsupportedIndex("index signature or checksum mismatch")
+        version, count = struct.unpack('>II', data[4:12])
+        if version not in (2, 3):
+            raise UnsupportedIndex(f"index version {version}")
+
+        entries = {}
+        position = 12
+        for _ in range(count):
+            fields = ENTRY_HEADER.unpack_from(data, position)
+            flags = fields[11]
+            start = position + ENTRY_HEADER.size
+            extended_flags = 0
+            if flags & EXTENDED_FLAG:
+                extended_flags = struct.unpack_from('>H', data, start)[0]
+                start += 2
+            end = data.index(b'\0', start)
+            path = data[start:end]
+            if flags & STAGE_MASK:
+                raise UnsupportedIndex("index has unresolved conflicts")
+            entries[path] = IndexEntry(*fields, extended_flags, path)
+            # Entries are NUL-padded to a multiple of eight bytes
+            position += ((end - position) // 8 + 1) * 8
+
+        while position < len(data) - 20:
+            signature = data[position:position + 4]
+            size = struct.unpack_from('>I', data, position + 4)[0]
+            if not signature[:1].isupper():
+                # Lowercase extensions (link, sdir) are required to read the index correctly
+                raise UnsupportedIndex(f"index extension {signature!r}")
+            position += 8 + size
+
+        self.version, self.entries, self._stamp = version, entries, stamp
+
+    def write(self):
+        """Write the entries back atomically through the index.lock held by ``locked()``"""
+        version = 3 if any(entry.extended_flags for entry in self.entries.values()) else self.version
+        parts = [b'DIRC', struct.pack('>II', version, len(self.entries))]
+        for path in sorted(self.entries):
+            entry = self.entries[path]
+            flags = (entry.flags & ~(EXTENDED_FLAG | NAME_MASK)) | min(len(path), NAME_MASK)
+            if entry.extended_flags:
+                flags |= EXTENDED_FLAG
+            raw = ENTRY_HEADER.pack(*entry[:11], flags)
+            if entry.extended_flags:
+                raw += struct.pack('>H', entry.extended_flags)
+            raw += path
+            parts.append(raw + b'\0' * (8 - len(raw) % 8))
+        body = b''.join(parts)
+
+        if self._lock_fd is None:
+            raise RuntimeError("GitIndex.write() called without holding index.lock")
+        with os.fdopen(self._lock_fd, 'wb', closefd=False) as f:
+            f.write(body + hashlib.sha1(body).digest())
+        os.replace(self.path.with_name('index.lock'), self.path)
+        os.close(self._lock_fd)
+        self._lock_fd = None
+        stat = self.path.stat()
+        self._stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def add(self, path: bytes, sha: str, stat: os.stat_result, executable: Optional[bool] = None):
+        """Stage a regular file; ``executable=None`` keeps the mode already staged"""
+        current = self.entries.get(path)
+        if current is not None and current.extended_flags & SKIP_WORKTREE:
+            # git refuses or ignores these depending on sparse-checkout settings
+            raise UnsupportedIndex(f"{path.decode('utf-8', 'replace')} is marked skip-worktree")
+        if executable is None:
+            mode = current.mode if current else 0o100644
+        else:
+            mode = 0o100755 if executable else 0o100644
+        entry = entry_for(path, sha, stat, mode)
+        if current is not None:
+            # Keep the entry's extended flags; adding the content resolves `git add -N`
+            entry = entry._replace(extended_flags=current.extended_flags & ~INTENT_TO_ADD)
+        self.entries[path] = entry
+
+    def remove(self, path: bytes) -> bool:
+        """Unstage a path; returns whether it was tracked"""
+        return self.entries.pop(path, None) is not None
+
+    def write_tree(self, store: Callable[[str, bytes], str]) -> str:
+        """Write tree objects for the staged entries and return the root tree"""
+        root: Dict[bytes, object] = {}
+        for path, entry in self.entries.items():
+            if entry.extended_flags & INTENT_TO_ADD:
+                # `git add -N` placeholders are not committed
+                continue
+            node = root
+            *directories, name = path.split(b'/')
+            for directory in directories:
+                node = node.setdefault(directory, {})
+            node[name] = entry
+        return self._write_tree(root, store)
+
+    def _write_tree(self, node: Dict[bytes, object], store: Callable[[str, bytes], str]) -> str:
+        items: List[Tuple[bytes, bytes, bytes]] = []
+        for name, child in node.items():
+            if isinstance(child, dict):
+                sha = bytes.fromhex(self._write_tree(child, store))
+                # Trees sort as if directory names ended in '/'
+                items.append((name + b'/', b'40000 ' + name, sha))
+            else:
+                items.append((name, format(child.mode, 'o').encode('ascii') + b' ' + name, child.sha))
+        items.sort()
+        return store('tree', b''.join(header + b'\0' + sha for _, header, sha in items))
+
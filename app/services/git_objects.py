@@ -0,0 +1,258 @@
+"""Git object and ref access without spawning a process per operation"""
+import atexit
+import hashlib
+import os
+import subprocess
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+NULL_SHA = '0' * 40
+# Length of abbreviated object names, as in `git log --oneline`
+ABBREV = 7
+
+
+class Commit(NamedTuple):
+    sha: str
+    tree: str
+    parents: Tuple[str, ...]
+    author: str
+    committer: str
+    message: str
+
+
+class TreeEntry(NamedTuple):
+    mode: str
+    name: str
+    sha: str
+
+
+class CatFileBatch:
+    """Object reads through one long-lived ``git cat-file --batch`` process.
+
+    The process resolves any revision expression (``HEAD~1``,
+    ``<sha>:<path>``) and reads loose and packed objects alike, so history
+    and blob lookups cost a pipe round trip instead of a fork. It is
+    restarted transparently if it exits.
+    """
+
+    def __init__(self, repo_path):
+        self.repo_path = Path(repo_path)
+        self._process: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.starts = 0
+        atexit.register(self.close)
+
+    def _start(self):
+        self._process = subprocess.Popen(
+            ["git", "cat-file", "--batch"], cwd=self.repo_path,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        self.starts += 1
+
+    def read(self, name: str) -> Optional[Tuple[str, str, bytes]]:
+        """Return (sha, type, data) for an object name, or None if it does not resolve"""
+        if not name or '\n' in name:
+            return None
+
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._process is None or self._process.poll() is not None:
+                        self._start()
+                    self._process.stdin.write(name.encode('utf-8') + b'\n')
+                    self._process.stdin.flush()
+                    header = self._process.stdout.readline()
+                    if not header:
+                        raise OSError("git cat-file exited")
+                    parts = header.decode('utf-8', 'replace').split()
+                    if len(parts) != 3:
+                        # "<name> missing" or "<name> ambiguous"
+                        return None
+                    sha, kind, size = parts
+                    data = self._process.stdout.read(int(size))
+                    self._process.stdout.read(1)
+                    self.reads += 1
+                    return sha, kind, data
+                except (OSError, ValueError):
+                    self._stop()
+                    if attempt:
+                        raise
+        return None
+
+    def _stop(self):
+        process, self._process = self._process, None
+        if process is not None:
+            try:
+                process.kill()
+                process.wait()
+            except OSError:
+                pass
+
+    def close(self):
+        """Stop the batch process"""
+        with self._lock:
+            self._stop()
+
+
+def parse_commit(sha: str, data: bytes) -> Commit:
+    """Parse a raw commit object"""
+    text = data.decode('utf-8', 'replace')
+    headers, _, message = text.partition('\n\n')
+    tree, author, committer = '', '', ''
+    parents = []
+    for line in headers.split('\n'):
+        key, _, value = line.partition(' ')
+        if key == 'tree':
+            tree = value
+        elif key == 'parent':
+            parents.append(value)
+        elif key == 'author':
+            author = value
+        elif key == 'committer':
+            committer = value
+    return Commit(sha, tree, tuple(parents), author, committer, message)
+
+
+def parse_ident(ident: str) -> Tuple[str, str, int, str]:
+    """Split ``Name <email> 1700000000 +0100`` into its parts"""
+    name, _, rest = ident.partition(' <')
+    email, _, when = rest.partition('> ')
+    timestamp, _, tz = when.partition(' ')
+    try:
+        seconds = int(timestamp)
+    except ValueError:
+        seconds = 0
+    return name, email, seconds, tz
+
+
+def subject(message: str) -> str:
+    """First paragraph of a commit message on one line, as ``git log --oneline`` shows it"""
+    paragraph = message.strip('\n').split('\n\n', 1)[0]
+    return ' '.join(line.strip() for line in paragraph.split('\n'))
+
+
+def parse_tree(data: bytes) -> List[TreeEntry]:
+    """Parse a raw tree object"""
+    entries = []
+    position = 0
+    while position < len(data):
+        space = data.index(b' ', position)
+        nul = data.index(b'\0', space)
+        entries.append(TreeEntry(
+            data[position:space].decode('ascii'),
+            data[space + 1:nul].decode('utf-8', 'surrogateescape'),
+            data[nul + 1:nul + 21].hex()
+        ))
+        position = nul + 21
+    return entries
+
+
+def write_object(git_dir: Path, kind: str, data: bytes) -> str:
+    """Store a loose object (if not already present) and return its SHA-1"""
+    header = f"{kind} {len(data)}\0".encode('ascii')
+    sha = hashlib.sha1(header + data).hexdigest()
+    path = git_dir / 'objects' / sha[:2] / sha[2:]
+    if path.exists():
+        return sha
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix='tmp_obj_', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(zlib.compress(header + data))
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return sha
+
+
+class RefStore:
+    """Read and update refs straight from the ``.git`` directory"""
+
+    def __init__(self, git_dir: Path):
+        self.git_dir = Path(git_dir)
+        self._packed: Dict[str, str] = {}
+        self._packed_stamp = None
+
+    def _packed_refs(self) -> Dict[str, str]:
+        path = self.git_dir / 'packed-refs'
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self._packed, self._packed_stamp = {}, None
+            return self._packed
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._packed_stamp:
+            packed = {}
+            for line in path.read_text(encoding='utf-8').splitlines():
+                if line and line[0] not in '#^':
+                    sha, _, name = line.partition(' ')
+                    packed[name] = sha
+            self._packed, self._packed_stamp = packed, stamp
+        return self._packed
+
+    def read_symbolic(self, name: str = 'HEAD') -> Optional[str]:
+        """Return the ref a symbolic ref points at, or None if it is detached or missing"""
+        try:
+            content = (self.git_dir / name).read_text(encoding='utf-8').strip()
+        except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+            return None
+        return content[5:].strip() if content.startswith('ref:') else None
+
+    def resolve(self, name: str = 'HEAD') -> Optional[str]:
+        """Return the commit a ref points at, following symbolic refs"""
+        for _ in range(5):
+            try:
+                content = (self.git_dir / name).read_text(encoding='utf-8').strip()
+            except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+                return self._packed_refs().get(name)
+            if not content.startswith('ref:'):
+                return content or None
+            name = content[5:].strip()
+        return None
+
+    def current_branch(self) -> str:
+        """Name of the checked-out branch, '' when HEAD is detached"""
+        target = self.read_symbolic('HEAD') or ''
+        return target[len('refs/heads/'):] if target.startswith('refs/heads/') else ''
+
+    def update(self, name: str, new: str, old: Optional[str], reflog: Optional[str] = None,
+               ident: Optional[str] = None) -> bool:
+        """Point a ref at a new commit if it still points at ``old``"""
+        path = self.git_dir / name
+        lock_path = path.with_name(path.name + '.lock')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            fd = os.open(lock_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+        except FileExistsError:
+            return False
+        try:
+            if self.resolve(name) != old:
+                os.close(fd)
+                os.unlink(lock_path)
+                return False
+            with os.fdopen(fd, 'w') as f:
+                f.write(new + '\n')
+            os.replace(lock_path, path)
+        except BaseException:
+            if lock_path.exists():
+                os.unlink(lock_path)
+            raise
+
+        if reflog and ident and (self.git_dir / 'logs').is_dir():
+            self.append_reflog(name, old, new, ident, reflog)
+        return True
+
+    def append_reflog(self, name: str, old: Optional[str], new: str, ident: str, message: str):
+        """Record a ref update the way git's reflog does"""
+        path = self.git_dir / 'logs' / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(f"{old or NULL_SHA} {new} {ident}\t{message}\n")
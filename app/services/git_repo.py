@@ -1,62 +1,365 @@
 import subprocess
 import os
+import stat as stat_module
+import threading
+import time
+import difflib
+import re
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 
+from .git_objects import (ABBREV, CatFileBatch, RefStore, Commit, TreeEntry, parse_commit, parse_tree,
+                          subject, write_object)
+from .commit_log import CommitLog
+from .git_index import GitIndex, UnsupportedIndex
+from .git_status import WorkingTreeStatus
+
+# Hooks git runs on commit; when any is installed commits go through the git CLI
+COMMIT_HOOKS = ('pre-commit', 'prepare-commit-msg', 'commit-msg', 'post-commit', 'post-index-change')
+# .gitattributes settings that make `git add` transform file content
+CONTENT_ATTRIBUTES = re.compile(r'\b(filter|text|eol|ident|working-tree-encoding)\b')
+# git's default hunk-header function line: starts with a letter, '_' or '$'
+FUNCNAME_LINE = re.compile(r'^[A-Za-z_$]')
+# State files of an unfinished merge, cherry-pick or revert; commits then need the git CLI
+IN_PROGRESS = ('MERGE_HEAD', 'CHERRY_PICK_HEAD', 'REVERT_HEAD')
+# Characters git trims from both ends of an ident name or email
+IDENT_CRUD = '.,:;<>"\\\''
+CACHE_SIZE = 4096
+# What commit() returns when nothing was staged, or when git failed
+NO_CHANGES = "No changes to commit"
+COMMIT_FAILED = "File saved (git commit failed)"
+
+def _cache_put(cache: OrderedDict, key, value):
+    cache[key] = value
+    if len(cache) > CACHE_SIZE:
+        cache.popitem(last=False)
+
+def _local_offset(timestamp: int) -> str:
+    """Timezone offset as git writes it, e.g. +0100"""
+    offset = time.localtime(timestamp).tm_gmtoff // 60
+    sign = '-' if offset < 0 else '+'
+    return f"{sign}{abs(offset) // 60:02d}{abs(offset) % 60:02d}"
+
+def _is_true(value: Optional[str]) -> bool:
+    """Interpret a git config boolean"""
+    return (value or '').lower() in ('true', 'yes', 'on', '1')
+
+def _clean_message(message: str) -> str:
+    """Apply git's `whitespace` cleanup to a commit message given with -m"""
+    lines = []
+    for line in message.splitlines():
+        line = line.rstrip()
+        if line or (lines and lines[-1]):
+            lines.append(line)
+    while lines and not lines[-1]:
+        lines.pop()
+    return '\n'.join(lines) + '\n' if lines else ''
+
+def _clean_ident(value: str) -> str:
+    """Sanitize an author name or email the way git's ident code does"""
+    start, end = 0, len(value)
+    while start < end and (value[start] <= ' ' or value[start] in IDENT_CRUD):
+        start += 1
+    while end > start and (value[end - 1] <= ' ' or value[end - 1] in IDENT_CRUD):
+        end -= 1
+    return ''.join(char for char in value[start:end] if char not in '\n<>')
+
 class GitRepo:
-    def __init__(self, repo_path: str = "."):
+    """Git operations for the CMS.
+
+    Object reads go through one long-lived `git cat-file --batch` process,
+    refs are read from .git directly, and add/rm/commit update the index and
+    write objects in-process, so a save or a dashboard load no longer forks
+    git per step. Anything the in-process path does not cover (content
+    filters, commit hooks, signing, unusual index formats) falls back to the
+    git CLI, as do errors.
+    """
+
+    def __init__(self, repo_path: str = ".", status_reconcile: float = 60.0):
         self.repo_path = Path(repo_path)
         self._ensure_git_repo()
-    
+        self.git_dir = self.repo_path / ".git"
+        self.objects = CatFileBatch(self.repo_path)
+        self.refs = RefStore(self.git_dir)
+        self.index = GitIndex(self.git_dir)
+        self._lock = threading.RLock()
+        self._settings: Dict[str, Any] = {}
+        self._settings_stamp = None
+        self._commits: "OrderedDict[str, Commit]" = OrderedDict()
+        self._trees: "OrderedDict[str, List[TreeEntry]]" = OrderedDict()
+        self.log = CommitLog(self)
+        self.status = WorkingTreeStatus(self, status_reconcile)
+        self.native_operations = 0
+        self.cli_operations = 0
+
     def _ensure_git_repo(self):
         """Initialize git repository if it doesn't exist"""
         git_dir = self.repo_path / ".git"
         if not git_dir.exists():
             try:
-                subprocess.run(["git", "init"], cwd=self.repo_path, check=True, 
+                subprocess.run(["git", "init"], cwd=self.repo_path, check=True,
                              capture_output=True, text=True)
-                
+
                 # Set initial config if not set
                 try:
-                    subprocess.run(["git", "config", "user.name", "CMS User"], 
+                    subprocess.run(["git", "config", "user.name", "CMS User"],
                                  cwd=self.repo_path, check=True)
-                    subprocess.run(["git", "config", "user.email", "cms@localhost"], 
+                    subprocess.run(["git", "config", "user.email", "cms@localhost"],
                                  cwd=self.repo_path, check=True)
                 except subprocess.CalledProcessError:
                     pass  # Config might already be set
-                    
+
             except subprocess.CalledProcessError as e:
                 print(f"Failed to initialize git repository: {e}")
-    
+
+    # In-process plumbing
+
+    def _load_settings(self) -> Dict[str, Any]:
+        """Decide what the in-process path may handle, re-checked when the repo config changes"""
+        stamp = []
+        for path in (self.git_dir / "config", self.git_dir / "hooks", self.repo_path / ".gitattributes"):
+            try:
+                stamp.append(path.stat().st_mtime_ns)
+            except OSError:
+                stamp.append(None)
+        if stamp == self._settings_stamp:
+            return self._settings
+
+        settings = {'native_add': False, 'native_commit': False, 'filemode': True}
+        if self.git_dir.is_dir():
+            try:
+                listing = subprocess.run(["git", "config", "--list", "-z"], cwd=self.repo_path,
+                                         capture_output=True, check=True).stdout.decode('utf-8', 'replace')
+                config = {}
+                for item in listing.split('\0'):
+                    key, _, value = item.partition('\n')
+                    if key:
+                        config[key.lower()] = value
+                committer = subprocess.run(["git", "var", "GIT_COMMITTER_IDENT"], cwd=self.repo_path,
+                                           capture_output=True, text=True)
+                author = subprocess.run(["git", "var", "GIT_AUTHOR_IDENT"], cwd=self.repo_path,
+                                        capture_output=True, text=True)
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"Warning: Failed to read git config, using the git CLI: {e}")
+            else:
+                attributes = ''
+                for path in (self.repo_path / ".gitattributes", self.git_dir / "info" / "attributes"):
+                    if path.exists():
+                        attributes += path.read_text(encoding='utf-8', errors='replace')
+                sha1 = config.get('extensions.objectformat', 'sha1') == 'sha1'
+                settings['filemode'] = _is_true(config.get('core.filemode', 'true'))
+                settings['native_add'] = (sha1 and config.get('core.autocrlf', 'false').lower() in ('false', 'no', 'off', '0')
+                                          and not CONTENT_ATTRIBUTES.search(attributes))
+                hooks_dir = self.git_dir / "hooks"
+                hooks = any(os.access(hooks_dir / hook, os.X_OK) for hook in COMMIT_HOOKS)
+                settings['native_commit'] = (
+                    sha1 and committer.returncode == 0 and author.returncode == 0 and not hooks
+                    and 'core.hookspath' not in config and not _is_true(config.get('commit.gpgsign'))
+                )
+                # "Name <email> 1700000000 +0000" -> "Name <email>"
+                settings['committer'] = committer.stdout.strip().rsplit(' ', 2)[0]
+                settings['author'] = author.stdout.strip().rsplit(' ', 2)[0]
+
+        self._settings, self._settings_stamp = settings, stamp
+        return settings
+
+    def _relative(self, file_path: str) -> Optional[str]:
+        """Repository-relative POSIX path, or None if the path is outside the repository"""
+        full = os.path.abspath(self.repo_path / file_path)
+        relative = os.path.relpath(full, os.path.abspath(self.repo_path))
+        if relative == '.' or relative.startswith('..'):
+            return None
+        return Path(relative).as_posix()
+
+    def read_commit(self, sha: str) -> Optional[Commit]:
+        """Return a parsed commit object, or None"""
+        commit = self._commits.get(sha)
+        if commit is None:
+            found = self.objects.read(sha)
+            if found is None or found[1] != 'commit':
+                return None
+            commit = parse_commit(found[0], found[2])
+            _cache_put(self._commits, sha, commit)
+        return commit
+
+    def read_tree(self, sha: str) -> List[TreeEntry]:
+        """Return the entries of a tree object"""
+        entries = self._trees.get(sha)
+        if entries is None:
+            found = self.objects.read(sha)
+            entries = parse_tree(found[2]) if found and found[1] == 'tree' else []
+            _cache_put(self._trees, sha, entries)
+        return entries
+
+    def tree_entry(self, tree: str, path: str) -> Optional[TreeEntry]:
+        """Find a path in a tree, walking one cached tree object per directory"""
+        entry = None
+        for name in path.split('/'):
+            if entry is not None:
+                if entry.mode != '40000':
+                    return None
+                tree = entry.sha
+            entry = next((item for item in self.read_tree(tree) if item.name == name), None)
+            if entry is None:
+                return None
+        return entry
+
+    def _native_add(self, file_path: str) -> bool:
+        settings = self._load_settings()
+        relative = self._relative(file_path)
+        if not settings['native_add'] or relative is None:
+            return False
+
+        full = self.repo_path / relative
+        key = relative.encode('utf-8', 'surrogateescape')
+        with self._lock, self.index.locked():
+            try:
+                stat = os.lstat(full)
+            except FileNotFoundError:
+                # Adding a deleted file stages its removal; an untracked one
+                # (created and deleted before its commit) leaves nothing to stage
+                if self.index.remove(key):
+                    self.index.write()
+                return True
+            if not stat_module.S_ISREG(stat.st_mode):
+                return False
+            sha = write_object(self.git_dir, 'blob', full.read_bytes())
+            executable = bool(stat.st_mode & stat_module.S_IXUSR) if settings['filemode'] else None
+            self.index.add(key, sha, stat, executable)
+            self.index.write()
+        return True
+
+    def _native_commit(self, message: str, author_name: str = None, author_email: str = None) -> Optional[str]:
+        settings = self._load_settings()
+        message = _clean_message(message)
+        if not settings['native_commit'] or not message:
+            return None
+        if any((self.git_dir / name).exists() for name in IN_PROGRESS):
+            # The commit needs more than one parent or a prepared message
+            return None
+        if author_name and author_email:
+            author_name, author_email = _clean_ident(author_name), _clean_ident(author_email)
+            if not author_name:
+                # Let the git CLI reject an empty name
+                return None
+
+        with self._lock:
+            self.index.load()
+            tree = self.index.write_tree(lambda kind, data: write_object(self.git_dir, kind, data))
+            branch_ref = self.refs.read_symbolic("HEAD")
+            head = self.refs.resolve("HEAD")
+            if head:
+                parent = self.read_commit(head)
+                if parent is None:
+                    return None
+                if parent.tree == tree:
+                    return NO_CHANGES
+            elif not self.index.entries:
+                return NO_CHANGES
+
+            now = int(time.time())
+            when = f"{now} {_local_offset(now)}"
+            committer = f"{settings['committer']} {when}"
+            if author_name and author_email:
+                author = f"{author_name} <{author_email}> {when}"
+            else:
+                author = f"{settings['author']} {when}"
+
+            lines = [f"tree {tree}"]
+            if head:
+                lines.append(f"parent {head}")
+            lines += [f"author {author}", f"committer {committer}", "", message]
+            sha = write_object(self.git_dir, 'commit', '\n'.join(lines).encode('utf-8'))
+
+            title = subject(message)
+            reflog = f"commit{'' if head else ' (initial)'}: {title}"
+            if not self.refs.update(branch_ref or "HEAD", sha, head, reflog, committer):
+                return None
+            if branch_ref and (self.git_dir / "logs").is_dir():
+                self.refs.append_reflog("HEAD", head, sha, committer, reflog)
+
+        branch = self.refs.current_branch() or "detached HEAD"
+        root = "" if head else "(root-commit) "
+        return f"[{branch} {root}{sha[:ABBREV]}] {title}\n"
+
+    def _native_diff(self, relative: str, revision: str) -> str:
+        old_commit = self.objects.read(f"{revision}^{{commit}}")
+        new_commit = self.refs.resolve("HEAD")
+        if old_commit is None or not new_commit:
+            # git diff fails on an unknown revision and prints nothing
+            return ""
+
+        old_entry = self.tree_entry(self.read_commit(old_commit[0]).tree, relative)
+        new_entry = self.tree_entry(self.read_commit(new_commit).tree, relative)
+        if old_entry == new_entry or (old_entry is None and new_entry is None):
+            return ""
+
+        def blob(entry):
+            found = self.objects.read(entry.sha) if entry else None
+            return found[2] if found else b''
+
+        return _format_diff(relative, old_entry, blob(old_entry), new_entry, blob(new_entry))
+
+    # Public operations
+
     def add_file(self, file_path: str):
         """Add file to git staging area"""
         try:
-            subprocess.run(["git", "add", file_path], 
+            if self._native_add(file_path):
+                self.native_operations += 1
+                return
+        except (UnsupportedIndex, OSError, ValueError) as e:
+            print(f"Warning: In-process git add failed, using the git CLI: {e}")
+
+        self.cli_operations += 1
+        try:
+            subprocess.run(["git", "add", file_path],
                          cwd=self.repo_path, check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
             print(f"Warning: Failed to add file to git: {e}")
             # Continue without git operations
-    
+
     def commit(self, message: str, author_name: str = None, author_email: str = None):
         """Commit changes with message and optional author"""
+        try:
+            result = self._native_commit(message, author_name, author_email)
+            if result is not None:
+                self.native_operations += 1
+                return result
+        except (UnsupportedIndex, OSError, ValueError) as e:
+            print(f"Warning: In-process git commit failed, using the git CLI: {e}")
+
+        self.cli_operations += 1
         try:
             cmd = ["git", "commit", "-m", message]
-            
+
             if author_name and author_email:
                 cmd.extend(["--author", f"{author_name} <{author_email}>"])
-            
-            result = subprocess.run(cmd, cwd=self.repo_path, check=True, 
+
+            result = subprocess.run(cmd, cwd=self.repo_path, check=True,
                                   capture_output=True, text=True)
             return result.stdout
         except subprocess.CalledProcessError as e:
             if "nothing to commit" in str(e.stdout):
-                return "No changes to commit"
+                return NO_CHANGES
             print(f"Warning: Failed to commit to git: {e}")
-            return "File saved (git commit failed)"
-    
+            return COMMIT_FAILED
+
     def get_file_diff(self, file_path: str, revision: str = "HEAD~1") -> str:
         """Get diff for a specific file"""
+        relative = self._relative(file_path)
+        if relative is not None and not revision.startswith('-'):
+            try:
+                with self._lock:
+                    diff = self._native_diff(relative, revision)
+                self.native_operations += 1
+                return diff
+            except (OSError, ValueError) as e:
+                print(f"Warning: In-process git diff failed, using the git CLI: {e}")
+
+        self.cli_operations += 1
         try:
             result = subprocess.run([
                 "git", "diff", revision, "HEAD", "--", file_path
@@ -64,64 +367,201 @@ class GitRepo:
             return result.stdout
         except subprocess.CalledProcessError as e:
             return f"Error getting diff: {e}"
-    
-    def get_commit_history(self, file_path: str = None, limit: int = 10) -> list:
-        """Get commit history, optionally for a specific file"""
+
+    def file_at(self, file_path: str, revision: str) -> Optional[Tuple[Commit, Optional[TreeEntry]]]:
+        """Resolve a revision to its commit and find a file in that commit's tree.
+
+        Returns None if the revision does not name a commit; the entry is
+        None if the file did not exist at that commit.
+        """
+        relative = self._relative(file_path)
+        if relative is None or not revision or revision.startswith('-'):
+            return None
+        with self._lock:
+            found = self.objects.read(f"{revision}^{{commit}}")
+            commit = self.read_commit(found[0]) if found else None
+            if commit is None:
+                return None
+            return commit, self.tree_entry(commit.tree, relative)
+
+    def read_blob(self, sha: str) -> Optional[bytes]:
+        """Return the content of a blob object, or None"""
+        found = self.objects.read(sha)
+        return found[2] if found and found[1] == 'blob' else None
+
+    def get_commit_history(self, file_path: str = None, limit: int = 10, cursor: str = None) -> list:
+        """Get commit history, optionally for a specific file.
+
+        Pass the full ``sha`` of the last commit of a page as ``cursor`` to
+        get the next page.
+        """
+        relative = self._relative(file_path) if file_path else None
+        if not file_path or relative is not None:
+            try:
+                with self._lock:
+                    records = self.log.history(relative, limit, cursor)
+                if records is not None:
+                    self.native_operations += 1
+                    return [record.as_dict() for record in records]
+            except (OSError, ValueError) as e:
+                print(f"Warning: In-process git log failed, using the git CLI: {e}")
+
+        self.cli_operations += 1
         try:
-            cmd = ["git", "log", "--oneline", f"-{limit}"]
+            cmd = ["git", "log", "--format=%H%x00%an%x00%ae%x00%at%x00%s", f"-{limit}"]
+            if cursor:
+                cmd.extend(["--end-of-options", f"{cursor}^@"])
             if file_path:
                 cmd.extend(["--", file_path])
             
-            result = subprocess.run(cmd, cwd=self.repo_path, 
+            result = subprocess.run(cmd, cwd=self.repo_path,
                                   capture_output=True, text=True, check=True)
             
             commits = []
             for line in result.stdout.strip().split('\n'):
                 if line:
-                    parts = line.split(' ', 1)
-                    if len(parts) >= 2:
+                    parts = line.split('\0', 4)
+                    if len(parts) == 5:
                         commits.append({
-                            'hash': parts[0],
-                            'message': parts[1]
+                            'hash': parts[0][:ABBREV],
+                            'sha': parts[0],
+                            'message': parts[4],
+                            'author': parts[1],
+                            'email': parts[2],
+                            'date': datetime.fromtimestamp(int(parts[3]))
                         })
             return commits
         except subprocess.CalledProcessError:
             return []
-    
+
     def get_status(self) -> Dict[str, Any]:
-        """Get repository status"""
+        """Get repository status from the in-memory working-tree status"""
         try:
-            # Get status
-            result = subprocess.run(["git", "status", "--porcelain"], 
-                                  cwd=self.repo_path, capture_output=True, text=True)
-            
+            changes = self.status.changes()
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Warning: Could not get git status: {e}")
             changes = []
-            for line in result.stdout.strip().split('\n'):
-                if line:
-                    status = line[:2]
-                    file_path = line[3:]
-                    changes.append({
-                        'status': status.strip(),
-                        'file': file_path
-                    })
-            
-            # Get current branch
-            branch_result = subprocess.run(["git", "branch", "--show-current"], 
-                                         cwd=self.repo_path, capture_output=True, text=True)
-            current_branch = branch_result.stdout.strip()
-            
-            return {
-                'changes': changes,
-                'current_branch': current_branch,
-                'has_changes': bool(changes)
-            }
-        except subprocess.CalledProcessError:
-            return {'changes': [], 'current_branch': 'main', 'has_changes': False}
-    
+
+        # Current branch straight from .git/HEAD
+        current_branch = self.refs.current_branch()
+
+        return {
+            'changes': changes,
+            'current_branch': current_branch,
+            'has_changes': bool(changes)
+        }
+
+    def mark_changed(self, *file_paths: str):
+        """Tell the status cache that files were written or removed"""
+        relative = [self._relative(file_path) for file_path in file_paths]
+        self.status.mark(*[path for path in relative if path is not None])
+
+    def _native_remove(self, file_path: str) -> bool:
+        relative = self._relative(file_path)
+        if not self._load_settings()['native_add'] or relative is None:
+            return False
+
+        full = self.repo_path / relative
+        key = relative.encode('utf-8', 'surrogateescape')
+        with self._lock, self.index.locked():
+            entry = self.index.entries.get(key)
+            if entry is None or not full.is_file() or full.is_symlink():
+                return False
+            # Like `git rm`, refuse (via the CLI's error) when the file or index has changes
+            staged = entry.sha.hex()
+            if write_object(self.git_dir, 'blob', full.read_bytes()) != staged:
+                return False
+            head = self.refs.resolve("HEAD")
+            committed = self.tree_entry(self.read_commit(head).tree, relative) if head else None
+            if committed is None or committed.sha != staged:
+                return False
+
+            self.index.remove(key)
+            self.index.write()
+            full.unlink()
+            # git rm also removes directories left empty
+            parent = full.parent
+            root = self.repo_path.resolve()
+            while parent.resolve() != root:
+                try:
+                    parent.rmdir()
+                except OSError:
+                    break
+                parent = parent.parent
+        return True
+
     def remove_file(self, file_path: str):
         """Remove file from git and filesystem"""
+        self.mark_changed(file_path)
         try:
-            subprocess.run(["git", "rm", file_path], 
+            if self._native_remove(file_path):
+                self.native_operations += 1
+                return
+        except (UnsupportedIndex, OSError, ValueError) as e:
+            print(f"Warning: In-process git rm failed, using the git CLI: {e}")
+
+        self.cli_operations += 1
+        try:
+            subprocess.run(["git", "rm", file_path],
                          cwd=self.repo_path, check=True, capture_output=True)
         except subprocess.CalledProcessError as e:
             raise Exception(f"Failed to remove file from git: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return backend counters for monitoring"""
+        return {
+            'native_operations': self.native_operations,
+            'cli_operations': self.cli_operations,
+            'object_reads': self.objects.reads,
+            'batch_starts': self.objects.starts,
+            'log': self.log.stats(),
+            'status': self.status.stats()
+        }
+
+def _hunk_context(lines: List[str], start: int) -> str:
+    """Nearest line above a hunk that git's default funcname rule would show"""
+    for line in reversed(lines[:start]):
+        if FUNCNAME_LINE.match(line):
+            return ' ' + line.rstrip()[:80]
+    return ''
+
+def _format_diff(path: str, old: Optional[TreeEntry], old_data: bytes,
+                 new: Optional[TreeEntry], new_data: bytes) -> str:
+    """Render a `git diff`-style patch for one file"""
+    null = '0' * ABBREV
+    old_sha = old.sha[:ABBREV] if old else null
+    new_sha = new.sha[:ABBREV] if new else null
+    header = [f"diff --git a/{path} b/{path}"]
+    if old is None:
+        header.append(f"new file mode {new.mode}")
+        header.append(f"index {old_sha}..{new_sha}")
+    elif new is None:
+        header.append(f"deleted file mode {old.mode}")
+        header.append(f"index {old_sha}..{new_sha}")
+    elif old.mode != new.mode:
+        header += [f"old mode {old.mode}", f"new mode {new.mode}"]
+        if old.sha != new.sha:
+            header.append(f"index {old_sha}..{new_sha}")
+    else:
+        header.append(f"index {old_sha}..{new_sha} {new.mode}")
+
+    if old is not None and new is not None and old.sha == new.sha:
+        return '\n'.join(header) + '\n'
+    if b'\0' in old_data[:8000] or b'\0' in new_data[:8000]:
+        header.append(f"Binary files {'a/' + path if old else '/dev/null'} and "
+                      f"{'b/' + path if new else '/dev/null'} differ")
+        return '\n'.join(header) + '\n'
+
+    header.append(f"--- {'a/' + path if old else '/dev/null'}")
+    header.append(f"+++ {'b/' + path if new else '/dev/null'}")
+    a = old_data.decode('utf-8', 'replace').splitlines(keepends=True)
+    b = new_data.decode('utf-8', 'replace').splitlines(keepends=True)
+    out = ['\n'.join(header) + '\n']
+    for line in list(difflib.unified_diff(a, b, n=3))[2:]:
+        if line.startswith('@@'):
+            start = int(line.split()[1].lstrip('-').split(',')[0] or 0)
+            line = line.rstrip('\n') + _hunk_context(a, max(start - 1, 0)) + '\n'
+        elif not line.endswith('\n'):
+            line += '\n\\ No newline at end of file\n'
+        out.append(line)
+    return ''.join(out)
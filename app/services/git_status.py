@@ -0,0 +1,235 @@
+"""Working-tree status kept in memory instead of a `git status` per request"""
+import os
+import subprocess
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+
+try:
+    from watchdog.observers import Observer
+except ImportError:  # optional, the periodic reconcile picks up outside edits
+    Observer = None
+
+# Paths re-checked with one scoped `git status`; beyond that the next full scan covers them
+MAX_PENDING = 256
+# Watchdog events that can change what `git status` reports
+CHANGE_EVENTS = ('created', 'deleted', 'modified', 'moved', 'closed')
+# Directories watched for outside edits: the site sources, not caches, databases or virtualenvs
+WATCH_DIRS = ('content', 'templates', 'static')
+
+
+class WorkingTreeStatus:
+    """``git status --porcelain`` for the CMS dashboard, kept in memory.
+
+    A full scan runs on first use and then every ``reconcile_interval``
+    seconds on a background thread. In between, only paths known to have
+    changed are re-checked, with a ``git status`` limited to them: paths
+    the app writes (``mark``), paths under ``WATCH_DIRS`` that watchdog
+    reports when it is installed, and every listed change once HEAD or the
+    index moves. Other outside edits appear at the next full scan.
+    """
+
+    def __init__(self, git_repo, reconcile_interval: float = 60.0):
+        self.git_repo = git_repo
+        self.reconcile_interval = reconcile_interval
+        self._changes: Optional[Dict[str, str]] = None
+        self._pending: Set[str] = set()
+        self._overflow = False
+        # Paths marked while a full scan runs; its result may predate them
+        self._touched: Optional[Set[str]] = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        self._scan_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._observer = None
+        self.full_scans = 0
+        self.partial_scans = 0
+        self.events = 0
+        self.last_full_ms = 0.0
+
+    def _git_status(self, paths: Optional[List[str]] = None) -> Dict[str, str]:
+        # No optional locks: don't rewrite the index under the commit queue
+        cmd = ["git", "--no-optional-locks", "--literal-pathspecs", "status",
+               "--porcelain", "-z", "--no-renames", "--untracked-files=all"]
+        if paths is not None:
+            cmd.append("--")
+            cmd.extend(paths)
+        result = subprocess.run(cmd, cwd=self.git_repo.repo_path, capture_output=True, check=True)
+        changes = {}
+        for entry in result.stdout.split(b'\0'):
+            if len(entry) > 3:
+                changes[entry[3:].decode('utf-8', 'surrogateescape')] = entry[:2].decode('ascii').strip()
+        return changes
+
+    def _current_stamp(self):
+        try:
+            stat = (self.git_repo.git_dir / 'index').stat()
+            index = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except FileNotFoundError:
+            index = None
+        return self.git_repo.refs.resolve('HEAD'), index
+
+    def _full_scan(self):
+        with self._lock:
+            self._touched = set()
+            self._pending.clear()
+            self._overflow = False
+        started = time.monotonic()
+        try:
+            stamp = self._current_stamp()
+            changes = self._git_status()
+        except BaseException:
+            with self._lock:
+                self._overflow = True
+                self._touched = None
+            raise
+        with self._lock:
+            self._changes = changes
+            self._stamp = stamp
+            # Anything marked during the scan is checked again
+            self._pending |= self._touched
+            self._touched = None
+        self.full_scans += 1
+        self.last_full_ms = round((time.monotonic() - started) * 1000, 2)
+
+    def _moved_head(self, old: Optional[str], new: Optional[str]) -> bool:
+        """Whether HEAD moved other than by a commit on top of ``old``"""
+        if old == new:
+            return False
+        commit = self.git_repo.read_commit(new) if new else None
+        return commit is None or old not in commit.parents
+
+    def _partial_scan(self):
+        stamp = self._current_stamp()
+        if self._stamp is not None and self._moved_head(self._stamp[0], stamp[0]):
+            # Checkout or reset: any path may differ from the new HEAD
+            with self._lock:
+                self._overflow = True
+            return
+        with self._lock:
+            paths = set(self._pending)
+            if stamp != self._stamp:
+                # A commit or `git add` may have changed any listed path
+                paths.update(self._changes)
+            if not paths:
+                self._stamp = stamp
+                return
+            if len(paths) > MAX_PENDING:
+                self._overflow = True
+                return
+            self._pending.clear()
+        try:
+            found = self._git_status(sorted(paths))
+        except BaseException:
+            with self._lock:
+                self._pending |= paths
+            raise
+        with self._lock:
+            for path in paths:
+                prefix = path.rstrip('/') + '/'
+                for known in [known for known in self._changes if known == path or known.startswith(prefix)]:
+                    del self._changes[known]
+            self._changes.update(found)
+            self._stamp = stamp
+        self.partial_scans += 1
+
+    def refresh(self, full: bool = False, wait: bool = True):
+        """Bring the status up to date; ``full`` rescans the whole working tree.
+
+        With ``wait=False`` a scan already running elsewhere is not waited
+        for (once there is a first result); its outcome is picked up later.
+        """
+        if not self._scan_lock.acquire(blocking=wait or self._changes is None):
+            return
+        try:
+            if full or self._changes is None:
+                self._full_scan()
+            elif not self._overflow:
+                self._partial_scan()
+        finally:
+            self._scan_lock.release()
+
+    def changes(self) -> List[Dict[str, str]]:
+        """Changed paths as ``{'status': 'M', 'file': ...}``, sorted by path"""
+        self.start()
+        self.refresh(wait=False)
+        with self._lock:
+            if self._overflow:
+                self._wake.set()
+            return [{'status': status, 'file': path} for path, status in sorted(self._changes.items())]
+
+    def mark(self, *paths: str):
+        """Note repository-relative paths whose status may have changed"""
+        with self._lock:
+            for path in paths:
+                if self._touched is not None:
+                    self._touched.add(path)
+                if len(self._pending) < MAX_PENDING:
+                    self._pending.add(path)
+                else:
+                    self._overflow = True
+            overflow = self._overflow
+        if overflow:
+            self._wake.set()
+
+    def dispatch(self, event):
+        """Watchdog event handler"""
+        if event.event_type not in CHANGE_EVENTS:
+            return
+        root = os.path.abspath(self.git_repo.repo_path)
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            if not path:
+                continue
+            relative = os.path.relpath(os.fsdecode(path), root).replace(os.sep, '/')
+            if relative == '.' or relative.startswith('..') or relative.split('/', 1)[0] == '.git':
+                continue
+            self.events += 1
+            self.mark(relative)
+
+    def start(self):
+        """Start the reconcile thread and, if watchdog is installed, the file watcher"""
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._run, name="git-status-reconcile", daemon=True)
+        self._worker.start()
+
+        if Observer is not None:
+            try:
+                observer = Observer()
+                observer.daemon = True
+                watched = [path for path in (self.git_repo.repo_path / name for name in WATCH_DIRS) if path.is_dir()]
+                for path in watched:
+                    observer.schedule(self, str(path), recursive=True)
+                if watched:
+                    observer.start()
+                    self._observer = observer
+            except OSError as e:
+                print(f"Warning: Could not watch the working tree for git status: {e}")
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.reconcile_interval)
+            self._wake.clear()
+            try:
+                self.refresh(full=True)
+            except (OSError, subprocess.CalledProcessError) as e:
+                print(f"Warning: Git status reconcile failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return status counters for monitoring"""
+        with self._lock:
+            changes = len(self._changes) if self._changes is not None else 0
+            pending = len(self._pending)
+        return {
+            'changes': changes,
+            'pending': pending,
+            'full_scans': self.full_scans,
+            'partial_scans': self.partial_scans,
+            'last_full_ms': self.last_full_ms,
+            'watcher': self._observer is not None,
+            'events': self.events
+        }
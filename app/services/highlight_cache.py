@@ -0,0 +1,244 @@
+"""Cache of syntax-highlighted code blocks"""
+import hashlib
+import os
+import tempfile
+import threading
+import types
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import markdown
+import pygments
+from markdown.extensions.codehilite import CodeHilite, CodeHiliteExtension, HiliteTreeprocessor
+from markdown.extensions.fenced_code import FencedBlockPreprocessor
+
+from app.deps import get_config
+
+# Pruning the disk cache keeps this share of ``max_disk_entries``
+DISK_PRUNE_TO = 0.9
+
+
+class HighlightCache:
+    """Keep highlighted HTML per (language, code, options) in a bounded LRU.
+
+    Entries can also be written to ``cache_dir`` so other workers and later
+    restarts skip Pygments for snippets they have never seen in memory; the
+    least recently used files are pruned once there are more than
+    ``max_disk_entries``. Keys include the Pygments and Markdown versions, so
+    an upgrade never serves stale markup.
+    """
+
+    def __init__(self, max_entries: int = 2048, cache_dir: Optional[str] = None,
+                 max_disk_entries: int = 20000):
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_disk_entries = max_disk_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._disk_entries: Optional[int] = None
+        self._lock = threading.Lock()
+        self._prune_lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_pruned = 0
+
+    @staticmethod
+    def key(src: str, options: Dict[str, Any], shebang: bool) -> str:
+        """Hash everything that can change a block's highlighted output: the
+        ``CodeHilite`` constructor arguments and the ``hilite()`` flag"""
+        def stable(value):
+            if isinstance(value, (type, types.FunctionType)):
+                return f"{value.__module__}.{value.__qualname__}"
+            return value
+        parts = (
+            pygments.__version__,
+            markdown.__version__,
+            shebang,
+            sorted((name, repr(stable(value))) for name, value in options.items()),
+            src
+        )
+        return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.html"
+
+    def get(self, key: str) -> Optional[str]:
+        """Return cached HTML, checking memory first and then disk"""
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html
+
+        if self.cache_dir is not None:
+            path = self._disk_path(key)
+            try:
+                html = path.read_text(encoding='utf-8')
+                # The mtime orders files for pruning, least recently used first
+                os.utime(path)
+            except OSError:
+                html = None
+            if html is not None:
+                self._remember(key, html)
+                self.disk_hits += 1
+                return html
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, html: str):
+        """Store highlighted HTML in memory and, if enabled, on disk"""
+        self._remember(key, html)
+        if self.cache_dir is None:
+            return
+
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Error writing highlight cache entry {path}: {e}")
+            return
+
+        with self._lock:
+            if self._disk_entries is not None:
+                self._disk_entries += 1
+            prune = self._disk_entries is None or self._disk_entries > self.max_disk_entries
+        if prune:
+            self._prune_disk()
+
+    def _prune_disk(self):
+        """Count the files on disk and drop the least recently used beyond the limit"""
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            files = []
+            for path in self.cache_dir.glob('*/*.html'):
+                try:
+                    files.append((path.stat().st_mtime, path))
+                except OSError:
+                    continue
+            keep = len(files)
+            if keep > self.max_disk_entries:
+                files.sort()
+                keep = int(self.max_disk_entries * DISK_PRUNE_TO)
+                for _, path in files[:len(files) - keep]:
+                    try:
+                        path.unlink()
+                        self.disk_pruned += 1
+                    except OSError:
+                        pass
+            with self._lock:
+                self._disk_entries = keep
+        finally:
+            self._prune_lock.release()
+
+    def _remember(self, key: str, html: str):
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every in-memory entry (the disk cache is left in place)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            'disk_entries': self._disk_entries,
+            'max_disk_entries': self.max_disk_entries,
+            'disk_pruned': self.disk_pruned,
+            'cache_dir': str(self.cache_dir) if self.cache_dir else None
+        }
+
+
+def _create_highlight_cache() -> HighlightCache:
+    config = get_config() or {}
+    markdown_config = config.get('markdown', {}) or {}
+    cache_config = config.get('cache', {}) or {}
+    return HighlightCache(
+        max_entries=int(markdown_config.get('highlight_cache_size', 2048)),
+        # An empty string disables the on-disk cache
+        cache_dir=cache_config.get('highlight_dir', '.cache/highlight'),
+        max_disk_entries=int(cache_config.get('highlight_disk_entries', 20000))
+    )
+
+
+# Shared by every markdown processor in the process
+highlight_cache = _create_highlight_cache()
+
+
+class CachedCodeHilite(CodeHilite):
+    """``CodeHilite`` that looks blocks up in ``highlight_cache`` before running Pygments"""
+
+    cache = highlight_cache
+
+    def __init__(self, src: str, **options):
+        super().__init__(src, **options)
+        self._cache_args = (src, options)
+
+    def hilite(self, shebang: bool = True) -> str:
+        src, options = self._cache_args
+        key = self.cache.key(src, options, shebang)
+        html = self.cache.get(key)
+        if html is None:
+            html = super().hilite(shebang)
+            self.cache.put(key, html)
+        return html
+
+
+def _using_cached_highlighter(func):
+    """Return a copy of a processor's ``run`` that builds ``CachedCodeHilite`` where it builds ``CodeHilite``.
+
+    Only the copy sees the substitution; the Markdown modules themselves are
+    left untouched for every other user in the process.
+    """
+    if 'CodeHilite' not in func.__code__.co_names:
+        print(f"Warning: {func.__qualname__} no longer builds CodeHilite; code blocks are highlighted uncached")
+        return func
+    namespace = dict(func.__globals__, CodeHilite=CachedCodeHilite)
+    cached = types.FunctionType(func.__code__, namespace, func.__name__, func.__defaults__, func.__closure__)
+    cached.__qualname__ = func.__qualname__
+    cached.__doc__ = func.__doc__
+    return cached
+
+
+class CachedHiliteTreeprocessor(HiliteTreeprocessor):
+    run = _using_cached_highlighter(HiliteTreeprocessor.run)
+
+
+class CachedFencedBlockPreprocessor(FencedBlockPreprocessor):
+    run = _using_cached_highlighter(FencedBlockPreprocessor.run)
+
+
+class HighlightCacheExtension(CodeHiliteExtension):
+    """``codehilite`` with highlighted blocks served from ``highlight_cache``.
+
+    Takes the same options as ``codehilite``. Fenced blocks are covered when
+    ``fenced_code`` is listed before this extension.
+    """
+
+    def extendMarkdown(self, md):
+        hiliter = CachedHiliteTreeprocessor(md)
+        hiliter.config = self.getConfigs()
+        md.treeprocessors.register(hiliter, 'hilite', 30)
+        md.registerExtension(self)
+        if 'fenced_code_block' in md.preprocessors:
+            fenced = md.preprocessors['fenced_code_block']
+            md.preprocessors.register(CachedFencedBlockPreprocessor(md, fenced.config), 'fenced_code_block', 25)
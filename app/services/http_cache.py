@@ -0,0 +1,93 @@
+"""HTTP validators (ETag / Last-Modified) and conditional GET handling"""
+import hashlib
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+VARIANT_SUFFIXES = ('-gzip"', '-br"')
+
+
+def make_etag(*parts) -> str:
+    """Return a strong ETag derived from everything that shapes a response"""
+    return '"' + hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def file_validators(paths: Iterable[str]) -> Tuple[Tuple[str, ...], float]:
+    """Return (fingerprints, newest mtime) for a set of files.
+
+    Fingerprints are ``path:mtime_ns:size`` per file, with paths relative to
+    the project root, so they agree between workers and survive restarts;
+    missing files fingerprint as empty.
+    """
+    fingerprints = []
+    newest = 0.0
+    for path in sorted(paths):
+        name = os.path.relpath(path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            fingerprints.append(f"{name}:")
+            continue
+        fingerprints.append(f"{name}:{stat.st_mtime_ns}:{stat.st_size}")
+        newest = max(newest, stat.st_mtime)
+    return tuple(fingerprints), newest
+
+
+def validator_headers(etag: str, last_modified: float) -> Dict[str, str]:
+    """Headers advertising the validators of a response"""
+    headers = {'ETag': etag}
+    if last_modified:
+        headers['Last-Modified'] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def _matching_etag(header: str, etag: str) -> Optional[str]:
+    """Return the client's tag that matches etag, or None"""
+    if header.strip() == '*':
+        return etag
+    for tag in header.split(','):
+        tag = tag.strip()
+        # If-None-Match uses weak comparison, so W/ prefixes are ignored
+        candidate = tag[2:] if tag.startswith('W/') else tag
+        # Compressed representations carry the same tag plus "-<encoding>"
+        for suffix in VARIANT_SUFFIXES:
+            if candidate.endswith(suffix):
+                candidate = candidate[:-len(suffix)] + '"'
+                break
+        if candidate == etag:
+            return tag
+    return None
+
+
+def is_not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since against the current validators"""
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        # When both are sent, If-None-Match takes precedence (RFC 9110 13.2.2)
+        return _matching_etag(if_none_match, etag) is not None
+
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(last_modified) <= since
+    return False
+
+
+def not_modified(request: Request, etag: str, last_modified: float,
+                 vary: Optional[str] = None) -> Optional[Response]:
+    """Return a 304 response if the client's cached copy is still current"""
+    if request.method not in ('GET', 'HEAD') or not is_not_modified(request, etag, last_modified):
+        return None
+    headers = validator_headers(etag, last_modified)
+    # Echo the representation the client holds (e.g. its gzip variant)
+    headers['ETag'] = _matching_etag(request.headers.get('if-none-match', ''), etag) or etag
+    if vary:
+        headers['Vary'] = vary
+    return Response(status_code=304, headers=headers)
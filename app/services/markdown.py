@@ -1,52 +1,102 @@
+import asyncio
+import queue
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
 import markdown
 from markdown.extensions import codehilite, fenced_code, tables, toc, attr_list
+from app.deps import get_config
 from app.security import sanitize_html
+from app.services.highlight_cache import HighlightCacheExtension
+
+def create_markdown() -> markdown.Markdown:
+    """Create a configured markdown processor"""
+    # Unchanged code blocks are highlighted once and reused across pages and workers
+    return markdown.Markdown(extensions=[
+        'fenced_code',
+        'tables',
+        'toc',
+        'attr_list',
+        HighlightCacheExtension(css_class='highlight', use_pygments=True)
+    ], extension_configs={
+        'toc': {
+            'permalink': True,
+            'permalink_class': 'headerlink',
+            'permalink_title': 'Permanent link'
+        }
+    })
+
+class MarkdownPool:
+    """Fixed set of markdown processors, each used by one conversion at a time.
+
+    ``markdown.Markdown`` keeps per-document state between ``convert()`` and
+    ``reset()``, so a single shared instance is not safe under concurrency.
+    """
+
+    def __init__(self, size: int = 4):
+        self.size = size
+        self._instances: "queue.LifoQueue[markdown.Markdown]" = queue.LifoQueue()
+        for _ in range(size):
+            self._instances.put(create_markdown())
+
+    @contextmanager
+    def acquire(self):
+        """Check out a processor, blocking until one is free"""
+        md = self._instances.get()
+        try:
+            yield md
+        finally:
+            md.reset()
+            self._instances.put(md)
+
+def _markdown_config() -> dict:
+    return (get_config() or {}).get('markdown', {}) or {}
+
+_pool_size = max(1, int(_markdown_config().get('pool_size', 4)))
+md_pool = MarkdownPool(_pool_size)
+_executor: Executor = None
 
-# Configure markdown processor
-md = markdown.Markdown(extensions=[
-    'fenced_code',
-    'tables', 
-    'toc',
-    'attr_list',
-    'codehilite'
-], extension_configs={
-    'codehilite': {
-        'css_class': 'highlight',
-        'use_pygments': True
-    },
-    'toc': {
-        'permalink': True,
-        'permalink_class': 'headerlink',
-        'permalink_title': 'Permanent link'
-    }
-})
+def get_render_executor() -> Executor:
+    """Return the bounded executor used to render outside the event loop"""
+    global _executor
+    if _executor is None:
+        if _markdown_config().get('executor', 'thread') == 'process':
+            _executor = ProcessPoolExecutor(max_workers=_pool_size)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=_pool_size, thread_name_prefix="markdown")
+    return _executor
+
+def use_thread_executor(max_workers: int = 1):
+    """Render in threads of this process, for worker processes that must not start a process pool of their own"""
+    global _executor
+    _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="markdown")
 
 def render_markdown(text: str) -> str:
     """Render markdown text to HTML with sanitization"""
     if not text:
         return ""
-    
+
     # Convert markdown to HTML
-    html = md.convert(text)
-    
+    with md_pool.acquire() as md:
+        html = md.convert(text)
+
     # Sanitize the HTML
-    safe_html = sanitize_html(html)
-    
-    # Reset the markdown processor for next use
-    md.reset()
-    
-    return safe_html
+    return sanitize_html(html)
+
+async def render_markdown_async(text: str) -> str:
+    """Render markdown in the render executor so large pages don't block the event loop"""
+    if not text:
+        return ""
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_render_executor(), render_markdown, text)
 
 def extract_toc(text: str) -> str:
     """Extract table of contents from markdown"""
     if not text:
         return ""
-    
+
     # Convert markdown to get TOC
-    md.convert(text)
-    toc = getattr(md, 'toc', '')
-    
-    # Reset for next use
-    md.reset()
-    
-    return toc
+    with md_pool.acquire() as md:
+        md.convert(text)
+        return getattr(md, 'toc', '')
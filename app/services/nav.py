@@ -1,18 +1,95 @@
-from typing import List, Dict, Any, Optional
+import hashlib
+import os
+import threading
+from typing import List, Dict, Any, Optional, Tuple
 from app.services.content_loader import ContentLoader
+from app.services.frozen import freeze
+from app.services.async_io import run_io
+
+# Front-matter keys that affect navigation and breadcrumbs
+NAV_FIELDS = ('title', 'slug', 'nav_order', 'parent', 'section', 'description', 'draft')
 
 class NavigationBuilder:
     def __init__(self, content_dir: str = "content/pages"):
         self.content_loader = ContentLoader(content_dir)
+        # Bumped only when nav-affecting front matter changes
+        self.version = 0
+        # Stable across processes, for caches that outlive this one
+        self.fingerprint = None
+        # Newest timestamp that could have changed the navigation, for Last-Modified
+        self.last_modified = 0.0
+        self._navigation: Tuple = ()
+        self._breadcrumb_index: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        self._signature = None
+        self._catalog_version = None
+        self._lock = threading.Lock()
+    
+    def _needs_refresh(self) -> bool:
+        """Check whether the page catalog changed since navigation was built"""
+        catalog = self.content_loader.catalog
+        return catalog.needs_refresh() or self._catalog_version != catalog.version
+    
+    def _refresh(self):
+        """Rebuild the shared navigation snapshot if page front matter changed"""
+        if not self._needs_refresh():
+            return
+        
+        with self._lock:
+            if not self._needs_refresh():
+                return
+            
+            catalog = self.content_loader.catalog
+            catalog.refresh()
+            catalog_version = catalog.version
+            pages = catalog.pages()
+            # Edits that leave nav fields alone keep the version (and page caches) as is
+            signature = repr(sorted(
+                (page['file_path'], [page.get(field) for field in NAV_FIELDS]) for page in pages
+            ))
+            
+            if signature != self._signature:
+                self._navigation = freeze(self._build_navigation(pages))
+                self._breadcrumb_index = {
+                    os.path.abspath(page['file_path']): (page.get('parent'), page.get('title'))
+                    for page in pages
+                }
+                self._signature = signature
+                self.fingerprint = hashlib.sha256(signature.encode('utf-8')).hexdigest()
+                self.last_modified = self._newest_change(pages)
+                self.version += 1
+            
+            self._catalog_version = catalog_version
     
-    def build_navigation(self) -> List[Dict[str, Any]]:
+    def _newest_change(self, pages: List[Dict[str, Any]]) -> float:
+        # The directory mtime moves when a page is added or removed
+        try:
+            newest = self.content_loader.content_dir.stat().st_mtime
+        except OSError:
+            newest = 0.0
+        for page in pages:
+            modified = page.get('modified_time')
+            if modified:
+                newest = max(newest, modified.timestamp())
+        return newest
+    
+    def build_navigation(self) -> Tuple:
+        """Return the shared, read-only navigation structure"""
+        self._refresh()
+        return self._navigation
+    
+    async def build_navigation_async(self) -> Tuple:
+        """Return the navigation, rescanning the corpus off the event loop if needed"""
+        if self._needs_refresh():
+            await run_io(self._refresh)
+        return self._navigation
+    
+    def _build_navigation(self, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Build navigation structure from page metadata"""
-        pages = self.content_loader.list_pages()
         nav_items = []
-        
-        for page_info in pages:
+        # Catalog order (newest first) keeps pages sharing a nav_order stable
+        for metadata in pages:
             try:
-                metadata, _ = self.content_loader.load_page_by_path(page_info['file_path'])
+                default_slug = self.content_loader.default_slug(metadata['file_path'])
                 
                 # Skip draft pages and pages without nav_order
                 if metadata.get('draft', False):
@@ -23,15 +100,15 @@ class NavigationBuilder:
                     continue
                 
                 nav_items.append({
-                    'title': metadata.get('title', page_info.get('slug', 'Untitled')),
-                    'slug': metadata.get('slug', page_info.get('slug', '/')),
+                    'title': metadata.get('title', metadata.get('slug', default_slug)),
+                    'slug': metadata.get('slug', default_slug),
                     'nav_order': nav_order,
                     'parent': metadata.get('parent'),
                     'section': metadata.get('section'),
                     'description': metadata.get('description', '')
                 })
             except Exception as e:
-                print(f"Error processing navigation for {page_info['file_path']}: {e}")
+                print(f"Error processing navigation for {metadata.get('file_path')}: {e}")
                 continue
         
         # Sort by nav_order
@@ -92,25 +169,26 @@ class NavigationBuilder:
         """Get breadcrumb navigation for current page"""
         breadcrumbs = [{'title': 'Home', 'slug': '/'}]
         
-        try:
-            # Load current page metadata
-            content_loader = ContentLoader()
-            metadata, _ = content_loader.load_page(current_slug)
+        self._refresh()
+        # Same slug-to-file mapping as ContentLoader.load_page
+        file_path = self.content_loader.resolve_file(current_slug)
+        entry = self._breadcrumb_index.get(os.path.abspath(file_path)) if file_path else None
+        
+        if entry is not None:
+            parent, title = entry
             
             # Add parent pages if specified
-            parent = metadata.get('parent')
             if parent:
                 breadcrumbs.append({'title': parent, 'slug': f'/{parent.lower().replace(" ", "-")}'})
             
             # Add current page
             if current_slug not in ('', '/'):
                 breadcrumbs.append({
-                    'title': metadata.get('title', current_slug),
+                    'title': title or current_slug,
                     'slug': current_slug
                 })
-        except Exception:
+        elif current_slug not in ('', '/'):
             # Fallback breadcrumb
-            if current_slug not in ('', '/'):
-                breadcrumbs.append({'title': current_slug.replace('-', ' ').title(), 'slug': current_slug})
+            breadcrumbs.append({'title': current_slug.replace('-', ' ').title(), 'slug': current_slug})
         
         return breadcrumbs
@@ -0,0 +1,305 @@
+"""Persistent page metadata catalog in the CMS database"""
+import hashlib
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.models import PageCatalog, SessionLocal, create_tables
+from app.services.front_matter import front_matter_cache
+from app.services.async_io import reconcile_interval, start_periodic
+
+# Front-matter keys stored in their own catalog columns
+CATALOG_FIELDS = ('slug', 'title', 'draft', 'section', 'parent', 'nav_order', 'description')
+
+
+def _text(value) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def catalog_values(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Map parsed front matter to catalog column values"""
+    nav_order = metadata.get('nav_order')
+    if isinstance(nav_order, bool) or not isinstance(nav_order, (int, float)):
+        nav_order = None
+    return {
+        'slug': _text(metadata.get('slug')),
+        'title': _text(metadata.get('title')),
+        'draft': bool(metadata.get('draft', False)),
+        'section': _text(metadata.get('section')),
+        'parent': _text(metadata.get('parent')),
+        'nav_order': nav_order,
+        'description': _text(metadata.get('description'))
+    }
+
+
+def row_metadata(row: PageCatalog) -> Dict[str, Any]:
+    """Return a catalog row shaped like ``FrontMatterCache.get`` output.
+
+    Unset columns are left out, so ``metadata.get('slug', default)`` keeps
+    working as it does on front matter.
+    """
+    metadata = {field: getattr(row, field) for field in CATALOG_FIELDS if getattr(row, field) is not None}
+    metadata.update({
+        'file_path': row.file_path,
+        'modified_time': datetime.fromtimestamp(row.mtime),
+        'file_size': row.size,
+        'content_hash': row.content_hash
+    })
+    return metadata
+
+
+class PageCatalogService:
+    """Keep the ``page_catalog`` table in sync with a content directory.
+
+    Listings (dashboard, navigation, sitemap) query the table instead of
+    parsing every page. The first refresh reconciles the table with the
+    directory, re-reading only files whose mtime or size differ from their
+    row, so a restart does not re-parse an unchanged site. After that CMS
+    writes keep the table current through ``upsert``/``remove``, and a
+    background rescan every ``reconcile_interval`` seconds picks up edits
+    made outside the CMS; listings never scan the directory.
+    """
+
+    def __init__(self, content_dir, session_factory=SessionLocal, reconcile_interval: float = 30.0):
+        self.content_dir = Path(content_dir)
+        self.session_factory = session_factory
+        self.reconcile_interval = reconcile_interval
+        # Bumped whenever the directory differs from the last reconciled state
+        self.version = 0
+        self.reconciles = 0
+        self.rows_written = 0
+        self.errors = 0
+        # file_path -> (mtime, size) as of the last reconcile or write
+        self._seen: Dict[str, Tuple[float, int]] = {}
+        self._table_ready = False
+        self._checked = False
+        self._reconciler: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+
+    def _key(self, file_path) -> str:
+        """Catalog key of a file: its path as listed from the content directory"""
+        relative = os.path.relpath(os.path.abspath(str(file_path)), os.path.abspath(str(self.content_dir)))
+        return str(self.content_dir / relative)
+
+    def contains(self, file_path) -> bool:
+        """Check whether a file is a page of this catalog's content directory"""
+        prefix = os.path.join(os.path.abspath(str(self.content_dir)), '')
+        return str(file_path).endswith('.md') and os.path.abspath(str(file_path)).startswith(prefix)
+
+    def _ensure_table(self):
+        if not self._table_ready:
+            create_tables()
+            self._table_ready = True
+
+    def _scan(self) -> Dict[str, Tuple[float, int]]:
+        found = {}
+        for file_path in self.content_dir.rglob("*.md"):
+            try:
+                stat = file_path.stat()
+            except OSError:
+                continue
+            found[str(file_path)] = (stat.st_mtime, stat.st_size)
+        return found
+
+    def _read(self, file_path: str, mtime: float, size: int) -> Dict[str, Any]:
+        """Column values of one page, hashing its bytes and parsing only its front matter"""
+        path = Path(file_path)
+        with open(path, 'rb') as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+        values = catalog_values(front_matter_cache.get(path))
+        values.update({'mtime': mtime, 'size': size, 'content_hash': content_hash})
+        return values
+
+    def needs_refresh(self) -> bool:
+        """Check whether the table has not been reconciled with the directory yet"""
+        return not self._checked
+
+    def refresh(self, force: bool = False):
+        """Reconcile the table with the content directory on first use; ``force`` rescans"""
+        if not force and self._checked:
+            return
+
+        with self._lock:
+            if not force and self._checked:
+                return
+            found = self._scan()
+            # Forget cached front matter of files deleted or renamed outside the CMS
+            front_matter_cache.prune(self.content_dir, found)
+            if found != self._seen and not self._reconcile(found):
+                # Leave the state stale so the next refresh retries
+                return
+            self._checked = True
+            if self._reconciler is None:
+                self._reconciler = start_periodic("catalog-reconcile", self.reconcile_interval,
+                                                  lambda: self.refresh(force=True))
+
+    def _reconcile(self, found: Dict[str, Tuple[float, int]]) -> bool:
+        self._ensure_table()
+        session = self.session_factory()
+        try:
+            rows = {
+                row.file_path: row for row in
+                session.query(PageCatalog).filter(PageCatalog.content_dir == str(self.content_dir))
+            }
+            for file_path, (mtime, size) in found.items():
+                row = rows.pop(file_path, None)
+                if row is not None and row.mtime == mtime and row.size == size:
+                    continue
+                try:
+                    values = self._read(file_path, mtime, size)
+                except Exception as e:
+                    print(f"Error cataloging {file_path}: {e}")
+                    continue
+                if row is None:
+                    session.add(PageCatalog(content_dir=str(self.content_dir), file_path=file_path, **values))
+                else:
+                    for column, value in values.items():
+                        setattr(row, column, value)
+                self.rows_written += 1
+            for row in rows.values():
+                session.delete(row)
+                self.rows_written += 1
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            self.errors += 1
+            print(f"Error reconciling page catalog: {e}")
+            return False
+        finally:
+            session.close()
+
+        self._seen = found
+        self.reconciles += 1
+        self.version += 1
+        return True
+
+    def upsert(self, file_path):
+        """Re-catalog one page after it was written, or drop it if it is gone"""
+        key = self._key(file_path)
+        try:
+            stat = os.stat(key)
+        except FileNotFoundError:
+            self.remove(file_path)
+            return
+
+        with self._lock:
+            self._ensure_table()
+            session = self.session_factory()
+            try:
+                values = self._read(key, stat.st_mtime, stat.st_size)
+                row = session.query(PageCatalog).filter(PageCatalog.file_path == key).first()
+                if row is None:
+                    session.add(PageCatalog(content_dir=str(self.content_dir), file_path=key, **values))
+                else:
+                    for column, value in values.items():
+                        setattr(row, column, value)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                self.errors += 1
+                print(f"Error cataloging {key}: {e}")
+                return
+            finally:
+                session.close()
+            self._seen[key] = (stat.st_mtime, stat.st_size)
+            self.rows_written += 1
+            self.version += 1
+
+    def remove(self, file_path):
+        """Drop a deleted page from the catalog"""
+        key = self._key(file_path)
+        with self._lock:
+            self._ensure_table()
+            session = self.session_factory()
+            try:
+                session.query(PageCatalog).filter(PageCatalog.file_path == key).delete()
+                session.commit()
+            except SQLAlchemyError as e:
+                session.rollback()
+                self.errors += 1
+                print(f"Error removing {key} from page catalog: {e}")
+                return
+            finally:
+                session.close()
+            self._seen.pop(key, None)
+            self.rows_written += 1
+            self.version += 1
+
+    def _query(self, published_only: bool):
+        query = self.session_factory().query(PageCatalog).filter(PageCatalog.content_dir == str(self.content_dir))
+        if published_only:
+            query = query.filter(PageCatalog.draft.is_(False))
+        return query
+
+    def pages(self, published_only: bool = False, limit: Optional[int] = None,
+              offset: int = 0) -> List[Dict[str, Any]]:
+        """Return page metadata, newest first, optionally one page of results"""
+        self.refresh()
+        query = self._query(published_only)
+        try:
+            query = query.order_by(PageCatalog.mtime.desc(), PageCatalog.file_path)
+            if limit is not None:
+                query = query.limit(limit)
+            return [row_metadata(row) for row in query.offset(offset)]
+        except SQLAlchemyError as e:
+            self.errors += 1
+            print(f"Error querying page catalog, listing from disk instead: {e}")
+            pages = self._pages_from_disk(published_only)
+            return pages[offset:None if limit is None else offset + limit]
+        finally:
+            query.session.close()
+
+    def _pages_from_disk(self, published_only: bool) -> List[Dict[str, Any]]:
+        """Same listing as ``pages`` built from front matter, for when the database fails"""
+        pages = []
+        for file_path, (mtime, size) in self._scan().items():
+            try:
+                row = PageCatalog(file_path=file_path, content_hash='', **{
+                    **catalog_values(front_matter_cache.get(Path(file_path))), 'mtime': mtime, 'size': size
+                })
+            except Exception as e:
+                print(f"Error loading {file_path}: {e}")
+                continue
+            if not (published_only and row.draft):
+                pages.append(row_metadata(row))
+        pages.sort(key=lambda page: page['file_path'])
+        pages.sort(key=lambda page: page['modified_time'], reverse=True)
+        return pages
+
+    def count(self, published_only: bool = False) -> int:
+        """Return the number of cataloged pages"""
+        self.refresh()
+        query = self._query(published_only)
+        try:
+            return query.count()
+        finally:
+            query.session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return catalog counters for monitoring"""
+        return {
+            'files': len(self._seen),
+            'version': self.version,
+            'reconciles': self.reconciles,
+            'rows_written': self.rows_written,
+            'errors': self.errors
+        }
+
+
+_catalogs: Dict[str, PageCatalogService] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_page_catalog(content_dir) -> PageCatalogService:
+    """Return the shared catalog of a content directory"""
+    key = os.path.abspath(str(content_dir))
+    with _catalogs_lock:
+        catalog = _catalogs.get(key)
+        if catalog is None:
+            catalog = PageCatalogService(content_dir, reconcile_interval=reconcile_interval())
+            _catalogs[key] = catalog
+        return catalog
@@ -0,0 +1,106 @@
+"""Process-wide in-memory store of parsed pages"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Tuple, Callable, Optional
+
+PageLoader = Callable[[Path, os.stat_result], Tuple[Dict[str, Any], str]]
+
+
+class PageStore:
+    """Keep parsed pages (metadata plus component-expanded body) in memory.
+
+    Entries are validated against the file's mtime and size. A validated entry
+    is trusted for ``revalidate_interval`` seconds, so steady-state loads do no
+    disk I/O at all. Writes made through the CMS call ``invalidate`` directly.
+    """
+
+    def __init__(self, revalidate_interval: float = 1.0):
+        self.revalidate_interval = revalidate_interval
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        # Bumped whenever a cached page is added, replaced or dropped
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(file_path) -> str:
+        return os.path.abspath(str(file_path))
+
+    def peek(self, file_path) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Return a page only if it can be served without touching the disk"""
+        entry = self._entries.get(self._key(file_path))
+        if entry and time.monotonic() - entry['checked'] < self.revalidate_interval:
+            self.hits += 1
+            return dict(entry['metadata']), entry['body']
+        return None
+
+    def get(self, file_path: Path, loader: PageLoader) -> Tuple[Dict[str, Any], str]:
+        """Return (metadata, body) for a file, calling loader only when it changed"""
+        key = self._key(file_path)
+        now = time.monotonic()
+        entry = self._entries.get(key)
+
+        if entry and now - entry['checked'] < self.revalidate_interval:
+            self.hits += 1
+            return dict(entry['metadata']), entry['body']
+
+        try:
+            stat = file_path.stat()
+        except FileNotFoundError:
+            self.invalidate(key)
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            entry['checked'] = now
+            self.hits += 1
+            return dict(entry['metadata']), entry['body']
+
+        metadata, body = loader(file_path, stat)
+        with self._lock:
+            self._entries[key] = {
+                'metadata': metadata,
+                'body': body,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'checked': now
+            }
+            self.generation += 1
+            self.misses += 1
+
+        return dict(metadata), body
+
+    def invalidate(self, file_path) -> bool:
+        """Drop a single cached page, returning True if it was cached"""
+        with self._lock:
+            removed = self._entries.pop(self._key(file_path), None) is not None
+            if removed:
+                self.generation += 1
+                self.invalidations += 1
+            return removed
+
+    def clear(self):
+        """Drop every cached page"""
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self.generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'generation': self.generation
+        }
+
+
+# Shared by every ContentLoader in the process
+page_store = PageStore()
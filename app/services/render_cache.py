@@ -0,0 +1,128 @@
+"""Bounded LRU cache of rendered page HTML"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Hashable
+
+from app.deps import get_config
+
+
+class RenderCache:
+    """Hold final page HTML keyed by content hash, layout and site/nav versions.
+
+    Compressed variants of a page are stored in the same entry, so they are
+    evicted and invalidated together with the HTML they were made from. The
+    cache is capped by the total size of HTML plus variants; the least
+    recently used pages are evicted first.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._keys_by_path: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _path_key(file_path) -> str:
+        return os.path.abspath(str(file_path))
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """Return cached HTML for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry['html']
+
+    def put(self, key: Hashable, html: str, file_path: str):
+        """Store rendered HTML for a page, evicting old entries past the cap"""
+        size = len(html.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+
+        path_key = self._path_key(file_path)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {'html': html, 'size': size, 'path': path_key, 'variants': {}}
+            self._keys_by_path.setdefault(path_key, set()).add(key)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def variant(self, key: Hashable, encoding: str) -> Optional[bytes]:
+        """Return a stored compressed variant of a cached page, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry['variants'].get(encoding) if entry is not None else None
+
+    def put_variant(self, key: Hashable, encoding: str, body: bytes):
+        """Store a compressed variant next to a cached page's HTML"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or encoding in entry['variants']:
+                return
+            entry['variants'][encoding] = body
+            entry['size'] += len(body)
+            self.current_bytes += len(body)
+
+            while self.current_bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry['size']
+        keys = self._keys_by_path.get(entry['path'])
+        if keys:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_path[entry['path']]
+
+    def invalidate_path(self, file_path) -> int:
+        """Drop every cached render of one page file"""
+        with self._lock:
+            keys = list(self._keys_by_path.get(self._path_key(file_path), ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """Drop every cached render"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_path.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def _configured_max_bytes() -> int:
+    cache_config = (get_config() or {}).get('cache', {}) or {}
+    return int(cache_config.get('render_max_mb', 64)) * 1024 * 1024
+
+
+# Shared by the public routes and the CMS invalidation hooks
+render_cache = RenderCache(max_bytes=_configured_max_bytes())
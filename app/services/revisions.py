@@ -0,0 +1,128 @@
+"""Pages as they were at a commit, read from git objects"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, FrozenSet, Hashable, NamedTuple, Optional, Tuple
+
+from .dependencies import find_content_sources
+from .git_objects import ABBREV, parse_ident, subject
+from .http_cache import file_validators
+
+
+class PageRevision(NamedTuple):
+    commit: Dict[str, Any]
+    blob: str
+    metadata: Dict[str, Any]
+    body: str
+    # Fingerprints of the current data files and component templates the body was expanded from
+    sources: Tuple[str, ...]
+
+
+class RevisionLoader:
+    """Load and cache pages at any commit without checking files out.
+
+    Commits, trees and blobs are read through ``GitRepo``'s long-lived
+    cat-file process. Parsed blobs are cached by blob SHA, so a page that
+    did not change across many commits is decoded once. Components expand
+    against today's data files and component templates, so expanded bodies
+    are cached by blob SHA plus the fingerprints of those files, and
+    rendered revisions (``rendered``) are keyed by the caller on the same
+    fingerprints and its templates'. Every cache is an LRU capped at
+    ``cache_size`` entries.
+    """
+
+    def __init__(self, git_repo, content_loader, cache_size: int = 256):
+        self.git_repo = git_repo
+        self.content_loader = content_loader
+        self.cache_size = cache_size
+        self._pages: "OrderedDict[str, Tuple[Dict[str, Any], str, FrozenSet[str]]]" = OrderedDict()
+        self._bodies: "OrderedDict[Tuple[str, Tuple[str, ...]], str]" = OrderedDict()
+        self._rendered: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.render_hits = 0
+        self.render_misses = 0
+
+    def _put(self, cache: OrderedDict, key, value):
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def _get(self, cache: OrderedDict, key):
+        with self._lock:
+            value = cache.get(key)
+            if value is not None:
+                cache.move_to_end(key)
+            return value
+
+    def load_page(self, file_path: str, rev: str) -> Optional[PageRevision]:
+        """Return a page file as of ``rev``, or None if the revision or file does not exist"""
+        found = self.git_repo.file_at(file_path, rev)
+        if found is None or found[1] is None or found[1].mode not in ('100644', '100755'):
+            return None
+        commit, entry = found
+        name, email, timestamp, _ = parse_ident(commit.author)
+        info = {
+            'hash': commit.sha[:ABBREV],
+            'sha': commit.sha,
+            'message': subject(commit.message),
+            'author': name,
+            'email': email,
+            'date': datetime.fromtimestamp(timestamp)
+        }
+
+        parsed = self._get(self._pages, entry.sha)
+        if parsed is None:
+            self.misses += 1
+            data = self.git_repo.read_blob(entry.sha)
+            if data is None:
+                return None
+            text = data.decode('utf-8', 'replace')
+            metadata, body = self.content_loader.parse_text(text, f"{file_path} at {info['hash']}")
+            metadata.update({
+                'file_size': len(data),
+                'content_hash': hashlib.sha256(data).hexdigest()
+            })
+            parsed = (metadata, body, find_content_sources(body))
+            self._put(self._pages, entry.sha, parsed)
+        else:
+            self.hits += 1
+
+        metadata, raw_body, sources = parsed
+        fingerprints, _ = file_validators(sources)
+        body = self._get(self._bodies, (entry.sha, fingerprints))
+        if body is None:
+            body = self.content_loader.component_processor.process_content(raw_body)
+            self._put(self._bodies, (entry.sha, fingerprints), body)
+        metadata = dict(metadata, file_path=file_path, modified_time=info['date'], revision=commit.sha)
+        return PageRevision(info, entry.sha, metadata, body, fingerprints)
+
+    def rendered(self, key: Hashable) -> Optional[str]:
+        """Return cached HTML of a rendered revision, or None"""
+        html = self._get(self._rendered, key)
+        if html is None:
+            self.render_misses += 1
+        else:
+            self.render_hits += 1
+        return html
+
+    def store_rendered(self, key: Hashable, html: str):
+        """Cache the HTML of a rendered revision"""
+        self._put(self._rendered, key, html)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring"""
+        return {
+            'pages': len(self._pages),
+            'bodies': len(self._bodies),
+            'rendered': len(self._rendered),
+            'max_entries': self.cache_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'render_hits': self.render_hits,
+            'render_misses': self.render_misses
+        }
@@ -0,0 +1,200 @@
+"""Slug-to-file routing index for the content tree"""
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.async_io import reconcile_interval, start_periodic
+from app.services.front_matter import front_matter_cache
+
+# Claim priorities: a front-matter slug beats the file's own path, which beats an alias
+SLUG, PATH, ALIAS = 0, 1, 2
+
+
+def route_key(slug) -> str:
+    """Normalize a URL slug to a routing key ('' is the site root)"""
+    return str(slug or '').strip('/')
+
+
+class RouteIndex:
+    """Map URL slugs to page files across nested content directories.
+
+    Every page answers to its path below the content directory
+    (``guides/setup.md`` -> ``/guides/setup``, ``guides/index.md`` ->
+    ``/guides``), to its front-matter ``slug`` and to any ``aliases``.
+    Legacy flat names still resolve: ``/guides/setup`` falls back to
+    ``guides_setup.md``. When two files claim the same slug the
+    higher-priority claim wins, ties going to the first path in sort order.
+
+    Lookups are dictionary hits. The tree is scanned once on first use;
+    after that CMS writes update single files via ``update``/``remove``,
+    and a background rescan every ``reconcile_interval`` seconds picks up
+    edits made outside the CMS without a request ever paying for it.
+    """
+
+    def __init__(self, content_dir, reconcile_interval: float = 30.0):
+        self.content_dir = Path(content_dir)
+        self.reconcile_interval = reconcile_interval
+        self._routes: Dict[str, str] = {}
+        self._claims: Dict[str, List[Tuple[int, str]]] = {}
+        self._file_claims: Dict[str, Tuple[Tuple[int, str], ...]] = {}
+        self._canonical: Dict[str, str] = {}
+        # Absolute key -> path as found under content_dir (e.g. content/pages/a.md)
+        self._paths: Dict[str, str] = {}
+        self._checked = False
+        self._reconciler: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+
+    def _key(self, file_path) -> str:
+        return os.path.abspath(str(file_path))
+
+    def path_routes(self, file_path) -> Tuple[str, ...]:
+        """Return the routes a file gets from its location in the content tree"""
+        relative = Path(os.path.relpath(self._key(file_path), self._key(self.content_dir)))
+        route = relative.with_suffix('').as_posix()
+        if relative.stem == 'index':
+            parent = relative.parent.as_posix()
+            return ('' if parent == '.' else parent, route)
+        return (route,)
+
+    def _file_claims_from(self, file_path, metadata: dict) -> Tuple[Tuple[int, str], ...]:
+        claims = []
+        if 'slug' in metadata and metadata['slug'] is not None:
+            claims.append((SLUG, route_key(metadata['slug'])))
+        claims.extend((PATH, route) for route in self.path_routes(file_path))
+        aliases = metadata.get('aliases') or ()
+        if isinstance(aliases, str):
+            aliases = (aliases,)
+        claims.extend((ALIAS, route_key(alias)) for alias in aliases)
+        return tuple(claims)
+
+    def _canonical_url(self, claims: Tuple[Tuple[int, str], ...]) -> str:
+        # Front-matter slug if set, otherwise the file's primary path route
+        return '/' + min(claims)[1]
+
+    def _set_file(self, key: str, file_path, claims: Tuple[Tuple[int, str], ...]):
+        if self._file_claims.get(key) == claims:
+            return
+        self._drop_file(key)
+        self._file_claims[key] = claims
+        self._paths[key] = str(file_path)
+        self._canonical[key] = self._canonical_url(claims)
+        for priority, route in claims:
+            contenders = self._claims.setdefault(route, [])
+            contenders.append((priority, key))
+            contenders.sort()
+            self._routes[route] = contenders[0][1]
+            if len({claimant for _, claimant in contenders}) > 1:
+                print(f"Route '/{route}' is claimed by several pages, serving {self._paths[contenders[0][1]]}")
+
+    def _drop_file(self, key: str):
+        for _, route in self._file_claims.pop(key, ()):
+            contenders = [claim for claim in self._claims.get(route, []) if claim[1] != key]
+            if contenders:
+                self._claims[route] = contenders
+                self._routes[route] = contenders[0][1]
+            else:
+                self._claims.pop(route, None)
+                self._routes.pop(route, None)
+        self._canonical.pop(key, None)
+        self._paths.pop(key, None)
+
+    def update(self, file_path):
+        """Re-index one page after it was written, or drop it if it is gone"""
+        key = self._key(file_path)
+        with self._lock:
+            try:
+                metadata = front_matter_cache.get(Path(file_path))
+            except FileNotFoundError:
+                self._drop_file(key)
+                return
+            except Exception as e:
+                print(f"Error indexing routes for {file_path}: {e}")
+                metadata = {}
+            self._set_file(key, file_path, self._file_claims_from(file_path, metadata))
+
+    def remove(self, file_path):
+        """Drop every route of a deleted page"""
+        with self._lock:
+            self._drop_file(self._key(file_path))
+
+    def needs_refresh(self) -> bool:
+        """Check whether the index still has to be built"""
+        return not self._checked
+
+    def refresh(self, force: bool = False):
+        """Build the index on first use; ``force`` rescans the content tree"""
+        if not force and self._checked:
+            return
+
+        with self._lock:
+            if not force and self._checked:
+                return
+            files = list(self.content_dir.rglob("*.md"))
+            seen = set()
+            for file_path in sorted(files):
+                seen.add(self._key(file_path))
+                self.update(file_path)
+            for key in [key for key in self._file_claims if key not in seen]:
+                self._drop_file(key)
+            self._checked = True
+            if self._reconciler is None:
+                self._reconciler = start_periodic("route-reconcile", self.reconcile_interval,
+                                                  lambda: self.refresh(force=True))
+
+    def _discover(self, key: str) -> bool:
+        """Index a page created outside the CMS since the last rescan, if it serves ``key``"""
+        root = os.path.join(self._key(self.content_dir), '')
+        candidates = [self.content_dir / 'index.md'] if not key else [
+            self.content_dir / f"{key}.md", self.content_dir / key / 'index.md']
+        for file_path in candidates:
+            key_path = self._key(file_path)
+            if key_path.startswith(root) and key_path not in self._file_claims and file_path.is_file():
+                self.update(file_path)
+                return True
+        return False
+
+    def resolve(self, slug) -> Optional[Path]:
+        """Return the page file serving a slug, or None"""
+        self.refresh()
+        key = route_key(slug)
+        file_key = self._routes.get(key)
+        if file_key is None and self._discover(key):
+            file_key = self._routes.get(key)
+        if file_key is None and '/' in key:
+            # Flat files named after nested URLs, e.g. guides_setup.md
+            file_key = self._routes.get(key.replace('/', '_'))
+        return Path(self._paths[file_key]) if file_key else None
+
+    def url_for(self, file_path) -> str:
+        """Return the canonical URL path of a page file"""
+        self.refresh()
+        key = self._key(file_path)
+        url = self._canonical.get(key)
+        if url is None:
+            url = '/' + self.path_routes(file_path)[0]
+        return url
+
+    def files(self) -> Iterable[str]:
+        """Return every indexed page file"""
+        self.refresh()
+        return list(self._paths.values())
+
+    def stats(self) -> Dict[str, int]:
+        """Return index sizes for monitoring"""
+        return {'routes': len(self._routes), 'files': len(self._file_claims)}
+
+
+_indexes: Dict[str, RouteIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_route_index(content_dir) -> RouteIndex:
+    """Return the shared routing index of a content directory"""
+    key = os.path.abspath(str(content_dir))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = RouteIndex(content_dir, reconcile_interval())
+            _indexes[key] = index
+        return index
@@ -0,0 +1,165 @@
+"""Pluggable HTML sanitization stage with a result cache"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from bleach.sanitizer import Cleaner
+
+from app.deps import get_config
+from app.security import ALLOWED_TAGS, ALLOWED_ATTRIBUTES, ALLOWED_PROTOCOLS
+
+try:
+    import nh3
+except ImportError:  # optional fast backend
+    nh3 = None
+
+
+class BleachSanitizer:
+    """The reference backend: bleach with the allowlist from app.security"""
+
+    name = "bleach"
+
+    def __init__(self):
+        # A Cleaner keeps parser state between calls, so each thread gets its own
+        self._local = threading.local()
+
+    def _cleaner(self) -> Cleaner:
+        cleaner = getattr(self._local, 'cleaner', None)
+        if cleaner is None:
+            cleaner = Cleaner(tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, protocols=ALLOWED_PROTOCOLS)
+            self._local.cleaner = cleaner
+        return cleaner
+
+    def clean(self, html: str) -> str:
+        return self._cleaner().clean(html)
+
+
+def _bleach_compatible_attribute(tag: str, attribute: str, value: str) -> Optional[str]:
+    # bleach blanks style values when no CSS sanitizer is configured
+    return "" if attribute == "style" else value
+
+
+class Nh3Sanitizer:
+    """Rust-backed sanitizer (nh3/ammonia) configured from the same allowlist.
+
+    Allowed markup comes out the same as with bleach. Disallowed tags are
+    dropped instead of escaped, and script/style contents are removed.
+    """
+
+    name = "nh3"
+
+    def __init__(self):
+        if nh3 is None:
+            raise ImportError("nh3 is not installed")
+        self._cleaner = nh3.Cleaner(
+            tags=set(ALLOWED_TAGS),
+            attributes={tag: set(attributes) for tag, attributes in ALLOWED_ATTRIBUTES.items()},
+            attribute_filter=_bleach_compatible_attribute,
+            url_schemes=set(ALLOWED_PROTOCOLS),
+            # "rel" is allowlisted on links, so ammonia must not add its own
+            link_rel=None
+        )
+
+    def clean(self, html: str) -> str:
+        return self._cleaner.clean(html)
+
+
+SANITIZER_BACKENDS = {
+    'bleach': BleachSanitizer,
+    'nh3': Nh3Sanitizer
+}
+
+
+class CachedSanitizer:
+    """Wrap a backend with an LRU of results keyed by a hash of the input HTML.
+
+    Pages that re-render without their markdown changing (new layout, nav
+    or config version) and repeated component output skip sanitization.
+    """
+
+    def __init__(self, backend, max_entries: int = 512):
+        self.backend = backend
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def name(self) -> str:
+        return self.backend.name
+
+    def clean(self, html: str) -> str:
+        """Sanitize HTML, reusing the result for identical input"""
+        if not html:
+            return html
+        if self.max_entries <= 0:
+            return self.backend.clean(html)
+
+        key = hashlib.sha256(html.encode('utf-8')).digest()
+        with self._lock:
+            cleaned = self._entries.get(key)
+            if cleaned is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cleaned
+
+        cleaned = self.backend.clean(html)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = cleaned
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return cleaned
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            'backend': self.name,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def create_sanitizer(backend: str = None, cache_size: int = None) -> CachedSanitizer:
+    """Build the sanitization stage from security.sanitizer / security.sanitize_cache_size"""
+    security_config = (get_config() or {}).get('security', {}) or {}
+    if backend is None:
+        backend = security_config.get('sanitizer', 'bleach')
+    if cache_size is None:
+        cache_size = int(security_config.get('sanitize_cache_size', 512))
+
+    backend_class = SANITIZER_BACKENDS.get(backend)
+    if backend_class is None:
+        print(f"Unknown sanitizer backend '{backend}', using bleach")
+        backend_class = BleachSanitizer
+    try:
+        instance = backend_class()
+    except ImportError as e:
+        print(f"Sanitizer backend '{backend}' unavailable ({e}), using bleach")
+        instance = BleachSanitizer()
+    return CachedSanitizer(instance, cache_size)
+
+
+_sanitizer: CachedSanitizer = None
+_sanitizer_lock = threading.Lock()
+
+
+def get_sanitizer() -> CachedSanitizer:
+    """Return the process-wide sanitization stage"""
+    global _sanitizer
+    if _sanitizer is None:
+        with _sanitizer_lock:
+            if _sanitizer is None:
+                _sanitizer = create_sanitizer()
+    return _sanitizer
@@ -1,74 +1,99 @@
 import os
-import re
-from pathlib import Path
+import threading
 from typing import List, Dict, Any
 from app.services.content_loader import ContentLoader
+from app.services.search_index import search_index, tokenize
+from app.services.async_io import run_io, start_periodic
 
 class SimpleSearch:
-    def __init__(self, content_dir: str = "content/pages"):
+    """Ranked search and completions over the shared in-memory index.
+    
+    The index is built on first use. After that CMS writes keep it current
+    through ``index_page``, and a background reconcile every
+    ``reconcile_interval`` seconds picks up edits made outside the CMS, so
+    queries and suggestions never scan the content directory.
+    """
+    
+    def __init__(self, content_dir: str = "content/pages", reconcile_interval: float = 30.0):
         self.content_loader = ContentLoader(content_dir)
+        self.index = search_index
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.Lock()
+    
+    def _needs_refresh(self) -> bool:
+        """Check whether the index has not been built yet"""
+        return not self.index.synced
+    
+    def refresh(self, force: bool = False):
+        """Build the index on first use; ``force`` reconciles it with the content directory"""
+        if not force and not self._needs_refresh():
+            return
+        
+        index = self.index
+        with self._lock:
+            if not force and not self._needs_refresh():
+                return
+            seen = set()
+            for metadata in self.content_loader.list_page_metadata():
+                file_path = metadata['file_path']
+                seen.add(os.path.abspath(file_path))
+                if metadata.get('draft', False):
+                    index.remove_document(file_path)
+                elif index.content_hash(file_path) != metadata.get('content_hash'):
+                    self.index_page(file_path)
+            
+            for doc_id in index.document_ids():
+                if doc_id not in seen:
+                    index.remove_document(doc_id)
+            
+            index.synced = True
+            index.reconciles += 1
+            if index.reconciler is None:
+                index.reconciler = start_periodic("search-reconcile", self.reconcile_interval,
+                                                  lambda: self.refresh(force=True))
+    
+    def index_page(self, file_path: str):
+        """Add, update or remove a single page after it was saved or deleted"""
+        try:
+            metadata, content = self.content_loader.load_page_by_path(file_path)
+        except FileNotFoundError:
+            self.index.remove_document(file_path)
+            return
+        
+        if metadata.get('draft', False):
+            self.index.remove_document(file_path)
+        else:
+            self.index.add_document(metadata, content)
     
     def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
-        """Simple text search across all pages"""
+        """Ranked full-text search across all published pages"""
         if not query or len(query.strip()) < 2:
             return []
         
         query = query.lower().strip()
-        results = []
+        self.refresh()
         
-        # Get all pages
-        pages = self.content_loader.list_pages()
-        
-        for page_info in pages:
-            try:
-                metadata, content = self.content_loader.load_page_by_path(page_info['file_path'])
-                
-                # Skip draft pages
-                if metadata.get('draft', False):
-                    continue
-                
-                # Search in title, description, and content
-                searchable_text = ' '.join([
-                    metadata.get('title', ''),
-                    metadata.get('description', ''),
-                    content
-                ]).lower()
-                
-                # Simple keyword matching
-                if query in searchable_text:
-                    # Calculate relevance score (simple)
-                    score = 0
-                    
-                    # Title match is most important
-                    if query in metadata.get('title', '').lower():
-                        score += 10
-                    
-                    # Description match
-                    if query in metadata.get('description', '').lower():
-                        score += 5
-                    
-                    # Content match
-                    content_matches = searchable_text.count(query)
-                    score += content_matches
-                    
-                    # Extract snippet around match
-                    snippet = self._extract_snippet(content, query)
-                    
-                    results.append({
-                        'title': metadata.get('title', page_info.get('slug', 'Untitled')),
-                        'slug': metadata.get('slug', page_info.get('slug')),
-                        'description': metadata.get('description', ''),
-                        'snippet': snippet,
-                        'score': score,
-                        'file_path': page_info['file_path']
-                    })
-            except Exception as e:
-                print(f"Error searching page {page_info['file_path']}: {e}")
-                continue
+        results = []
+        for document, score in self.index.search(query, limit):
+            metadata = document['metadata']
+            file_path = metadata['file_path']
+            slug = metadata.get('slug', self.content_loader.default_slug(file_path))
+            results.append({
+                'title': metadata.get('title', slug or 'Untitled'),
+                'slug': slug,
+                'description': metadata.get('description', ''),
+                'snippet': self._extract_snippet(document['content'], query),
+                'score': round(score, 4),
+                'file_path': file_path
+            })
         
-        # Sort by relevance score and limit results
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:limit]
+        return results
+    
+    async def search_async(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Search, building the index off the event loop on first use"""
+        if self._needs_refresh():
+            await run_io(self.refresh)
+        return self.search(query, limit)
     
     def _extract_snippet(self, content: str, query: str, snippet_length: int = 150) -> str:
         """Extract a snippet around the search query"""
@@ -77,6 +102,13 @@ class SimpleSearch:
         
         # Find the first occurrence of the query
         index = content_lower.find(query_lower)
+        if index == -1:
+            # Multi-term queries fall back to the first term that occurs
+            for term in tokenize(query_lower):
+                index = content_lower.find(term)
+                if index != -1:
+                    query = term
+                    break
         if index == -1:
             # If not found, return the first part of content
             return content[:snippet_length] + "..." if len(content) > snippet_length else content
@@ -96,28 +128,15 @@ class SimpleSearch:
         return snippet
 
     def get_search_suggestions(self, query: str, limit: int = 5) -> List[str]:
-        """Get search suggestions based on existing content"""
+        """Get completions for a prefix, most frequent terms first"""
         if not query or len(query.strip()) < 2:
             return []
         
-        suggestions = set()
-        pages = self.content_loader.list_pages()
-        
-        for page_info in pages[:20]:  # Limit to recent pages for performance
-            try:
-                metadata, content = self.content_loader.load_page_by_path(page_info['file_path'])
-                
-                # Extract words from title and content
-                title = metadata.get('title', '')
-                words = re.findall(r'\b\w{3,}\b', (title + ' ' + content).lower())
-                
-                for word in words:
-                    if query.lower() in word and word not in suggestions:
-                        suggestions.add(word)
-                        if len(suggestions) >= limit:
-                            break
-                            
-            except Exception:
-                continue
-        
-        return list(suggestions)[:limit]
+        self.refresh()
+        return self.index.suggest(query, limit)
+    
+    async def get_search_suggestions_async(self, query: str, limit: int = 5) -> List[str]:
+        """Get completions, building the index off the event loop on first use"""
+        if self._needs_refresh():
+            await run_io(self.refresh)
+        return self.get_search_suggestions(query, limit)
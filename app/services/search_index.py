@@ -0,0 +1,189 @@
+"""Inverted index with BM25 ranking for page search"""
+import bisect
+import heapq
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+TOKEN_PATTERN = re.compile(r'\w+')
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# Term frequencies are weighted per field before BM25 scoring
+FIELD_WEIGHTS = {'title': 3.0, 'description': 2.0, 'body': 1.0}
+
+# Shorter words are not offered as completions
+MIN_SUGGESTION_LENGTH = 3
+SUGGESTION_CACHE_SIZE = 1024
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens"""
+    return TOKEN_PATTERN.findall(text.lower()) if text else []
+
+
+class SearchIndex:
+    """Tokenized inverted index over published pages.
+
+    Postings map each term to the weighted term frequency per document.
+    Documents are added, replaced and removed individually so the index can
+    be kept current without rebuilding it. A vocabulary of raw term counts,
+    kept as a lazily re-sorted array, serves prefix completions.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._total_length = 0.0
+        self._vocabulary: Dict[str, int] = {}
+        self._sorted_terms: List[str] = []
+        self._vocabulary_dirty = False
+        self._suggestion_cache: Dict[Tuple[str, int], List[str]] = {}
+        self._lock = threading.RLock()
+        # Set by SimpleSearch once the index was built from the content directory
+        self.synced = False
+        self.reconciles = 0
+        self.reconciler = None
+
+    @staticmethod
+    def _doc_id(file_path) -> str:
+        return os.path.abspath(str(file_path))
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def content_hash(self, file_path) -> str:
+        """Return the content hash a document was indexed with, if any"""
+        document = self._documents.get(self._doc_id(file_path))
+        return document['content_hash'] if document else None
+
+    def document_ids(self) -> List[str]:
+        return list(self._documents)
+
+    def add_document(self, metadata: Dict[str, Any], content: str):
+        """Index (or re-index) a page from its metadata and body"""
+        doc_id = self._doc_id(metadata['file_path'])
+        fields = {
+            'title': str(metadata.get('title', '') or ''),
+            'description': str(metadata.get('description', '') or ''),
+            'body': TAG_PATTERN.sub(' ', content or '')
+        }
+
+        frequencies = Counter()
+        counts = Counter()
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS[field]
+            for term in tokenize(text):
+                frequencies[term] += weight
+                if len(term) >= MIN_SUGGESTION_LENGTH:
+                    counts[term] += 1
+        length = sum(frequencies.values())
+
+        with self._lock:
+            self.remove_document(doc_id)
+            for term, frequency in frequencies.items():
+                self._postings.setdefault(term, {})[doc_id] = frequency
+            self._documents[doc_id] = {
+                'metadata': metadata,
+                'content': content,
+                'terms': tuple(frequencies),
+                'counts': counts,
+                'length': length,
+                'content_hash': metadata.get('content_hash')
+            }
+            self._total_length += length
+            self._update_vocabulary(counts, 1)
+
+    def remove_document(self, file_path) -> bool:
+        """Remove a page from the index, returning True if it was indexed"""
+        doc_id = self._doc_id(file_path)
+        with self._lock:
+            document = self._documents.pop(doc_id, None)
+            if document is None:
+                return False
+            for term in document['terms']:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(doc_id, None)
+                    if not postings:
+                        del self._postings[term]
+            self._total_length -= document['length']
+            self._update_vocabulary(document['counts'], -1)
+            return True
+
+    def _update_vocabulary(self, counts: Counter, sign: int):
+        """Add or subtract a document's term counts from the vocabulary"""
+        if not counts:
+            return
+        for term, count in counts.items():
+            total = self._vocabulary.get(term, 0) + sign * count
+            if total > 0:
+                if term not in self._vocabulary:
+                    self._vocabulary_dirty = True
+                self._vocabulary[term] = total
+            else:
+                self._vocabulary.pop(term, None)
+                self._vocabulary_dirty = True
+        self._suggestion_cache.clear()
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[Dict[str, Any], float]]:
+        """Rank documents matching any query term by BM25"""
+        terms = set(tokenize(query))
+        with self._lock:
+            total = len(self._documents)
+            if not terms or not total:
+                return []
+
+            average_length = self._total_length / total or 1.0
+            scores: Dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    length = self._documents[doc_id]['length']
+                    norm = self.k1 * (1 - self.b + self.b * length / average_length)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            return [(self._documents[doc_id], score) for doc_id, score in best]
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[str]:
+        """Return the most frequent vocabulary terms starting with prefix"""
+        prefix = prefix.lower().strip()
+        key = (prefix, limit)
+        with self._lock:
+            cached = self._suggestion_cache.get(key)
+            if cached is not None:
+                return list(cached)
+
+            if self._vocabulary_dirty:
+                self._sorted_terms = sorted(self._vocabulary)
+                self._vocabulary_dirty = False
+
+            start = bisect.bisect_left(self._sorted_terms, prefix)
+            end = bisect.bisect_left(self._sorted_terms, prefix + '\U0010ffff', start)
+            suggestions = heapq.nlargest(limit, self._sorted_terms[start:end], key=self._vocabulary.__getitem__)
+
+            if len(self._suggestion_cache) >= SUGGESTION_CACHE_SIZE:
+                self._suggestion_cache.clear()
+            self._suggestion_cache[key] = suggestions
+            return list(suggestions)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index size counters for monitoring"""
+        return {
+            'documents': len(self._documents),
+            'terms': len(self._postings),
+            'vocabulary': len(self._vocabulary),
+            'reconciles': self.reconciles
+        }
+
+
+# Shared by every SimpleSearch in the process
+search_index = SearchIndex()
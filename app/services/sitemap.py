@@ -0,0 +1,147 @@
+"""Cached sitemap documents with sitemap-index splitting"""
+import hashlib
+import threading
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from app.services.config_service import config_service
+
+# Protocol limit per sitemap file (https://www.sitemaps.org/protocol.html)
+MAX_URLS_PER_SITEMAP = 50000
+# URLs per streamed chunk
+CHUNK_URLS = 1000
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+
+
+def w3c_datetime(timestamp: float) -> str:
+    """Format a timestamp the way <lastmod> expects"""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+
+class SitemapBuilder:
+    """Build sitemap XML from page metadata and keep it until content changes.
+
+    Published pages are re-queried from the page catalog only when its
+    version or the config changed, and documents are rebuilt only when the
+    resulting URL list, lastmod dates or base URL actually differ. Up to
+    ``max_urls`` pages are served as a single ``/sitemap.xml``; beyond that
+    it becomes a sitemap index pointing at ``/sitemap-1.xml`` ... ``-N.xml``.
+    Documents are kept as pre-encoded chunks so responses can be streamed.
+    """
+
+    def __init__(self, content_loader, max_urls: int = MAX_URLS_PER_SITEMAP):
+        self.content_loader = content_loader
+        self.max_urls = max_urls
+        self.version = 0
+        self.fingerprint = None
+        self.last_modified = 0.0
+        self._documents: Dict[int, Dict[str, Any]] = {}
+        self._signature = None
+        self._catalog_version = None
+        self._config_version = None
+        self._lock = threading.Lock()
+
+    def needs_refresh(self) -> bool:
+        """Check whether the page listing must be re-read before serving"""
+        catalog = self.content_loader.catalog
+        return (catalog.needs_refresh() or self._catalog_version != catalog.version
+                or self._config_version != config_service.version)
+
+    def refresh(self):
+        """Rebuild the sitemap documents if the published URLs changed"""
+        if not self.needs_refresh():
+            return
+
+        with self._lock:
+            if not self.needs_refresh():
+                return
+
+            config_version = config_service.version
+            self.content_loader.catalog.refresh()
+            catalog_version = self.content_loader.catalog.version
+            base_url = (config_service.get().get('site', {}) or {}).get('base_url', 'http://localhost:5000')
+            entries = self._entries(base_url.rstrip('/'))
+            signature = repr((base_url, entries))
+
+            if signature != self._signature:
+                self._documents = self._build_documents(base_url.rstrip('/'), entries)
+                self._signature = signature
+                self.fingerprint = hashlib.sha256(signature.encode('utf-8')).hexdigest()
+                self.last_modified = max(
+                    [config_service.last_modified] + [modified for _, modified in entries]
+                )
+                self.version += 1
+
+            self._catalog_version = catalog_version
+            self._config_version = config_version
+
+    def _entries(self, base_url: str) -> List[Tuple[str, float]]:
+        """Return (loc, modified timestamp) for every published page, newest first"""
+        entries = []
+        for metadata in self.content_loader.catalog.pages(published_only=True):
+            slug = str(metadata.get('slug', self.content_loader.default_slug(metadata['file_path'])) or '')
+            if not slug:
+                continue
+            url = f"{base_url}{slug if slug.startswith('/') else '/' + slug}"
+            modified = metadata.get('modified_time')
+            entries.append((url, modified.timestamp() if modified else 0.0))
+        return entries
+
+    @staticmethod
+    def _chunked(lines: List[str]) -> Tuple[bytes, ...]:
+        return tuple(
+            ''.join(lines[start:start + CHUNK_URLS]).encode('utf-8')
+            for start in range(0, len(lines), CHUNK_URLS)
+        )
+
+    def _urlset(self, entries: List[Tuple[str, float]]) -> Dict[str, Any]:
+        lines = [
+            f'  <url><loc>{escape(url)}</loc><lastmod>{w3c_datetime(modified)}</lastmod></url>\n'
+            if modified else f'  <url><loc>{escape(url)}</loc></url>\n'
+            for url, modified in entries
+        ]
+        head = f'{XML_HEADER}<urlset xmlns="{SITEMAP_NS}">\n'.encode('utf-8')
+        return {
+            'chunks': (head,) + self._chunked(lines) + (b'</urlset>',),
+            'last_modified': max([modified for _, modified in entries], default=0.0)
+        }
+
+    def _build_documents(self, base_url: str, entries: List[Tuple[str, float]]) -> Dict[int, Dict[str, Any]]:
+        """Return documents by number: 0 is /sitemap.xml, N is /sitemap-N.xml"""
+        if len(entries) <= self.max_urls:
+            return {0: self._urlset(entries)}
+
+        documents = {}
+        lines = []
+        for number, start in enumerate(range(0, len(entries), self.max_urls), start=1):
+            document = self._urlset(entries[start:start + self.max_urls])
+            documents[number] = document
+            lastmod = (f'<lastmod>{w3c_datetime(document["last_modified"])}</lastmod>'
+                       if document['last_modified'] else '')
+            lines.append(f'  <sitemap><loc>{escape(base_url)}/sitemap-{number}.xml</loc>{lastmod}</sitemap>\n')
+
+        head = f'{XML_HEADER}<sitemapindex xmlns="{SITEMAP_NS}">\n'.encode('utf-8')
+        documents[0] = {
+            'chunks': (head,) + self._chunked(lines) + (b'</sitemapindex>',),
+            'last_modified': max(document['last_modified'] for document in documents.values())
+        }
+        return documents
+
+    def document(self, number: int = 0) -> Optional[Dict[str, Any]]:
+        """Return a sitemap document ({'chunks', 'last_modified'}), or None"""
+        self.refresh()
+        return self._documents.get(number)
+
+    def numbers(self) -> List[int]:
+        """Return the numbers of every current document (0 is /sitemap.xml)"""
+        self.refresh()
+        return sorted(self._documents)
+
+
+async def stream_document(document: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """Yield a document's pre-encoded chunks for a StreamingResponse"""
+    for chunk in document['chunks']:
+        yield chunk
@@ -0,0 +1,112 @@
+"""Benchmark page throughput under concurrent requests.
+
+Drives the ASGI app in-process (no sockets) with N concurrent clients that
+each request the published pages in turn, and reports requests per second
+for N = 1, 2, 4, ... 32. With a blocking content path throughput stays flat
+as N grows; with reads offloaded to the I/O pool it should scale until the
+pool is saturated.
+
+Run from the project root:
+
+    python -m benchmarks.bench_concurrency [--requests 400] [--no-cache] [--fs-latency-ms 5]
+
+--no-cache drops the page store and render cache before every request, so
+each one reads and parses its page from disk. --fs-latency-ms adds a sleep
+to every page read to imitate a slow or network filesystem.
+"""
+import argparse
+import asyncio
+import time
+
+from app.services.content_loader import ContentLoader
+from app.services.page_store import page_store
+from app.services.render_cache import render_cache
+
+CONCURRENCY = (1, 2, 4, 8, 16, 32)
+
+
+async def _get(app, path: str) -> int:
+    """Issue a single GET through the ASGI interface and return the status"""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode('utf-8'),
+        'root_path': '',
+        'query_string': b'',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('localhost', 80),
+    }
+    status = 0
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await app(scope, receive, send)
+    return status
+
+
+async def _run(app, paths, concurrency: int, total: int, no_cache: bool) -> float:
+    counter = iter(range(total))
+
+    async def client():
+        for i in counter:
+            if no_cache:
+                page_store.clear()
+                render_cache.clear()
+            status = await _get(app, paths[i % len(paths)])
+            if status != 200:
+                raise RuntimeError(f"{paths[i % len(paths)]} returned {status}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+
+def _add_fs_latency(seconds: float):
+    """Make every page read sleep first (benchmark only)"""
+    read = ContentLoader._read_markdown_file
+
+    def slow_read(self, file_path, stat):
+        time.sleep(seconds)
+        return read(self, file_path, stat)
+
+    ContentLoader._read_markdown_file = slow_read
+
+
+async def main(args):
+    if args.fs_latency_ms:
+        _add_fs_latency(args.fs_latency_ms / 1000)
+
+    from main import app
+
+    paths = [
+        page['slug'] if page['slug'].startswith('/') else '/' + page['slug']
+        for page in ContentLoader().list_pages()
+        if not page.get('draft', False) and page.get('slug')
+    ]
+    # Warm imports, templates and the search index outside the measurement
+    await _run(app, paths, 1, len(paths), False)
+
+    print(f"{len(paths)} pages, {args.requests} requests per run, "
+          f"cache {'off' if args.no_cache else 'on'}, fs latency {args.fs_latency_ms} ms")
+    for concurrency in CONCURRENCY:
+        rate = await _run(app, paths, concurrency, args.requests, args.no_cache)
+        print(f"concurrency {concurrency:>3}  {rate:10.1f} req/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400, help="requests per concurrency level")
+    parser.add_argument("--no-cache", action="store_true", help="clear page and render caches per request")
+    parser.add_argument("--fs-latency-ms", type=float, default=0.0, help="simulated latency per page read")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,134 @@
+"""Benchmark the HTML sanitization backends over the real content pages.
+
+Each page is loaded (components expanded) and converted to HTML, then run
+through every available backend, uncached and through the result cache.
+Before timing, the fast backends are checked against bleach: for every
+page, and for a probe of every allowlisted tag with allowed and forbidden
+attributes, the surviving elements and attributes must be identical.
+Differences are printed and the exit status is non-zero.
+
+Run from the project root:
+
+    python -m benchmarks.bench_sanitizer [iterations]
+"""
+import sys
+import time
+from html.parser import HTMLParser
+from typing import List, Tuple
+
+from app.security import ALLOWED_TAGS, ALLOWED_ATTRIBUTES
+from app.services.content_loader import ContentLoader
+from app.services.markdown import md_pool
+from app.services.sanitizer import SANITIZER_BACKENDS, BleachSanitizer, CachedSanitizer
+
+FORBIDDEN_ATTRIBUTES = ["onclick", "onerror", "formaction", "aria-label", "data-id", "srcset"]
+UNSAFE_URL = "javascript:alert(1)"
+# bleach minimizes these to a bare name, so only their presence is compared
+BOOLEAN_ATTRIBUTES = {"required", "selected", "checked", "disabled", "readonly", "multiple", "hidden"}
+
+
+class _ElementCollector(HTMLParser):
+    """Collect (tag, sorted attributes) for every start tag in a document"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.elements: List[Tuple[str, tuple]] = []
+
+    def handle_starttag(self, tag, attrs):
+        self.elements.append((tag, tuple(sorted(
+            (name, "" if name in BOOLEAN_ATTRIBUTES else value or "") for name, value in attrs
+        ))))
+
+    handle_startendtag = handle_starttag
+
+
+def elements(html: str) -> List[Tuple[str, tuple]]:
+    collector = _ElementCollector()
+    collector.feed(html)
+    collector.close()
+    return [element for element in collector.elements if element[0] in ALLOWED_TAGS]
+
+
+def load_documents() -> List[Tuple[str, str]]:
+    """Return (name, unsanitized HTML) for every page in the content directory"""
+    loader = ContentLoader()
+    documents = []
+    for page in loader.list_pages():
+        _, body = loader.load_page_by_path(page['file_path'])
+        with md_pool.acquire() as md:
+            documents.append((page['file_path'], md.convert(body)))
+    return documents
+
+
+def allowlist_probe() -> str:
+    """One element per allowlisted tag carrying every allowed and some forbidden attributes"""
+    parts = []
+    for tag in ALLOWED_TAGS:
+        names = set(ALLOWED_ATTRIBUTES.get("*", [])) | set(ALLOWED_ATTRIBUTES.get(tag, []))
+        names |= set(FORBIDDEN_ATTRIBUTES) | {"href", "src"}
+        attributes = " ".join(
+            f'{name}="{UNSAFE_URL if name in ("href", "src", "action") else name + "-value"}"'
+            for name in sorted(names)
+        )
+        parts.append(f"<{tag} {attributes}>{tag}</{tag}>")
+    return "<div>" + "".join(parts) + "<script>alert(1)</script><iframe src=\"x\"></iframe></div>"
+
+
+def check_backend(backend, reference, documents) -> int:
+    mismatches = 0
+    for name, html in documents + [("allowlist probe", allowlist_probe())]:
+        expected = elements(reference.clean(html))
+        actual = elements(backend.clean(html))
+        if expected != actual:
+            mismatches += 1
+            diff = next((i for i, pair in enumerate(zip(expected, actual)) if pair[0] != pair[1]),
+                        min(len(expected), len(actual)))
+            print(f"  MISMATCH {backend.name} {name} at element {diff}:")
+            print(f"    bleach: {expected[diff] if diff < len(expected) else None}")
+            print(f"    {backend.name}: {actual[diff] if diff < len(actual) else None}")
+    return mismatches
+
+
+def _report(label: str, seconds: float, pages: int):
+    print(f"{label:<32} {seconds / pages * 1000:9.3f} ms/page")
+
+
+def main(iterations: int = 20) -> int:
+    documents = load_documents()
+    total_bytes = sum(len(html) for _, html in documents)
+    print(f"{len(documents)} pages, {total_bytes / 1024:.0f} KiB of HTML, {iterations} iterations")
+
+    reference = BleachSanitizer()
+    backends = []
+    for name, backend_class in SANITIZER_BACKENDS.items():
+        try:
+            backends.append(backend_class())
+        except ImportError as e:
+            print(f"skipping {name}: {e}")
+
+    mismatches = 0
+    for backend in backends:
+        if backend.name != reference.name:
+            mismatches += check_backend(backend, reference, documents)
+    print("allowlist check:", "OK" if not mismatches else f"{mismatches} mismatching documents")
+
+    pages = iterations * len(documents)
+    for backend in backends:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for _, html in documents:
+                backend.clean(html)
+        _report(f"{backend.name}", time.perf_counter() - started, pages)
+
+        cached = CachedSanitizer(backend)
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for _, html in documents:
+                cached.clean(html)
+        _report(f"{backend.name} + result cache", time.perf_counter() - started, pages)
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20))
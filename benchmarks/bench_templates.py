@@ -0,0 +1,73 @@
+"""Benchmark the cost of rendering layouts/docs.html.
+
+Compares the old behaviour (a fresh Jinja2 Environment per request, so the
+layout is parsed and compiled every time) with the shared environment from
+app.deps.get_templates(), cold and warm.
+
+Run from the project root:
+
+    python -m benchmarks.bench_templates [iterations]
+"""
+import shutil
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from app.deps import create_templates, get_config, get_templates
+
+LAYOUT = "layouts/docs.html"
+
+
+def _context():
+    config = get_config()
+    return {
+        'request': SimpleNamespace(session={}),
+        'content': "<h1>Benchmark</h1>" + "<p>Lorem ipsum dolor sit amet.</p>" * 50,
+        'page': {'title': 'Benchmark', 'description': 'Template benchmark'},
+        'site': config.get('site', {}),
+        'navigation': [
+            {'title': f'Page {i}', 'slug': f'/page-{i}', 'description': '', 'children': []}
+            for i in range(20)
+        ],
+        'breadcrumbs': [{'title': 'Home', 'slug': '/'}]
+    }
+
+
+def _report(label: str, seconds: float, iterations: int):
+    print(f"{label:<44} {seconds / iterations * 1000:9.3f} ms/render")
+
+
+def main(iterations: int = 200):
+    context = _context()
+
+    # Before: every request built its own environment and recompiled the layout
+    started = time.perf_counter()
+    for _ in range(iterations):
+        create_templates(bytecode_cache_dir='').get_template(LAYOUT).render(**context)
+    _report("new Environment per render (old)", time.perf_counter() - started, iterations)
+
+    # A new worker with an empty vs. populated on-disk bytecode cache
+    cache_dir = tempfile.mkdtemp(prefix="flashpages-jinja-")
+    try:
+        started = time.perf_counter()
+        create_templates(bytecode_cache_dir=cache_dir).get_template(LAYOUT).render(**context)
+        _report("first render, empty bytecode cache", time.perf_counter() - started, 1)
+
+        started = time.perf_counter()
+        create_templates(bytecode_cache_dir=cache_dir).get_template(LAYOUT).render(**context)
+        _report("first render, warm bytecode cache", time.perf_counter() - started, 1)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    # After: one shared environment for the whole process
+    templates = get_templates()
+    templates.get_template(LAYOUT).render(**context)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        templates.get_template(LAYOUT).render(**context)
+    _report("shared Environment (new)", time.perf_counter() - started, iterations)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
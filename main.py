@@ -1,12 +1,10 @@
 from fastapi import FastAPI, Request, Depends, HTTPException, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from pathlib import Path
 import os
-import yaml
 import secrets
 
 from app.deps import get_templates, get_config, get_current_user
@@ -14,13 +12,11 @@ from app.public.routes import router as public_router
 from app.cms.routes import router as cms_router
 from app.models import create_tables
 from app.api.forms import router as forms_router
+from app.services.compression import PrecompressedStaticFiles
 
-# Load configuration
-config_path = Path("config.yaml")
-if config_path.exists():
-    with open(config_path, 'r', encoding='utf-8') as f:
-        config = yaml.safe_load(f)
-else:
+# Load configuration (shared, cached snapshot)
+config = get_config()
+if not config:
     # Default configuration
     config = {
         'site': {
@@ -56,11 +52,15 @@ app.add_middleware(SessionMiddleware, secret_key=secret_key)
 # Mount static files
 static_dir = Path(config['content']['static_dir'])
 static_dir.mkdir(exist_ok=True)
-app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory=str(static_dir)), name="static")
 
 # Initialize database tables
 create_tables()
 
+# Reconcile the page catalog with the content directory
+from app.services.page_catalog import get_page_catalog
+get_page_catalog(config['content']['dir']).refresh(force=True)
+
 # Initialize Jinja2 templates with filters
 from app.deps import get_templates
 templates = get_templates()
@@ -78,7 +78,7 @@ async def readiness_check():
 @app.get("/auth/login", response_class=HTMLResponse)
 async def login_form(request: Request):
     tmpl = templates.get_template("cms/login.html")
-    return tmpl.render(request=request, site=config['site'])
+    return tmpl.render(request=request, site=get_config().get('site', config['site']))
 
 @app.post("/auth/login")
 async def login(request: Request, username: str = Form(...), password: str = Form(...)):
@@ -88,7 +88,7 @@ async def login(request: Request, username: str = Form(...), password: str = For
         return RedirectResponse(url="/cms", status_code=302)
     else:
         tmpl = templates.get_template("cms/login.html")
-        return tmpl.render(request=request, site=config['site'], error="Invalid credentials")
+        return tmpl.render(request=request, site=get_config().get('site', config['site']), error="Invalid credentials")
 
 @app.post("/auth/logout")
 async def logout(request: Request):
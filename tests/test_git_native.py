@@ -0,0 +1,319 @@
+"""In-process git add/commit/rm/diff checked against the git CLI on scratch repositories"""
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from app.services.git_index import UnsupportedIndex
+from app.services.git_repo import GitRepo
+
+PAGES = {
+    'content/pages/index.md': "---\ntitle: Home\n---\nWelcome\n",
+    'content/pages/guides/setup.md': "---\ntitle: Setup\n---\nline 1\nline 2\nline 3\n",
+    'templates/base.html': "<html>{{ content }}</html>\n",
+    'README.md': "readme\n",
+}
+
+
+def git(repo, *args) -> str:
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True,
+                          text=True).stdout
+
+
+def write(repo, path, content, mode=None):
+    full = os.path.join(repo, path)
+    os.makedirs(os.path.dirname(full), exist_ok=True)
+    with open(full, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    if mode is not None:
+        os.chmod(full, mode)
+
+
+def tree(repo, rev='HEAD') -> str:
+    return git(repo, "rev-parse", f"{rev}^{{tree}}").strip()
+
+
+@pytest.fixture(autouse=True)
+def isolated_git(tmp_path, monkeypatch):
+    """Keep the user's and the system's git config out of the scratch repositories"""
+    monkeypatch.setenv('HOME', str(tmp_path / 'home'))
+    monkeypatch.setenv('GIT_CONFIG_NOSYSTEM', '1')
+    for name in ('GIT_DIR', 'GIT_WORK_TREE', 'GIT_INDEX_FILE', 'GIT_AUTHOR_NAME', 'GIT_AUTHOR_EMAIL',
+                 'GIT_COMMITTER_NAME', 'GIT_COMMITTER_EMAIL'):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def twins(tmp_path):
+    """Two identical repositories: one driven by GitRepo, one by the git CLI"""
+    base = tmp_path / 'base'
+    base.mkdir()
+    git(base, "init", "-q")
+    git(base, "config", "user.name", "CMS User")
+    git(base, "config", "user.email", "cms@localhost")
+    for path, content in PAGES.items():
+        write(base, path, content)
+    write(base, 'scripts/build.sh', "#!/bin/sh\necho build\n", 0o755)
+    git(base, "add", "-A")
+    git(base, "commit", "-q", "-m", "Initial content")
+    native, cli = tmp_path / 'native', tmp_path / 'cli'
+    shutil.copytree(base, native, symlinks=True)
+    shutil.copytree(base, cli, symlinks=True)
+    return native, cli
+
+
+def assert_clean(repo):
+    assert git(repo, "fsck", "--strict", "--no-progress") == ''
+    assert git(repo, "status", "--porcelain", "--untracked-files=all") == ''
+
+
+def edit_both(native, cli, changes):
+    """Apply the same file writes (content) and deletions (None) to both repositories"""
+    for path, content in changes.items():
+        for repo in (native, cli):
+            if content is None:
+                os.unlink(os.path.join(repo, path))
+            else:
+                write(repo, path, content)
+
+
+def test_add_and_commit_match_cli(twins):
+    native, cli = twins
+    changes = {
+        'content/pages/index.md': "---\ntitle: Home\n---\nWelcome back\n",
+        'content/pages/guides/deep/new page.md': "new\n",
+        'content/pages/café.md': "unicode name, no trailing newline",
+        'README.md': None,
+    }
+    edit_both(native, cli, changes)
+
+    repo = GitRepo(str(native))
+    for path in changes:
+        repo.add_file(path)
+    repo.commit("Edit pages", "Editor", "editor@example.com")
+
+    for path in changes:
+        git(cli, "add", "-A", "--", path)
+    git(cli, "commit", "-q", "-m", "Edit pages")
+
+    assert repo.stats()['cli_operations'] == 0
+    assert tree(native) == tree(cli)
+    assert git(native, "log", "-1", "--format=%an <%ae>|%cn|%s") == "Editor <editor@example.com>|CMS User|Edit pages\n"
+    assert git(native, "rev-parse", "HEAD~1") == git(cli, "rev-parse", "HEAD~1")
+    assert_clean(native)
+    # The reflog records the commit like `git commit` does
+    assert "commit: Edit pages" in git(native, "reflog", "-1")
+
+
+def test_executable_bit_and_nothing_to_commit(twins):
+    native, cli = twins
+    edit_both(native, cli, {'scripts/build.sh': "#!/bin/sh\necho rebuilt\n"})
+    repo = GitRepo(str(native))
+    repo.add_file('scripts/build.sh')
+    repo.commit("Rebuild")
+    git(cli, "commit", "-q", "-am", "Rebuild")
+
+    assert tree(native) == tree(cli)
+    assert '100755' in git(native, "ls-tree", "HEAD", "scripts/build.sh")
+    head = git(native, "rev-parse", "HEAD")
+    repo.commit("Nothing changed")
+    assert git(native, "rev-parse", "HEAD") == head
+    assert_clean(native)
+
+
+def test_remove_matches_git_rm(twins):
+    native, cli = twins
+    repo = GitRepo(str(native))
+    repo.remove_file('content/pages/guides/setup.md')
+    repo.commit("Remove setup")
+    git(cli, "rm", "-q", "content/pages/guides/setup.md")
+    git(cli, "commit", "-q", "-m", "Remove setup")
+
+    assert repo.stats()['cli_operations'] == 0
+    assert tree(native) == tree(cli)
+    assert not (native / 'content/pages/guides').exists()
+    assert_clean(native)
+
+
+def test_create_then_delete_before_commit_stages_nothing(twins):
+    native, _ = twins
+    repo = GitRepo(str(native))
+    write(native, 'content/pages/draft.md', "short-lived\n")
+    os.unlink(native / 'content/pages/draft.md')
+    repo.add_file('content/pages/draft.md')
+    assert git(native, "status", "--porcelain") == ''
+    assert_clean(native)
+
+
+def test_diff_matches_git_diff(twins):
+    native, _ = twins
+    repo = GitRepo(str(native))
+    history = [
+        {'content/pages/guides/setup.md': "---\ntitle: Setup\n---\nline 1\nline two\nline 3\nline 4\n"},
+        {'content/pages/new.md': "brand new\n", 'README.md': None},
+        {'content/pages/guides/setup.md': "---\ntitle: Setup\n---\nline 1\nline two\nno newline at end"},
+    ]
+    for number, changes in enumerate(history):
+        for path, content in changes.items():
+            if content is None:
+                os.unlink(native / path)
+            else:
+                write(native, path, content)
+            repo.add_file(path)
+        repo.commit(f"Change {number}")
+
+    paths = ['content/pages/guides/setup.md', 'content/pages/new.md', 'README.md', 'content/pages/index.md']
+    for rev in ('HEAD~1', 'HEAD~2', 'HEAD~3', 'no-such-rev'):
+        for path in paths:
+            expected = subprocess.run(["git", "diff", rev, "HEAD", "--", path], cwd=native,
+                                      capture_output=True, text=True).stdout
+            assert repo.get_file_diff(path, rev) == expected, (rev, path)
+    assert repo.stats()['cli_operations'] == 0
+
+
+def test_history_matches_git_log(twins):
+    native, _ = twins
+    repo = GitRepo(str(native))
+    for number in range(5):
+        write(native, f'content/pages/p{number % 2}.md', f"version {number}\n")
+        repo.add_file(f'content/pages/p{number % 2}.md')
+        repo.commit(f"Edit {number}")
+
+    for path in (None, 'content/pages/p0.md', 'content/pages/p1.md'):
+        expected = git(native, "log", "--format=%H", *(["--", path] if path else [])).split()
+        pages, cursor = [], None
+        while True:
+            page = repo.get_commit_history(path, 2, cursor)
+            if not page:
+                break
+            pages.extend(commit['sha'] for commit in page)
+            cursor = page[-1]['sha']
+        assert pages == expected
+
+
+def test_commit_hooks_use_the_cli(twins):
+    native, cli = twins
+    hook = native / '.git/hooks/pre-commit'
+    hook.write_text("#!/bin/sh\ntouch hook-ran\n")
+    hook.chmod(0o755)
+    edit_both(native, cli, {'content/pages/index.md': "hooked\n"})
+
+    repo = GitRepo(str(native))
+    repo.add_file('content/pages/index.md')
+    repo.commit("With hook")
+    git(cli, "commit", "-q", "-am", "With hook")
+
+    assert repo.stats()['cli_operations'] == 1
+    assert (native / 'hook-ran').exists()
+    assert tree(native) == tree(cli)
+
+
+def test_autocrlf_uses_the_cli(twins):
+    native, cli = twins
+    for repo in (native, cli):
+        git(repo, "config", "core.autocrlf", "true")
+    edit_both(native, cli, {'content/pages/windows.md': "line one\r\nline two\r\n"})
+
+    repo = GitRepo(str(native))
+    repo.add_file('content/pages/windows.md')
+    repo.commit("CRLF page")
+    git(cli, "add", "content/pages/windows.md")
+    git(cli, "commit", "-q", "-m", "CRLF page")
+
+    assert repo.stats()['cli_operations'] >= 1
+    assert tree(native) == tree(cli)
+    assert '\r' not in git(native, "show", "HEAD:content/pages/windows.md")
+
+
+def test_index_v4_uses_the_cli(twins):
+    native, cli = twins
+    git(native, "update-index", "--index-version", "4")
+    edit_both(native, cli, {'content/pages/index.md': "v4 index\n"})
+
+    repo = GitRepo(str(native))
+    repo.add_file('content/pages/index.md')
+    repo.commit("On a v4 index")
+    git(cli, "commit", "-q", "-am", "On a v4 index")
+
+    assert repo.stats()['cli_operations'] >= 1
+    assert tree(native) == tree(cli)
+    assert_clean(native)
+
+
+def test_index_writers_serialize_on_index_lock(twins):
+    native, _ = twins
+    first, second = GitRepo(str(native)), GitRepo(str(native))
+    write(native, 'content/pages/a.md', "a\n")
+    write(native, 'content/pages/b.md', "b\n")
+
+    with first.index.locked():
+        with pytest.raises(UnsupportedIndex):
+            second._native_add('content/pages/a.md')
+    second.add_file('content/pages/a.md')
+    first.add_file('content/pages/b.md')
+
+    staged = git(native, "ls-files", "content/pages").split()
+    assert {'content/pages/a.md', 'content/pages/b.md'} <= set(staged)
+    assert not (native / '.git/index.lock').exists()
+    assert first.stats()['cli_operations'] == second.stats()['cli_operations'] == 0
+
+
+def test_add_keeps_skip_worktree_and_resolves_intent_to_add(twins):
+    native, cli = twins
+    for repo in (native, cli):
+        git(repo, "update-index", "--skip-worktree", "templates/base.html")
+    edit_both(native, cli, {'content/pages/later.md': "later\n"})
+    for repo in (native, cli):
+        git(repo, "add", "-N", "content/pages/later.md")
+    edit_both(native, cli, {'content/pages/later.md': "later, written\n",
+                            'templates/base.html': "<html>changed</html>\n"})
+
+    repo = GitRepo(str(native))
+    repo.add_file('content/pages/later.md')
+    repo.add_file('templates/base.html')
+    repo.commit("Later")
+    git(cli, "add", "content/pages/later.md")
+    # git leaves skip-worktree paths alone (and says so)
+    subprocess.run(["git", "add", "templates/base.html"], cwd=cli, capture_output=True)
+    git(cli, "commit", "-q", "-m", "Later")
+
+    assert repo.stats()['cli_operations'] == 1
+    assert tree(native) == tree(cli)
+    assert git(native, "ls-files", "-v", "templates/base.html").startswith('S ')
+
+
+def test_merge_in_progress_uses_the_cli(twins):
+    native, _ = twins
+    git(native, "checkout", "-q", "-b", "side")
+    write(native, 'content/pages/side.md', "side\n")
+    git(native, "add", "content/pages/side.md")
+    git(native, "commit", "-q", "-m", "Side")
+    git(native, "checkout", "-q", "-")
+    write(native, 'content/pages/main.md', "main\n")
+    git(native, "add", "content/pages/main.md")
+    git(native, "commit", "-q", "-m", "Main")
+    git(native, "merge", "-q", "--no-ff", "--no-commit", "side")
+
+    repo = GitRepo(str(native))
+    repo.commit("Merge side")
+
+    assert repo.stats()['cli_operations'] == 1
+    assert len(git(native, "log", "-1", "--format=%P").split()) == 2
+    assert not (native / '.git/MERGE_HEAD').exists()
+
+
+def test_author_is_sanitized_like_git(twins):
+    native, cli = twins
+    name, email = ' "Eve <admin>\nEvil"., ', '<eve@example.com>\n'
+    edit_both(native, cli, {'content/pages/index.md': "by eve\n"})
+
+    repo = GitRepo(str(native))
+    repo.add_file('content/pages/index.md')
+    repo.commit("By Eve", name, email)
+    subprocess.run(["git", "commit", "-q", "-am", "By Eve"], cwd=cli, check=True,
+                   env=dict(os.environ, GIT_AUTHOR_NAME=name, GIT_AUTHOR_EMAIL=email))
+
+    assert repo.stats()['cli_operations'] == 0
+    assert git(native, "log", "-1", "--format=%an|%ae") == git(cli, "log", "-1", "--format=%an|%ae")
+    assert_clean(native)
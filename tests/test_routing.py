@@ -0,0 +1,101 @@
+"""Slug-to-file resolution of RouteIndex on scratch content trees"""
+import pytest
+
+from app.services.routing import RouteIndex
+
+
+def page(root, path, front_matter=''):
+    file_path = root / path
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(f"---\n{front_matter}---\nbody of {path}\n", encoding='utf-8')
+    return file_path
+
+
+@pytest.fixture
+def content(tmp_path):
+    root = tmp_path / 'content' / 'pages'
+    root.mkdir(parents=True)
+    return root
+
+
+def resolved(index, slug):
+    found = index.resolve(slug)
+    return found.relative_to(index.content_dir).as_posix() if found else None
+
+
+def test_nested_paths_and_index_pages(content):
+    page(content, 'index.md', "title: Home\n")
+    page(content, 'guides/index.md')
+    page(content, 'guides/setup.md')
+    index = RouteIndex(content, reconcile_interval=0)
+
+    assert resolved(index, '') == 'index.md'
+    assert resolved(index, '/') == 'index.md'
+    assert resolved(index, 'guides') == 'guides/index.md'
+    assert resolved(index, '/guides/setup/') == 'guides/setup.md'
+    assert resolved(index, 'guides/index') == 'guides/index.md'
+    assert resolved(index, 'guides/missing') is None
+    assert index.url_for(content / 'guides/index.md') == '/guides'
+    assert index.url_for(content / 'guides/setup.md') == '/guides/setup'
+
+
+def test_slug_beats_path_beats_alias(content):
+    page(content, 'a.md', "slug: /b\n")
+    page(content, 'b.md', "aliases: [old-b]\n")
+    page(content, 'c.md', "aliases:\n- a\n- old-c\n")
+    index = RouteIndex(content, reconcile_interval=0)
+
+    # a.md's slug takes /b from b.md's own path, and its path keeps /a from c.md's alias
+    assert resolved(index, 'b') == 'a.md'
+    assert resolved(index, 'a') == 'a.md'
+    assert resolved(index, 'old-b') == 'b.md'
+    assert resolved(index, 'old-c') == 'c.md'
+    assert index.url_for(content / 'a.md') == '/b'
+    assert index.url_for(content / 'b.md') == '/b'
+
+
+def test_equal_claims_go_to_the_first_path_and_fall_back_on_removal(content):
+    page(content, 'one.md', "slug: shared\n")
+    page(content, 'two.md', "slug: shared\n")
+    index = RouteIndex(content, reconcile_interval=0)
+    assert resolved(index, 'shared') == 'one.md'
+
+    (content / 'one.md').unlink()
+    index.update(content / 'one.md')
+    assert resolved(index, 'shared') == 'two.md'
+
+
+def test_legacy_flat_names(content):
+    page(content, 'guides_setup.md')
+    page(content, 'docs_intro.md')
+    page(content, 'docs/intro.md')
+    index = RouteIndex(content, reconcile_interval=0)
+
+    assert resolved(index, 'guides/setup') == 'guides_setup.md'
+    assert resolved(index, 'guides_setup') == 'guides_setup.md'
+    # A real nested page wins over the flat name
+    assert resolved(index, 'docs/intro') == 'docs/intro.md'
+
+
+def test_pages_created_outside_the_cms_resolve_before_the_rescan(content):
+    page(content, 'index.md')
+    index = RouteIndex(content, reconcile_interval=0)
+    assert resolved(index, 'later') is None
+
+    page(content, 'later.md')
+    page(content, 'section/index.md')
+    assert resolved(index, 'later') == 'later.md'
+    assert resolved(index, 'section') == 'section/index.md'
+
+
+@pytest.mark.parametrize('slug', ['..', '../secret', '../../outside', 'guides/../../secret', '/../secret'])
+def test_paths_outside_the_content_directory_never_resolve(content, slug):
+    page(content, 'index.md')
+    page(content, 'guides/index.md')
+    page(content.parent, 'secret.md')
+    page(content.parent, 'index.md')
+    page(content.parent.parent, 'outside.md')
+    index = RouteIndex(content, reconcile_interval=0)
+
+    assert index.resolve(slug) is None
+    assert index.stats()['files'] == 2